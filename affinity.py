@@ -0,0 +1,217 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import time
+import argparse
+from scipy import sparse
+
+import columnar
+import instrument
+
+# SKU affinity: how often two SKUs are picked in the same basket.
+#
+# Baskets are orders (order_id) or, when every order has a single line as in the
+# current snapshot, the cart batches pickers actually walk: WAVE_MINUTES waves
+# of order_timestamp cut into BATCH_SIZE lines (same rule as routing.py). The
+# basket x SKU incidence matrix B is built as CSR and the co-occurrence is the
+# sparse product B.T @ B, so no dense SKU x SKU intermediate is ever created. Its
+# diagonal holds the number of baskets per SKU.
+#
+# The state in cleaned_data/affinity/ is updated incrementally: the lines of the
+# last (still open) wave are kept, their baskets are subtracted, and they are
+# recounted together with the new lines. This is exact as long as new orders
+# arrive in time order.
+
+AFFINITY_DIR = "affinity"
+WAVE_MINUTES = 30
+BATCH_SIZE = 20
+TOP_K = 10
+
+
+def affinity_dir(base_dir=columnar.CLEANED_DIR):
+    return os.path.join(base_dir, AFFINITY_DIR)
+
+
+def exists(base_dir=columnar.CLEANED_DIR):
+    return os.path.exists(os.path.join(affinity_dir(base_dir), "_affinity.json"))
+
+
+def basket_mode(order_df):
+    # 'order' when some order has several lines, else 'cart'
+    if order_df['order_id'].duplicated().any():
+        return 'order'
+    return 'cart'
+
+
+def _lines(order_df):
+    lines = pd.DataFrame({'order_id': order_df['order_id'].astype(str).to_numpy(),
+                          'sku_id': columnar.normalize_ids(order_df['sku_id']).to_numpy(),
+                          'order_timestamp': pd.to_datetime(order_df['order_timestamp'], errors='coerce').to_numpy()})
+    lines = lines[lines['order_timestamp'].notna() & lines['sku_id'].notna()]
+    return lines.sort_values(['order_timestamp', 'order_id'], kind='stable').reset_index(drop=True)
+
+
+def _baskets(lines, meta):
+    # Basket code of every line
+    wave = lines['order_timestamp'].dt.floor(f"{meta['wave_minutes']}min")
+    if meta['mode'] == 'order':
+        return pd.factorize(lines['order_id'])[0], wave
+    wave_code = pd.factorize(wave)[0]
+    in_wave = lines.groupby(wave_code).cumcount().to_numpy() // meta['batch_size']
+    return pd.factorize(pd.MultiIndex.from_arrays([wave_code, in_wave]))[0], wave
+
+
+def cooccurrence(sku_codes, basket_codes, n_skus):
+    # Symmetric int32 CSR: off-diagonal = shared baskets, diagonal = baskets per SKU
+    if len(sku_codes) == 0:
+        return sparse.csr_matrix((n_skus, n_skus), dtype=np.int32)
+    incidence = sparse.csr_matrix((np.ones(len(sku_codes), dtype=np.int32), (basket_codes, sku_codes)),
+                                  shape=(basket_codes.max() + 1, n_skus))
+    incidence.sum_duplicates()
+    incidence.data[:] = 1
+    return (incidence.T @ incidence).tocsr().astype(np.int32)
+
+
+def _count(state, lines):
+    # Co-occurrence of lines' baskets over the state's SKU index (new SKUs are appended)
+    new_ids = pd.Index(lines['sku_id'].unique()).difference(state['sku_index'].index)
+    if len(new_ids):
+        start = len(state['sku_index'])
+        state['sku_index'] = pd.concat([state['sku_index'], pd.Series(np.arange(start, start + len(new_ids)), index=new_ids)])
+        n = len(state['sku_index'])
+        state['matrix'].resize((n, n))
+    baskets, wave = _baskets(lines, state['meta'])
+    sku_codes = state['sku_index'].reindex(lines['sku_id']).to_numpy()
+    return cooccurrence(sku_codes, baskets, len(state['sku_index'])), wave
+
+
+def build(order_df, sku_ids=None, mode=None, wave_minutes=WAVE_MINUTES, batch_size=BATCH_SIZE):
+    lines = _lines(order_df)
+    sku_ids = pd.Index(sku_ids if sku_ids is not None else [], dtype=object).unique()
+    state = {
+        'meta': {'mode': mode or basket_mode(order_df), 'wave_minutes': wave_minutes, 'batch_size': batch_size,
+                 'lines': 0},
+        'sku_index': pd.Series(np.arange(len(sku_ids)), index=sku_ids),
+        'matrix': sparse.csr_matrix((len(sku_ids), len(sku_ids)), dtype=np.int32),
+        'tail': lines.iloc[:0],
+    }
+    return update(state, order_df, lines)
+
+
+def update(state, new_order_df, lines=None):
+    # Fold new order lines into the state (in place); returns the state
+    lines = _lines(new_order_df) if lines is None else lines
+    if len(state['tail']):
+        # Re-open the last wave: drop its baskets and recount them with the new lines
+        old, _ = _count(state, state['tail'])
+        state['matrix'] = state['matrix'] - old
+        lines = pd.concat([state['tail'], lines], ignore_index=True)
+        lines = lines.sort_values(['order_timestamp', 'order_id'], kind='stable').reset_index(drop=True)
+    counts, wave = _count(state, lines)
+    state['matrix'] = (state['matrix'] + counts).tocsr()
+    state['matrix'].eliminate_zeros()
+    state['tail'] = lines[wave == wave.max()].reset_index(drop=True) if len(lines) else lines
+    state['meta']['lines'] += len(new_order_df)
+    state['meta']['baskets_per_sku'] = float(state['matrix'].diagonal().mean()) if state['matrix'].shape[0] else 0.0
+    state['meta']['pairs'] = int((state['matrix'].nnz - np.count_nonzero(state['matrix'].diagonal())) // 2)
+    return state
+
+
+def save(state, base_dir=columnar.CLEANED_DIR):
+    out = affinity_dir(base_dir)
+    os.makedirs(out, exist_ok=True)
+    sparse.save_npz(os.path.join(out, "cooccurrence.npz"), state['matrix'])
+    pd.DataFrame({'sku_id': state['sku_index'].index}).to_csv(os.path.join(out, "sku_ids.csv"), index=False)
+    state['tail'].to_csv(os.path.join(out, "open_wave.csv"), index=False)
+    with open(os.path.join(out, "_affinity.json"), 'w') as f:
+        json.dump(state['meta'], f, indent=2)
+
+
+def load(base_dir=columnar.CLEANED_DIR):
+    src = affinity_dir(base_dir)
+    with open(os.path.join(src, "_affinity.json")) as f:
+        meta = json.load(f)
+    sku_ids = pd.read_csv(os.path.join(src, "sku_ids.csv"), dtype={'sku_id': str})['sku_id']
+    tail = pd.read_csv(os.path.join(src, "open_wave.csv"), dtype={'order_id': str, 'sku_id': str},
+                       parse_dates=['order_timestamp'])
+    return {'meta': meta, 'sku_index': pd.Series(np.arange(len(sku_ids)), index=sku_ids.to_numpy()),
+            'matrix': sparse.load_npz(os.path.join(src, "cooccurrence.npz")).tocsr(), 'tail': tail}
+
+
+def top_k(state, k=TOP_K, min_count=1):
+    # Top-k neighbours of every SKU: sku_id, neighbour, co_count, jaccard (vectorized over the CSR)
+    matrix = state['matrix']
+    baskets = matrix.diagonal()
+    coo = matrix.tocoo()
+    keep = (coo.row != coo.col) & (coo.data >= min_count)
+    row, col, count = coo.row[keep], coo.col[keep], coo.data[keep]
+    order = np.lexsort((col, -count, row))
+    row, col, count = row[order], col[order], count[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(row)) + 1]
+    rank = np.arange(len(row)) - np.repeat(starts, np.diff(np.r_[starts, len(row)]))
+    top = rank < k
+    row, col, count = row[top], col[top], count[top]
+    ids = state['sku_index'].index.to_numpy()
+    return pd.DataFrame({'sku_id': ids[row], 'neighbour': ids[col], 'co_count': count,
+                         'jaccard': count / (baskets[row] + baskets[col] - count)})
+
+
+def neighbours(state, k=TOP_K, min_count=1):
+    # sku_id -> [(neighbour, co_count), ...] strongest first
+    pairs = top_k(state, k, min_count)
+    return {sku: list(zip(group['neighbour'], group['co_count']))
+            for sku, group in pairs.groupby('sku_id', sort=False)}
+
+
+def adjacent_aisles(aisle_id):
+    # Neighbouring aisles of the same zone: 'C05' -> ['C04', 'C06']
+    aisle_id = str(aisle_id)
+    zone, number = aisle_id[:1], aisle_id[1:]
+    if not number.isdigit():
+        return []
+    n = int(number)
+    return [f"{zone}{m:0{len(number)}d}" for m in (n - 1, n + 1) if m >= 1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sparse SKU co-occurrence (affinity) from order_history")
+    parser.add_argument('--dir', default=columnar.CLEANED_DIR, help="cleaned_data directory")
+    parser.add_argument('--incremental', action='store_true', help="fold in order lines added since the last run")
+    parser.add_argument('--basket', choices=['order', 'cart'], default=None,
+                        help="basket = order_id or cart batch (default: order if any order has several lines)")
+    parser.add_argument('--wave-minutes', type=int, default=WAVE_MINUTES)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--top', type=int, default=TOP_K, help="neighbours per SKU to list")
+    args = parser.parse_args()
+
+    order_df = columnar.load_cleaned('order_history', args.dir)
+    start = time.perf_counter()
+    if args.incremental and exists(args.dir):
+        state = load(args.dir)
+        new_orders = order_df.iloc[state['meta']['lines']:]
+        with instrument.stage('affinity_update', rows_in=len(new_orders)) as rec:
+            update(state, new_orders)
+            rec['rows_out'] = state['matrix'].nnz
+        print(f"Added {len(new_orders):,} order lines")
+    else:
+        sku_ids = columnar.normalize_ids(columnar.load_cleaned('sku_master', args.dir)['sku_id'])
+        with instrument.stage('affinity_build', rows_in=len(order_df)) as rec:
+            state = build(order_df, sku_ids, args.basket, args.wave_minutes, args.batch_size)
+            rec['rows_out'] = state['matrix'].nnz
+    save(state, args.dir)
+    meta = state['meta']
+    print(f"Affinity ({meta['mode']} baskets) over {meta['lines']:,} order lines in {time.perf_counter() - start:.2f}s: "
+          f"{len(state['sku_index']):,} SKUs, {meta['pairs']:,} co-picked pairs, "
+          f"{state['matrix'].data.nbytes / 1024 ** 2:.1f} MB CSR in {affinity_dir(args.dir)}")
+
+    upper = sparse.triu(state['matrix'], k=1).tocoo()
+    best = np.argsort(-upper.data, kind='stable')[:args.top]
+    ids, baskets = state['sku_index'].index.to_numpy(), state['matrix'].diagonal()
+    pairs = pd.DataFrame({'sku_id': ids[upper.row[best]], 'neighbour': ids[upper.col[best]],
+                          'co_count': upper.data[best]})
+    pairs['jaccard'] = pairs['co_count'] / (baskets[upper.row[best]] + baskets[upper.col[best]] - pairs['co_count'])
+    print(f"\n--- TOP {args.top} SKU PAIRS ---")
+    for row in pairs.itertuples(index=False):
+        print(f"{row.sku_id} + {row.neighbour}: {row.co_count} shared baskets (Jaccard {row.jaccard:.3f})")
+    instrument.print_summary()
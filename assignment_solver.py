@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+
+from slot_index import is_aisle_b
+
+# Cost model (per SKU placed in a slot):
+#   velocity (order_count) x distance-to-dock  +  constraint penalties
+INFEASIBLE = 1e9        # weight over capacity / temp mismatch / no slot
+AISLE_B_PENALTY = 1e6   # high-velocity SKU in Aisle B (soft, like the greedy fallback)
+
+# Walking distance proxy from the dock (front cross-aisle)
+BAY_WIDTH_M = 1.2
+RACK_DEPTH_M = 1.0
+
+# Largest partition solved as a single Hungarian problem (exact). Bigger partitions are
+# solved in velocity-ordered blocks of this size.
+BLOCK_SIZE = 1000
+
+
+def slot_distance_to_dock(constraints_df):
+    # Walk across the front cross-aisle to the aisle, then down to the bay.
+    aisle_rank = constraints_df['aisle_id'].rank(method='dense').fillna(1) - 1
+    pitch = constraints_df['aisle_width_m'].fillna(2.0) + 2 * RACK_DEPTH_M
+    if 'position' in constraints_df.columns:
+        position = constraints_df['position'].astype(float).fillna(0)
+    else:
+        position = pd.to_numeric(constraints_df['slot_id'].astype(str).str.rsplit('-', n=1).str[-1], errors='coerce').fillna(0)
+    return (aisle_rank * pitch + position * BAY_WIDTH_M).to_numpy(dtype=float)
+
+
+def _aisle_b(slots):
+    # Pre-computed by the typed schema; parsed from aisle_id otherwise
+    if 'is_aisle_b' in slots.columns:
+        return slots['is_aisle_b'].astype(bool)
+    return slots['aisle_id'].map(is_aisle_b).astype(bool)
+
+
+def cost_matrix(velocity, weight, high_velocity, slot_distance, slot_capacity, slot_aisle_b):
+    # SKUs x slots, one vectorized pass
+    cost = np.multiply.outer(velocity, slot_distance)
+    cost[np.greater.outer(weight, slot_capacity)] += INFEASIBLE
+    cost[np.logical_and.outer(high_velocity, slot_aisle_b)] += AISLE_B_PENALTY
+    return cost
+
+
+def plan_cost(skus, slot_ids, constraints_df):
+    # Cost of each SKU sitting in the given slot (NaN / unknown slot = unplaced)
+    slots = constraints_df.set_index('slot_id')
+    slots = slots[~slots.index.duplicated()]
+    distance = pd.Series(slot_distance_to_dock(constraints_df), index=constraints_df['slot_id'])
+    distance = distance[~distance.index.duplicated()]
+
+    slot_ids = pd.Index(slot_ids)
+    known = slot_ids.isin(slots.index)
+    temp_zone = slots['temp_zone'].reindex(slot_ids).to_numpy()
+    capacity = slots['max_weight_kg'].reindex(slot_ids).to_numpy(dtype=float)
+    aisle_b = _aisle_b(slots).reindex(slot_ids).eq(True).to_numpy()
+    dist = distance.reindex(slot_ids).fillna(0).to_numpy()
+
+    velocity = skus['order_count'].to_numpy(dtype=float)
+    cost = velocity * dist
+    cost += np.where(skus['temp_req'].to_numpy() != temp_zone, INFEASIBLE, 0.0)
+    cost += np.where(skus['weight_kg'].to_numpy(dtype=float) > capacity, INFEASIBLE, 0.0)
+    cost += np.where(skus['is_high_velocity'].to_numpy(dtype=bool) & aisle_b, AISLE_B_PENALTY, 0.0)
+    cost[~known] = INFEASIBLE
+    return cost
+
+
+def _reserve_for_later(later_weight, slots, usable):
+    # Hold back the farthest slots of each capacity tier so SKUs in later blocks
+    # can still be placed (weight feasibility is nested by capacity).
+    reserved = np.zeros(len(slots), dtype=bool)
+    if len(later_weight) == 0:
+        return reserved
+    capacity = slots['max_weight_kg'].to_numpy()
+    distance = slots['distance'].to_numpy()
+    tiers = np.sort(np.unique(capacity))
+    reserved_above = 0
+    for k in range(len(tiers) - 1, -1, -1):
+        lower = tiers[k - 1] if k > 0 else -np.inf
+        need = int(((later_weight > lower) & (later_weight <= tiers[-1])).sum())
+        take = need - reserved_above
+        if take <= 0:
+            continue
+        in_tier = np.flatnonzero(usable & (capacity == tiers[k]))
+        farthest = in_tier[np.argsort(-distance[in_tier], kind='stable')[:take]]
+        reserved[farthest] = True
+        reserved_above += len(farthest)
+    return reserved
+
+
+def _candidate_columns(slots, usable, n_rows):
+    # Within a (capacity, aisle class) group slots are interchangeable except for
+    # distance, so only the n_rows nearest of each group can appear in an optimum.
+    cand = slots[usable].sort_values(['distance', 'order'], kind='stable')
+    cand = cand.groupby(['max_weight_kg', 'aisle_b'], sort=False).head(n_rows)
+    return cand.index.to_numpy()
+
+
+def solve_partition(skus, slots, block_size=BLOCK_SIZE):
+    # skus / slots belong to one temp_zone. Returns {sku position: slot position}.
+    velocity = skus['order_count'].to_numpy(dtype=float)
+    weight = skus['weight_kg'].to_numpy(dtype=float)
+    high_velocity = skus['is_high_velocity'].to_numpy(dtype=bool)
+    distance = slots['distance'].to_numpy()
+    capacity = slots['max_weight_kg'].to_numpy(dtype=float)
+    aisle_b = slots['aisle_b'].to_numpy(dtype=bool)
+
+    order = np.argsort(-velocity, kind='stable')
+    available = np.ones(len(slots), dtype=bool)
+    assignment = {}
+
+    for start in range(0, len(order), block_size):
+        block = order[start:start + block_size]
+        later = order[start + block_size:]
+        usable = available & ~_reserve_for_later(weight[later], slots, available)
+        cols = _candidate_columns(slots, usable, len(block))
+        if len(cols) == 0:
+            continue
+
+        cost = cost_matrix(velocity[block], weight[block], high_velocity[block],
+                           distance[cols], capacity[cols], aisle_b[cols])
+        rows, picked = linear_sum_assignment(cost)
+        feasible = cost[rows, picked] < INFEASIBLE
+        for r, c in zip(rows[feasible], picked[feasible]):
+            assignment[block[r]] = cols[c]
+        available[cols[picked[feasible]]] = False
+
+    return assignment
+
+
+def solve_assignment(to_move_skus, constraints_df, free_slots, block_size=BLOCK_SIZE):
+    # Min-cost assignment of SKUs to free slots, solved per temp_zone partition.
+    # Returns (moves, unplaced) with moves in the input (priority) order.
+    # A SKU that cannot be placed stays in its current slot (as in greedy_assign), so
+    # that slot is taken out of the pool and the assignment re-solved until no unplaced
+    # SKU's slot is given away.
+    free_slots = set(free_slots)
+    while True:
+        moves, unplaced = _solve_once(to_move_skus, constraints_df, free_slots, block_size)
+        unplaced_slots = set(to_move_skus.loc[to_move_skus['sku_id'].isin(unplaced), 'current_slot'])
+        held = unplaced_slots & {m['new_slot'] for m in moves}
+        if not held:
+            return moves, unplaced
+        free_slots -= held
+
+
+def _solve_once(to_move_skus, constraints_df, free_slots, block_size):
+    is_free = constraints_df['slot_id'].isin(free_slots).to_numpy()
+    slots = constraints_df[is_free].copy()
+    slots['distance'] = slot_distance_to_dock(constraints_df)[is_free]
+    slots['order'] = np.arange(len(slots))
+    slots['aisle_b'] = _aisle_b(slots).to_numpy(dtype=bool)
+    slots = slots[slots['max_weight_kg'].notna()]
+
+    skus = to_move_skus.reset_index(drop=True)
+    new_slot = pd.Series(np.nan, index=skus.index, dtype=object)
+
+    for temp_zone, part_skus in skus.groupby('temp_req', sort=False, observed=True):
+        part_slots = slots[slots['temp_zone'] == temp_zone].reset_index(drop=True)
+        if part_slots.empty:
+            continue
+        assignment = solve_partition(part_skus.reset_index(drop=True), part_slots, block_size)
+        for r, c in assignment.items():
+            new_slot[part_skus.index[r]] = part_slots.at[c, 'slot_id']
+
+    moves, unplaced = [], []
+    for sku_id, current_slot, slot in zip(skus['sku_id'], skus['current_slot'], new_slot):
+        if pd.isna(slot):
+            unplaced.append(sku_id)
+        elif slot != current_slot:
+            moves.append({'sku_id': sku_id, 'current_slot': current_slot, 'new_slot': slot})
+    return moves, unplaced
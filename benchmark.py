@@ -0,0 +1,154 @@
+import pandas as pd
+import os
+import io
+import json
+import time
+import argparse
+import contextlib
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+import clean_data
+import optimize_slotting
+import dashboard_metrics
+import generate_data
+import instrument
+
+# Stage benchmark on generated data. Each stage function runs against
+# synthetic/<scale>x (generated on first use): one timed run, then one run under
+# tracemalloc for peak Python/numpy allocations. Results are appended to
+# benchmark_results.csv with the current commit so runs can be compared.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SYNTHETIC_DIR = os.path.join(BASE_DIR, "synthetic")
+RESULTS_FILE = os.path.join(BASE_DIR, "benchmark_results.csv")
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def ensure_dataset(scale, seed):
+    data_dir = os.path.join(SYNTHETIC_DIR, f"{scale}x")
+    manifest_path = os.path.join(data_dir, "_manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest['seed'] == seed and manifest['scale'] == scale:
+            return data_dir
+    print(f"Generating {scale}x dataset (seed {seed})...")
+    generate_data.generate(data_dir, scale, seed)
+    return data_dir
+
+
+def point_at(data_dir):
+    # Redirect the pipeline scripts' input/output paths to a generated dataset
+    clean_data.SKU_PATH = os.path.join(data_dir, "sku_master.csv")
+    clean_data.ORDER_PATH = os.path.join(data_dir, "order_history.csv")
+    clean_data.PICKER_PATH = os.path.join(data_dir, "picker_movement.csv")
+    clean_data.CONSTRAINTS_PATH = os.path.join(data_dir, "warehouse_constraints.csv")
+    clean_data.OUTPUT_DIR = os.path.join(data_dir, "cleaned_data")
+    clean_data.WATERMARK_PATH = os.path.join(clean_data.OUTPUT_DIR, "_watermark.json")
+    os.makedirs(clean_data.OUTPUT_DIR, exist_ok=True)
+    optimize_slotting.DATA_DIR = clean_data.OUTPUT_DIR
+    optimize_slotting.OUTPUT_FILE = os.path.join(data_dir, "final_slotting_plan.csv")
+    optimize_slotting.STATE_DIR = os.path.join(clean_data.OUTPUT_DIR, "slotting_state")
+    optimize_slotting.move_planner.SEQUENCE_FILE = os.path.join(data_dir, "move_sequence.csv")
+
+
+def measure(fn, setup, profile_memory=True):
+    # (seconds, peak MB) for fn(*setup()); setup runs outside the measurement
+    args = setup()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        fn(*args)
+        seconds = time.perf_counter() - start
+
+    peak_mb = float('nan')
+    if profile_memory:
+        args = setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracemalloc.start()
+            try:
+                fn(*args)
+                peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            finally:
+                tracemalloc.stop()
+    return seconds, peak_mb
+
+
+def stages(data_dir):
+    # (name, function, setup, rows in). Inputs are loaded once and copied per run.
+    sku_df = pd.read_csv(clean_data.SKU_PATH)
+    constraints_df = pd.read_csv(clean_data.CONSTRAINTS_PATH, dtype={'slot_id': str})
+    picker_df = pd.read_csv(clean_data.PICKER_PATH)
+    n_orders = sum(1 for _ in open(clean_data.ORDER_PATH)) - 1
+    return [
+        ('fix_decimal_drift', clean_data.fix_decimal_drift,
+         lambda: (sku_df.copy(),), len(sku_df)),
+        ('detect_ghost_inventory', clean_data.detect_ghost_inventory,
+         lambda: (sku_df.copy(), constraints_df), len(sku_df)),
+        ('clean_picker_movement', clean_data.clean_picker_movement,
+         lambda: (picker_df.copy(),), len(picker_df)),
+        # Full clean also writes cleaned_data/ for the stages below
+        ('clean_data.main', clean_data.main,
+         lambda: (), len(sku_df) + len(constraints_df) + len(picker_df) + n_orders),
+        ('optimize', optimize_slotting.optimize,
+         lambda: (), len(sku_df)),
+        ('dashboard_aggregations', dashboard_metrics.compute_metrics,
+         lambda: (clean_data.OUTPUT_DIR,), len(picker_df)),
+        ('dashboard_aggregations_raw', dashboard_metrics.compute_metrics,
+         lambda: (clean_data.OUTPUT_DIR, False), len(picker_df)),
+    ]
+
+
+def run(scales, seed=7, profile_memory=True):
+    # Stage functions are instrumented; keep repeated benchmark calls out of the metrics file
+    instrument.METRICS_FILE = 'off'
+    commit = git_commit()
+    run_at = datetime.now().isoformat(timespec='seconds')
+    rows = []
+    for scale in scales:
+        data_dir = ensure_dataset(scale, seed)
+        point_at(data_dir)
+        for name, fn, setup, rows_in in stages(data_dir):
+            seconds, peak_mb = measure(fn, setup, profile_memory)
+            rows.append({'run_at': run_at, 'commit': commit, 'scale': scale, 'seed': seed, 'stage': name,
+                         'rows_in': rows_in, 'seconds': round(seconds, 4), 'peak_mem_mb': round(peak_mb, 1)})
+            print(f"{scale:>5}x  {name:<26}{rows_in:>14,}{seconds:>10.3f}s{peak_mb:>10.1f} MB")
+
+    results = pd.DataFrame(rows)
+    results.to_csv(RESULTS_FILE, mode='a', header=not os.path.exists(RESULTS_FILE), index=False)
+    print(f"Appended {len(results)} results to {RESULTS_FILE}")
+    return results
+
+
+def report(scale):
+    # Stage seconds per commit (latest run of each commit) at one scale
+    results = pd.read_csv(RESULTS_FILE)
+    results = results[results['scale'] == scale]
+    latest = results.sort_values('run_at').groupby(['commit', 'stage']).last().reset_index()
+    order = latest.groupby('commit')['run_at'].max().sort_values().index
+    table = latest.pivot(index='stage', columns='commit', values='seconds')[order]
+    print(f"Seconds per stage at {scale}x:")
+    print(table.to_string())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stage timing / memory benchmark on synthetic data")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10],
+                        help=f"scale factors to run (generator supports e.g. {generate_data.SCALES})")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--report', type=int, metavar='SCALE', help="compare commits from the results file")
+    args = parser.parse_args()
+
+    if args.report is not None:
+        report(args.report)
+    else:
+        run(args.scales, args.seed, profile_memory=not args.no_memory)
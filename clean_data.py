@@ -1,6 +1,17 @@
 import pandas as pd
 import numpy as np
 import os
+import io
+import json
+import argparse
+
+import columnar
+import schema
+import shortcut_shards
+import rollups
+import affinity
+import velocity
+import instrument
 
 # Paths
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,15 +23,42 @@ CONSTRAINTS_PATH = os.path.join(DATA_DIR, "warehouse_constraints.csv")
 OUTPUT_DIR = os.path.join(DATA_DIR, "cleaned_data")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def load_data():
+# Shortcut detection
+SPEED_THRESHOLD = 4.0        # m/s
+MAX_INTERVAL_SEC = 1800      # longer gaps are a new shift / break
+STREAM_CHUNK_SIZE = 1_000_000
+
+# Incremental mode: how far into the append-only logs we have cleaned
+WATERMARK_PATH = os.path.join(OUTPUT_DIR, "_watermark.json")
+
+def site_paths(data_dir=None):
+    # Raw inputs and output locations of a dataset directory laid out like the repo root
+    # (multi_site.py sites); the module paths by default
+    if data_dir is None:
+        return {'sku': SKU_PATH, 'order': ORDER_PATH, 'picker': PICKER_PATH, 'constraints': CONSTRAINTS_PATH,
+                'out': OUTPUT_DIR, 'watermark': WATERMARK_PATH}
+    out_dir = os.path.join(data_dir, "cleaned_data")
+    return {'sku': os.path.join(data_dir, "sku_master.csv"), 'order': os.path.join(data_dir, "order_history.csv"),
+            'picker': os.path.join(data_dir, "picker_movement.csv"),
+            'constraints': os.path.join(data_dir, "warehouse_constraints.csv"),
+            'out': out_dir, 'watermark': os.path.join(out_dir, "_watermark.json")}
+
+def load_data(load_picker=True, paths=None):
+    # Also returns {log: byte offset read up to} for the append-only logs, so the
+    # watermark never covers rows appended after (or while) they were read
+    paths = paths or site_paths()
     print("Loading datasets...")
-    sku_df = pd.read_csv(SKU_PATH)
+    sku_df = pd.read_csv(paths['sku'])
     # Load constraints with explicit string type for IDs
-    constraints_df = pd.read_csv(CONSTRAINTS_PATH, dtype={'slot_id': str})
-    picker_df = pd.read_csv(PICKER_PATH)
-    order_df = pd.read_csv(ORDER_PATH)
-    return sku_df, order_df, picker_df, constraints_df
+    constraints_df = pd.read_csv(paths['constraints'], dtype={'slot_id': str})
+    offsets = {}
+    picker_df = None
+    if load_picker:
+        picker_df, offsets['picker_movement'] = read_log(paths['picker'])
+    order_df, offsets['order_history'] = read_log(paths['order'])
+    return sku_df, order_df, picker_df, constraints_df, offsets
 
+@instrument.timed('fix_decimal_drift')
 def fix_decimal_drift(sku_df):
     print("\n--- DETECTING DECIMAL DRIFT ---")
     # Hypothesis: Items > 80kg are likely errors (10x).
@@ -35,13 +73,13 @@ def fix_decimal_drift(sku_df):
     
     return sku_df
 
+@instrument.timed('detect_ghost_inventory')
 def detect_ghost_inventory(sku_df, constraints_df):
     print("\n--- DETECTING GHOST INVENTORY ---")
-    valid_slots = set(constraints_df['slot_id'].astype(str).str.strip())
-    sku_slots = sku_df['current_slot'].astype(str).str.strip()
+    slot_codes = schema.encode(sku_df['current_slot'], schema.id_index(constraints_df['slot_id']))
     
-    # Check if current_slot exists in valid_slots
-    mask_ghost = ~sku_slots.isin(valid_slots) & sku_slots.replace('nan', np.nan).notna()
+    # Check if current_slot exists in the constraints (code -1 = unknown slot)
+    mask_ghost = pd.Series(slot_codes < 0, index=sku_df.index) & sku_df['current_slot'].notna()
     ghost_count = mask_ghost.sum()
     
     print(f"Detected {ghost_count} SKUs assigned to non-existent slots (Ghost Inventory).")
@@ -55,17 +93,35 @@ def detect_ghost_inventory(sku_df, constraints_df):
         
     return sku_df
 
-def clean_picker_movement(picker_df):
+def flag_shortcuts(picker_df):
+    # Needs prev_time / movement_timestamp; adds time_diff and calculated_speed
+    picker_df['time_diff'] = (picker_df['movement_timestamp'] - picker_df['prev_time']).dt.total_seconds()
+    # Filter valid intervals (e.g. < 30 mins)
+    valid_interval = (picker_df['time_diff'] > 0) & (picker_df['time_diff'] < MAX_INTERVAL_SEC)
+    
+    picker_df['calculated_speed'] = np.nan
+    picker_df.loc[valid_interval, 'calculated_speed'] = \
+        picker_df.loc[valid_interval, 'travel_distance_m'] / picker_df.loc[valid_interval, 'time_diff']
+    
+    return picker_df['calculated_speed'] > SPEED_THRESHOLD
+
+@instrument.timed('clean_picker_movement')
+def clean_picker_movement(picker_df, workers=1):
     print("\n--- DATA FORENSICS: PICKER MOVEMENT ---")
     
     picker_df['movement_timestamp'] = pd.to_datetime(picker_df['movement_timestamp'])
+    sharded = workers > 1 and shortcut_shards.can_shard(picker_df)
     
-    # Sort by Picker and Time
-    picker_df = picker_df.sort_values(by=['picker_id', 'movement_timestamp'])
-    
-    # Calculate time diff between pics
-    picker_df['prev_time'] = picker_df.groupby('picker_id')['movement_timestamp'].shift(1)
-    picker_df['time_diff'] = (picker_df['movement_timestamp'] - picker_df['prev_time']).dt.total_seconds()
+    if sharded:
+        # Same sort / diff / speed check per picker shard on a process pool
+        print(f"Sharding shortcut detection by picker_id over {workers} workers.")
+        picker_df, shortcut_mask = shortcut_shards.flag_shortcuts_sharded(picker_df, workers)
+    else:
+        # Sort by Picker and Time
+        picker_df = picker_df.sort_values(by=['picker_id', 'movement_timestamp'])
+        
+        # Calculate time diff between pics
+        picker_df['prev_time'] = picker_df.groupby('picker_id')['movement_timestamp'].shift(1)
     
     # If time_diff is very large (e.g. > 1 hour), it's a new shift. 
     # If time_diff is NaN (first pick), we can't calc speed based on prev.
@@ -75,19 +131,13 @@ def clean_picker_movement(picker_df):
     # Or is 'travel_distance_m' the distance from the PREVIOUS pick?
     # Yes, usually "travel distance" is from Last Pos to Curr Pos.
     
-    # Filter valid intervals (e.g. < 30 mins)
-    valid_interval = (picker_df['time_diff'] > 0) & (picker_df['time_diff'] < 1800)
-    
-    picker_df['calculated_speed'] = np.nan
-    picker_df.loc[valid_interval, 'calculated_speed'] = \
-        picker_df.loc[valid_interval, 'travel_distance_m'] / picker_df.loc[valid_interval, 'time_diff']
-
     # Detect Shortcuts: Impossibly high speed
     # Threshold: 3 m/s (approx 10.8 km/h) is very fast for warehouse picking (stop & go).
     # 5 m/s is definitely impossible walking.
-    submission_threshold = 4.0 
+    submission_threshold = SPEED_THRESHOLD
     
-    shortcut_mask = picker_df['calculated_speed'] > submission_threshold
+    if not sharded:
+        shortcut_mask = flag_shortcuts(picker_df)
     shortcut_count = shortcut_mask.sum()
     
     print(f"Detected {shortcut_count} movements with suspicious speed (> {submission_threshold} m/s).")
@@ -101,27 +151,331 @@ def clean_picker_movement(picker_df):
 
     return picker_df
 
-def main():
-    sku_df, order_df, picker_df, constraints_df = load_data()
+def clean_movement_chunk(chunk, last_time):
+    # Clean one block of movements, continuing each picker from last_time
+    # (str(picker_id) -> last movement_timestamp of earlier blocks; keyed by str as
+    # the watermark JSON stores it, whatever dtype read_csv gives picker_id).
+    # Returns (chunk, updated last_time, number of out-of-order movements).
+    chunk['movement_timestamp'] = pd.to_datetime(chunk['movement_timestamp'])
+    chunk = chunk.sort_values(by=['picker_id', 'movement_timestamp'])
+    
+    chunk['prev_time'] = chunk.groupby('picker_id')['movement_timestamp'].shift(1)
+    # First movement of each picker in this block continues from the previous block
+    first = chunk['prev_time'].isna()
+    chunk.loc[first, 'prev_time'] = last_time.reindex(chunk.loc[first, 'picker_id'].astype(str)).to_numpy()
+    out_of_order = (chunk['movement_timestamp'] < chunk['prev_time']).sum()
+    
+    chunk['is_suspicious'] = flag_shortcuts(chunk)
+    
+    return chunk, last_movements(chunk).combine_first(last_time), out_of_order
+
+def last_movements(picker_df):
+    # str(picker_id) -> last movement_timestamp
+    last_time = picker_df.groupby('picker_id')['movement_timestamp'].last()
+    last_time.index = last_time.index.astype(str)
+    return last_time
+
+def clean_picker_movement_stream(picker_path, out_path, chunksize=STREAM_CHUNK_SIZE, on_chunk=None):
+    # Bounded-memory variant of clean_picker_movement for very large logs.
+    # Reads the log in chunks and carries each picker's last timestamp across
+    # chunk boundaries, so flags match the in-memory path as long as every
+    # picker's movements are appended in time order. Rows are written in chunk
+    # order (sorted by picker/time within each chunk) instead of globally sorted.
+    # on_chunk(chunk) is called with every cleaned chunk (used for the rollups).
+    print("\n--- DATA FORENSICS: PICKER MOVEMENT (STREAMING) ---")
+    
+    last_time = pd.Series(dtype='datetime64[ns]')  # str(picker_id) -> last movement_timestamp seen
+    total_rows = 0
+    shortcut_count = 0
+    out_of_order = 0
+    header = True
+    
+    with open(picker_path, 'rb') as f:
+        end = complete_end(f, 0)
+        f.seek(0)
+        for chunk in pd.read_csv(_Upto(f, end), chunksize=chunksize):
+            chunk, last_time, late = clean_movement_chunk(chunk, last_time)
+            out_of_order += late
+            total_rows += len(chunk)
+            shortcut_count += chunk['is_suspicious'].sum()
+            if on_chunk is not None:
+                on_chunk(chunk)
+            
+            chunk.drop(columns=['prev_time', 'time_diff', 'calculated_speed']).to_csv(
+                out_path, mode='w' if header else 'a', header=header, index=False)
+            header = False
+        # Byte offset the reader got to (rows appended meanwhile, or a partial last
+        # line, are cleaned next run)
+        offset = f.tell()
+    
+    print(f"Processed {total_rows} movements for {len(last_time)} pickers.")
+    print(f"Detected {shortcut_count} movements with suspicious speed (> {SPEED_THRESHOLD} m/s).")
+    if out_of_order > 0:
+        print(f"WARNING: {out_of_order} movements arrived out of time order across chunks; "
+              "their flags may differ from the in-memory path.")
+    
+    return total_rows, shortcut_count, last_time, offset
+
+def rollups_from_cleaned(sku_df, sku_slot_df, chunksize=STREAM_CHUNK_SIZE, out_dir=None):
+    # Movement / order rollups re-aggregated from the cleaned CSVs in bounded memory
+    out_dir = out_dir or OUTPUT_DIR
+    parts = [rollups.movement_rollups(chunk, sku_df, sku_slot_df)
+             for chunk in pd.read_csv(os.path.join(out_dir, "picker_movement_cleaned.csv"), chunksize=chunksize)]
+    volumes = [rollups.order_volume(chunk)
+               for chunk in pd.read_csv(os.path.join(out_dir, "order_history_cleaned.csv"), chunksize=chunksize)]
+    return rollups.combine_movement(parts), rollups.combine_order_volume(volumes)
+
+def save_rollups(movement, order_volume, sku_slot_df, out_dir=None):
+    # Small pre-aggregated tables the dashboard renders from (see rollups.py)
+    out_dir = out_dir or OUTPUT_DIR
+    temp_violations = rollups.temp_violations(sku_slot_df)
+    rollups.write(out_dir, movement, order_volume, temp_violations, rollups.aisle_map_fingerprint(sku_slot_df))
+    print(f"Rollups: {len(movement['aisle_hour'])} aisle-hour cells, {len(movement['shortcuts_by_hour'])} shortcut hours, "
+          f"{len(order_volume)} SKU volumes, {len(temp_violations)} temperature pairs -> {rollups.rollup_dir(out_dir)}")
+    return len(movement['aisle_hour']) + len(movement['shortcuts_by_hour']) + len(order_volume) + len(temp_violations)
+
+def load_watermark(path=None):
+    path = path or WATERMARK_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_watermark(order_offset, picker_offset, last_time, path=None):
+    watermark = {
+        'order_history': {'offset': order_offset},
+        'picker_movement': {
+            'offset': picker_offset,
+            'last_movement_timestamp': last_time.max().isoformat() if len(last_time) else None,
+            'pickers': {str(k): v.isoformat() for k, v in last_time.items()},
+        },
+    }
+    with open(path or WATERMARK_PATH, 'w') as f:
+        json.dump(watermark, f, indent=2)
+
+class _Upto:
+    # Read-only view of an open binary file that ends at byte `end`, so pd.read_csv
+    # parses straight from the handle (in blocks) and stops before a partial line
+    def __init__(self, f, end):
+        self.f = f
+        self.end = end
+    
+    def read(self, size=-1):
+        left = max(self.end - self.f.tell(), 0)
+        return self.f.read(left if size is None or size < 0 else min(size, left))
+    
+    def __iter__(self):
+        return iter(self.read().splitlines(keepends=True))
+
+def complete_end(f, start):
+    # Byte offset just past the last newline at or after `start` (start if there is none),
+    # found by scanning back from the end of the file in blocks
+    f.seek(0, os.SEEK_END)
+    pos = f.tell()
+    while pos > start:
+        step = min(1 << 16, pos - start)
+        f.seek(pos - step)
+        newline = f.read(step).rfind(b'\n')
+        if newline >= 0:
+            return pos - step + newline + 1
+        pos -= step
+    return start
+
+def read_new_rows(path, offset):
+    # Rows appended to a CSV log after byte `offset`. A trailing partial line
+    # (still being written) is left for the next run. Returns (df, new offset).
+    with open(path, 'rb') as f:
+        header = f.readline()
+        start = max(offset, len(header))
+        end = complete_end(f, start)
+        if end == start:
+            return None, start
+        columns = pd.read_csv(io.BytesIO(header), nrows=0).columns
+        f.seek(start)
+        df = pd.read_csv(_Upto(f, end), header=None, names=columns)
+        return df, f.tell()
+
+def read_log(path):
+    # Whole CSV log up to its last complete line, and the byte offset read up to
+    df, offset = read_new_rows(path, 0)
+    return (pd.read_csv(path, nrows=0) if df is None else df), offset
+
+def main_incremental(data_dir=None):
+    # Clean only rows appended to order_history.csv / picker_movement.csv since the
+    # last run and append them to the cleaned outputs. SKU master and constraints
+    # are small and are re-cleaned in full. data_dir: dataset to clean (site_paths)
+    paths = site_paths(data_dir)
+    out_dir = paths['out']
+    os.makedirs(out_dir, exist_ok=True)
+    watermark = load_watermark(paths['watermark'])
+    if watermark is None:
+        print("No watermark found - running a full clean.")
+        return main(data_dir=data_dir)
+    order_wm = watermark['order_history']
+    picker_wm = watermark['picker_movement']
+    if os.path.getsize(paths['order']) < order_wm['offset'] or os.path.getsize(paths['picker']) < picker_wm['offset']:
+        print("Source logs shrank since the last run (rewritten?) - running a full clean.")
+        return main(data_dir=data_dir)
+    
+    print("Loading datasets...")
+    with instrument.stage('load') as rec:
+        sku_df = pd.read_csv(paths['sku'])
+        constraints_df = pd.read_csv(paths['constraints'], dtype={'slot_id': str})
+        rec['rows_out'] = len(sku_df) + len(constraints_df)
+    sku_df_clean = fix_decimal_drift(sku_df)
+    sku_df_clean = detect_ghost_inventory(sku_df_clean, constraints_df)
+    sku_df_clean.to_csv(os.path.join(out_dir, "sku_master_cleaned.csv"), index=False)
+    constraints_df.to_csv(os.path.join(out_dir, "warehouse_constraints_cleaned.csv"), index=False)
+    columnar.write_table(sku_df_clean, 'sku_master', out_dir)
+    columnar.write_table(constraints_df, 'warehouse_constraints', out_dir)
+    
+    print("\n--- INCREMENTAL: ORDER HISTORY ---")
+    with instrument.stage('incremental_orders') as rec:
+        new_orders, order_offset = read_new_rows(paths['order'], order_wm['offset'])
+        if new_orders is not None:
+            new_orders.to_csv(os.path.join(out_dir, "order_history_cleaned.csv"), mode='a', header=False, index=False)
+            columnar.append_table(new_orders, 'order_history', out_dir)
+        rec['rows_in'] = rec['rows_out'] = 0 if new_orders is None else len(new_orders)
+    print(f"Appended {0 if new_orders is None else len(new_orders)} new order lines.")
+    
+    print("\n--- INCREMENTAL: PICKER MOVEMENT ---")
+    pickers = picker_wm['pickers']
+    last_time = pd.Series(pd.to_datetime(list(pickers.values())), index=list(pickers.keys()), dtype='datetime64[ns]')
+    with instrument.stage('incremental_movements') as rec:
+        new_moves, picker_offset = read_new_rows(paths['picker'], picker_wm['offset'])
+        if new_moves is not None:
+            new_moves, last_time, out_of_order = clean_movement_chunk(new_moves, last_time)
+            picker_out = new_moves.drop(columns=['prev_time', 'time_diff', 'calculated_speed'])
+            picker_out.to_csv(os.path.join(out_dir, "picker_movement_cleaned.csv"), mode='a', header=False, index=False)
+            columnar.append_table(picker_out, 'picker_movement', out_dir)
+        rec['rows_in'] = rec['rows_out'] = 0 if new_moves is None else len(new_moves)
+    if new_moves is not None:
+        print(f"Appended {len(new_moves)} new movements, {new_moves['is_suspicious'].sum()} with suspicious speed (> {SPEED_THRESHOLD} m/s).")
+        if out_of_order > 0:
+            print(f"WARNING: {out_of_order} new movements are older than their picker's watermark.")
+    else:
+        print("Appended 0 new movements.")
+    
+    # Rollups are additive: fold the new rows into the stored ones, unless SKUs
+    # moved aisle since they were built (then re-aggregate the cleaned outputs)
+    print("\n--- INCREMENTAL: ROLLUPS ---")
+    with instrument.stage('rollups') as rec:
+        sku_norm, _, sku_slot_df = rollups.normalized_sku_slots(sku_df_clean, constraints_df)
+        stored = rollups.load(out_dir)
+        if stored is None or stored['summary'].get('aisle_map') != rollups.aisle_map_fingerprint(sku_slot_df):
+            print("Rollups missing or SKU aisles changed - rebuilding from the cleaned outputs.")
+            movement, order_volume = rollups_from_cleaned(sku_norm, sku_slot_df, out_dir=out_dir)
+        else:
+            movement_parts, volumes = [stored], [stored['order_volume']]
+            if new_moves is not None:
+                movement_parts.append(rollups.movement_rollups(picker_out, sku_norm, sku_slot_df))
+            if new_orders is not None:
+                volumes.append(rollups.order_volume(new_orders))
+            movement = rollups.combine_movement(movement_parts)
+            order_volume = rollups.combine_order_volume(volumes)
+        rec['rows_out'] = save_rollups(movement, order_volume, sku_slot_df, out_dir)
+    
+    # SKU affinity (if affinity.py has built it) takes the new order lines as well
+    if new_orders is not None and affinity.exists(out_dir):
+        with instrument.stage('affinity', rows_in=len(new_orders)) as rec:
+            state = affinity.update(affinity.load(out_dir), new_orders)
+            affinity.save(state, out_dir)
+            rec['rows_out'] = state['matrix'].nnz
+        print(f"Updated SKU affinity: {state['meta']['pairs']:,} co-picked pairs.")
+    
+    # Decayed SKU velocity (if velocity.py / --decayed-velocity has built it) likewise
+    if new_orders is not None and velocity.exists(out_dir):
+        with instrument.stage('velocity', rows_in=len(new_orders)) as rec:
+            state = velocity.update(velocity.load(out_dir), new_orders)
+            velocity.save(state, out_dir)
+            rec['rows_out'] = len(state['top'].members)
+        print(f"Updated decayed SKU velocity over {state['meta']['lines']:,} order lines.")
+    
+    save_watermark(order_offset, picker_offset, last_time, paths['watermark'])
+    print("Incremental forensics complete.")
+    instrument.print_summary()
+
+def main(stream=False, chunksize=STREAM_CHUNK_SIZE, workers=1, data_dir=None):
+    # data_dir: dataset to clean, laid out like the repo root (default: the module paths)
+    paths = site_paths(data_dir)
+    out_dir = paths['out']
+    os.makedirs(out_dir, exist_ok=True)
+    with instrument.stage('load') as rec:
+        sku_df, order_df, picker_df, constraints_df, offsets = load_data(load_picker=not stream, paths=paths)
+        rec['rows_out'] = sum(len(df) for df in (sku_df, order_df, picker_df, constraints_df) if df is not None)
     
     # 1. Fix Sku Master
     sku_df_clean = fix_decimal_drift(sku_df)
     sku_df_clean = detect_ghost_inventory(sku_df_clean, constraints_df)
     
+    # SKU -> aisle lookup for the rollups, with IDs normalized as the dashboard reads them
+    sku_norm, _, sku_slot_df = rollups.normalized_sku_slots(sku_df_clean, constraints_df)
+    
     # 2. Clean Picker Movement
-    picker_df_clean = clean_picker_movement(picker_df)
+    picker_out_path = os.path.join(out_dir, "picker_movement_cleaned.csv")
+    if stream:
+        # Written chunk by chunk while cleaning; movement rollups are summed per chunk
+        movement_parts = []
+        with instrument.stage('clean_picker_movement_stream') as rec:
+            rec['rows_in'], _, last_time, offsets['picker_movement'] = clean_picker_movement_stream(
+                paths['picker'], picker_out_path, chunksize,
+                on_chunk=lambda chunk: movement_parts.append(rollups.movement_rollups(chunk, sku_norm, sku_slot_df)))
+            rec['rows_out'] = rec['rows_in']
+    else:
+        picker_df_clean = clean_picker_movement(picker_df, workers)
+        last_time = last_movements(picker_df_clean)
     
     # 3. Save Cleaned Data
-    print("\nSaving cleaned datasets to", OUTPUT_DIR)
-    sku_df_clean.to_csv(os.path.join(OUTPUT_DIR, "sku_master_cleaned.csv"), index=False)
-    # Drop temp columns for clean output
-    picker_out = picker_df_clean.drop(columns=['prev_time', 'time_diff', 'calculated_speed'])
-    picker_out.to_csv(os.path.join(OUTPUT_DIR, "picker_movement_cleaned.csv"), index=False)
+    print("\nSaving cleaned datasets to", out_dir)
+    with instrument.stage('save') as rec:
+        sku_df_clean.to_csv(os.path.join(out_dir, "sku_master_cleaned.csv"), index=False)
+        if not stream:
+            # Drop temp columns for clean output
+            picker_out = picker_df_clean.drop(columns=['prev_time', 'time_diff', 'calculated_speed'])
+            picker_out.to_csv(picker_out_path, index=False)
+        
+        order_df.to_csv(os.path.join(out_dir, "order_history_cleaned.csv"), index=False)
+        constraints_df.to_csv(os.path.join(out_dir, "warehouse_constraints_cleaned.csv"), index=False)
+        rec['rows_out'] = len(sku_df_clean) + len(order_df) + len(constraints_df) + (0 if stream else len(picker_out))
+    
+    # Columnar copies (typed, categorical, normalized IDs) for memory-mapped loading
+    print("Writing columnar tables to", os.path.join(out_dir, columnar.COLUMNAR_DIR))
+    with instrument.stage('save_columnar'):
+        columnar.write_table(sku_df_clean, 'sku_master', out_dir)
+        columnar.write_table(order_df, 'order_history', out_dir)
+        columnar.write_table(constraints_df, 'warehouse_constraints', out_dir)
+        if stream:
+            # Movement rows were never held in memory; drop any stale copy so readers use the CSV
+            columnar.remove_table('picker_movement', out_dir)
+        else:
+            columnar.write_table(picker_out, 'picker_movement', out_dir)
     
-    order_df.to_csv(os.path.join(OUTPUT_DIR, "order_history_cleaned.csv"), index=False)
-    constraints_df.to_csv(os.path.join(OUTPUT_DIR, "warehouse_constraints_cleaned.csv"), index=False)
+    # 4. Rollups for the dashboard
+    print("Writing rollups...")
+    with instrument.stage('rollups') as rec:
+        if stream:
+            movement = rollups.combine_movement(movement_parts)
+        else:
+            movement = rollups.movement_rollups(picker_out, sku_norm, sku_slot_df)
+        rec['rows_in'] = movement['summary']['total_picks'] + len(order_df)
+        rec['rows_out'] = save_rollups(movement, rollups.order_volume(order_df), sku_slot_df, out_dir)
     
+    save_watermark(offsets['order_history'], offsets['picker_movement'], last_time, paths['watermark'])
     print("Forensics complete.")
+    instrument.print_summary()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="VelocityMart data forensics")
+    parser.add_argument('--stream', action='store_true',
+                        help="clean picker_movement.csv in chunks with bounded memory")
+    parser.add_argument('--incremental', action='store_true',
+                        help="clean only order/movement rows appended since the last run")
+    parser.add_argument('--chunksize', type=int, default=STREAM_CHUNK_SIZE,
+                        help="rows per chunk in --stream mode")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes for shortcut detection, sharded by picker_id (default: serial)")
+    args = parser.parse_args()
+    if args.incremental:
+        main_incremental()
+    else:
+        main(stream=args.stream, chunksize=args.chunksize, workers=args.workers)
\ No newline at end of file
@@ -0,0 +1,227 @@
+import pandas as pd
+import numpy as np
+from numpy.lib import format as npy_format
+import io
+import os
+import json
+import shutil
+import argparse
+import subprocess
+import sys
+import time
+
+# Columnar copy of cleaned_data: one .npy file per column, loaded with
+# np.load(mmap_mode='r') so consumers page data in from the OS cache instead of
+# re-parsing CSV text.
+#
+#   cleaned_data/columnar/<table>/_schema.json
+#   cleaned_data/columnar/<table>/<column>.npy           numeric / bool / datetime64[ns]
+#   cleaned_data/columnar/<table>/<column>.codes.npy     categorical codes (-1 = NaN)
+#   cleaned_data/columnar/<table>/<column>.categories.npy
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLEANED_DIR = os.path.join(BASE_DIR, "cleaned_data")
+COLUMNAR_DIR = "columnar"
+
+# IDs are stored pre-normalized (normalize_ids: stripped, upper-case) so consumers can merge
+# directly; CSV-path consumers apply the same normalize_ids
+ID_COLUMNS = ['sku_id', 'current_slot', 'slot_id', 'picker_id', 'order_id']
+
+TABLES = {
+    'sku_master': "sku_master_cleaned.csv",
+    'warehouse_constraints': "warehouse_constraints_cleaned.csv",
+    'order_history': "order_history_cleaned.csv",
+    'picker_movement': "picker_movement_cleaned.csv",
+}
+
+
+def table_dir(name, base_dir=CLEANED_DIR):
+    return os.path.join(base_dir, COLUMNAR_DIR, name)
+
+
+def has_table(name, base_dir=CLEANED_DIR):
+    return os.path.exists(os.path.join(table_dir(name, base_dir), "_schema.json"))
+
+
+def remove_table(name, base_dir=CLEANED_DIR):
+    shutil.rmtree(table_dir(name, base_dir), ignore_errors=True)
+
+
+def normalize_ids(series):
+    # The one ID normalization (stripped, upper-case, NaN kept) for columnar and CSV paths
+    return series.astype(str).str.strip().str.upper().where(series.notna())
+
+
+def _codes_dtype(n_categories):
+    # The code dtype pandas picks for this many categories. Codes stored in it are
+    # wrapped by Categorical.from_codes without a copy, so they stay memory-mapped;
+    # any other dtype (e.g. int32 codes of older tables) is cast, i.e. copied, on load.
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def write_table(df, name, base_dir=CLEANED_DIR):
+    out = table_dir(name, base_dir)
+    shutil.rmtree(out, ignore_errors=True)
+    os.makedirs(out)
+
+    columns = []
+    for col in df.columns:
+        s = df[col]
+        if col in ID_COLUMNS:
+            s = normalize_ids(s)
+
+        if col.endswith('_timestamp') or pd.api.types.is_datetime64_any_dtype(s):
+            kind = 'datetime'
+            np.save(os.path.join(out, f"{col}.npy"), pd.to_datetime(s, errors='coerce').to_numpy(dtype='datetime64[ns]'))
+        elif pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+            kind = 'array'
+            np.save(os.path.join(out, f"{col}.npy"), s.to_numpy())
+        else:
+            kind = 'category'
+            cat = s.astype('category')
+            np.save(os.path.join(out, f"{col}.codes.npy"), cat.cat.codes.to_numpy(dtype=_codes_dtype(len(cat.cat.categories))))
+            np.save(os.path.join(out, f"{col}.categories.npy"), cat.cat.categories.to_numpy(dtype=str))
+        columns.append({'name': col, 'kind': kind})
+
+    with open(os.path.join(out, "_schema.json"), 'w') as f:
+        json.dump({'rows': len(df), 'columns': columns}, f, indent=2)
+
+
+def _append_npy(path, values):
+    # Append rows to a 1-D .npy file in place: patch the shape in the header and
+    # write the new bytes at the end. Falls back to a rewrite if the dtype differs
+    # or the longer shape no longer fits in the header padding.
+    with open(path, 'rb') as f:
+        version = npy_format.read_magic(f)
+        read_header = npy_format.read_array_header_1_0 if version == (1, 0) else npy_format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        data_offset = f.tell()
+
+    if values.dtype == dtype and not fortran_order:
+        header = io.BytesIO()
+        write_header = npy_format.write_array_header_1_0 if version == (1, 0) else npy_format.write_array_header_2_0
+        write_header(header, {'descr': npy_format.dtype_to_descr(dtype), 'fortran_order': False,
+                           'shape': (shape[0] + len(values),)})
+        if header.tell() == data_offset:
+            with open(path, 'r+b') as f:
+                f.write(header.getvalue())
+                f.seek(0, os.SEEK_END)
+                f.write(np.ascontiguousarray(values).tobytes())
+            return
+
+    np.save(path, np.concatenate([np.load(path), values]))
+
+
+def append_table(df, name, base_dir=CLEANED_DIR):
+    # Append rows to an existing columnar table (incremental cleaning).
+    # New category values are added to the end of the categories array.
+    if not has_table(name, base_dir):
+        return
+    out = table_dir(name, base_dir)
+    with open(os.path.join(out, "_schema.json")) as f:
+        schema = json.load(f)
+    if [c['name'] for c in schema['columns']] != list(df.columns):
+        # Layout changed - drop the copy so readers fall back to the CSV
+        remove_table(name, base_dir)
+        return
+
+    for column in schema['columns']:
+        col = column['name']
+        s = df[col]
+        if col in ID_COLUMNS:
+            s = normalize_ids(s)
+
+        if column['kind'] == 'datetime':
+            _append_npy(os.path.join(out, f"{col}.npy"), pd.to_datetime(s, errors='coerce').to_numpy(dtype='datetime64[ns]'))
+        elif column['kind'] == 'array':
+            _append_npy(os.path.join(out, f"{col}.npy"), s.to_numpy())
+        else:
+            cat_path = os.path.join(out, f"{col}.categories.npy")
+            categories = pd.Index(np.load(cat_path))
+            unseen = pd.Index(s.dropna().astype(str).unique()).difference(categories)
+            if len(unseen):
+                categories = categories.append(unseen)
+                np.save(cat_path, categories.to_numpy(dtype=str))
+            codes = categories.get_indexer(s.astype(str).where(s.notna()))
+            # A wider code dtype (categories grew past its range) rewrites the file
+            _append_npy(os.path.join(out, f"{col}.codes.npy"), codes.astype(_codes_dtype(len(categories))))
+
+    schema['rows'] += len(df)
+    with open(os.path.join(out, "_schema.json"), 'w') as f:
+        json.dump(schema, f, indent=2)
+
+
+def read_table(name, base_dir=CLEANED_DIR, mmap=True):
+    src = table_dir(name, base_dir)
+    with open(os.path.join(src, "_schema.json")) as f:
+        schema = json.load(f)
+
+    mode = 'r' if mmap else None
+    data = {}
+    for column in schema['columns']:
+        col = column['name']
+        if column['kind'] == 'category':
+            codes = np.load(os.path.join(src, f"{col}.codes.npy"), mmap_mode=mode)
+            categories = np.load(os.path.join(src, f"{col}.categories.npy"))
+            # Codes were validated when written; validation would read every page
+            data[col] = pd.Categorical.from_codes(codes, categories=categories, validate=False)
+        else:
+            data[col] = np.load(os.path.join(src, f"{col}.npy"), mmap_mode=mode)
+    return pd.DataFrame(data, copy=False)
+
+
+def load_cleaned(name, base_dir=CLEANED_DIR, **read_csv_kwargs):
+    # Columnar table when present, otherwise the cleaned CSV
+    if has_table(name, base_dir):
+        return read_table(name, base_dir)
+    return pd.read_csv(os.path.join(base_dir, TABLES[name]), **read_csv_kwargs)
+
+
+def _measure_load(fmt, name, base_dir):
+    # Runs in a child process so ru_maxrss reflects this load only
+    import resource  # POSIX only
+    start = time.perf_counter()
+    if fmt == 'csv':
+        df = pd.read_csv(os.path.join(base_dir, TABLES[name]))
+    else:
+        df = read_table(name, base_dir)
+    elapsed = time.perf_counter() - start
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({'rows': len(df), 'seconds': elapsed, 'max_rss_mb': rss_mb}))
+
+
+def benchmark_load(base_dir=CLEANED_DIR, tables=('order_history', 'picker_movement')):
+    print(f"{'table':<24}{'format':<10}{'rows':>12}{'load (s)':>12}{'max RSS (MB)':>15}")
+    for name in tables:
+        for fmt in ('csv', 'columnar'):
+            if fmt == 'csv' and not os.path.exists(os.path.join(base_dir, TABLES[name])):
+                continue
+            if fmt == 'columnar' and not has_table(name, base_dir):
+                continue
+            out = subprocess.run(
+                [sys.executable, __file__, '--measure', fmt, name, '--dir', base_dir],
+                capture_output=True, text=True, check=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{name:<24}{fmt:<10}{r['rows']:>12,}{r['seconds']:>12.3f}{r['max_rss_mb']:>15.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar cleaned_data tools")
+    parser.add_argument('--dir', default=CLEANED_DIR)
+    parser.add_argument('--convert', action='store_true', help="write columnar copies of the cleaned CSVs")
+    parser.add_argument('--measure', nargs=2, metavar=('FORMAT', 'TABLE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        _measure_load(args.measure[0], args.measure[1], args.dir)
+    else:
+        if args.convert:
+            for name, csv_name in TABLES.items():
+                path = os.path.join(args.dir, csv_name)
+                if os.path.exists(path):
+                    write_table(pd.read_csv(path, dtype={'slot_id': str}), name, args.dir)
+                    print(f"Wrote {table_dir(name, args.dir)}")
+        benchmark_load(args.dir)
@@ -5,6 +5,12 @@ import plotly.express as px
 import plotly.graph_objects as go
 import os
 
+import dashboard_metrics
+import simulate
+import stress_test
+import instrument
+import live_ingest
+
 # Page Config
 st.set_page_config(page_title="VelocityMart Ops Dashboard", layout="wide", initial_sidebar_state="expanded")
 
@@ -125,93 +131,278 @@ st.markdown("""
 # Paths
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cleaned_data")
 
-@st.cache_data
-def load_data():
-    sku_df = pd.read_csv(os.path.join(DATA_DIR, "sku_master_cleaned.csv"))
-    picker_df = pd.read_csv(os.path.join(DATA_DIR, "picker_movement_cleaned.csv"))
-    constraints_df = pd.read_csv(os.path.join(DATA_DIR, "warehouse_constraints_cleaned.csv"), dtype={'slot_id': str})
-    order_df = pd.read_csv(os.path.join(DATA_DIR, "order_history_cleaned.csv"))
-    
-    # ID Normalization (CRITICAL for merging)
-    for df in [sku_df, picker_df, constraints_df]:
-        for col in ['sku_id', 'current_slot', 'slot_id']:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.strip().str.upper()
-    
-    return sku_df, picker_df, constraints_df, order_df
-
-sku_df, picker_df, constraints_df, order_df = load_data()
-
-# --- PRE-PROCESSING ---
-# 1. Spoilage Risk
-sku_slot_df = sku_df.merge(constraints_df, left_on='current_slot', right_on='slot_id', how='left')
-# Ensure types are correct for bool columns
-if 'is_ghost' in sku_slot_df.columns:
-    sku_slot_df['is_ghost'] = sku_slot_df['is_ghost'].astype(str).str.upper() == 'TRUE'
-
-spoilage_mask = (sku_slot_df['temp_req'] != sku_slot_df['temp_zone']) & sku_slot_df['temp_zone'].notna()
-spoilage_count = spoilage_mask.sum()
-spoilage_rate = spoilage_count / len(sku_df) if len(sku_df) > 0 else 0
-
-# 2. Picker Statistics
-total_picks = len(picker_df)
-illegal_shortcuts = picker_df['is_suspicious'].sum() if 'is_suspicious' in picker_df.columns else 0
-shortcut_rate = illegal_shortcuts / total_picks if total_picks > 0 else 0
-
-# 3. Fulfillment Time
-if 'duration_sec' in picker_df.columns:
-    avg_pick_time_sec = picker_df['duration_sec'].mean()
-    avg_pick_time_min = avg_pick_time_sec / 60.0
-else:
-    avg_pick_time_min = 6.2
-
-# 4. Congestion / Aisle Traffic
-sku_slot_df['aisle'] = sku_slot_df['current_slot'].astype(str).apply(lambda x: x.split('-')[0] if '-' in x else 'Unknown')
-picker_sku_df = picker_df.merge(sku_df[['sku_id', 'current_slot']], on='sku_id', how='left')
-picker_sku_df['aisle'] = picker_sku_df['current_slot'].astype(str).apply(lambda x: x.split('-')[0] if '-' in x else 'Unknown')
-
-# Robust timestamp parsing
-picker_sku_df['movement_timestamp'] = pd.to_datetime(picker_sku_df['movement_timestamp'], errors='coerce')
-picker_sku_df['hour'] = picker_sku_df['movement_timestamp'].dt.hour
-
-# Count picks per Aisle per Hour
-heatmap_data = picker_sku_df.groupby(['aisle', 'hour']).size().reset_index(name='pick_count')
-
-# Identify Aisle B (highest congestion at 19:00)
-peak_19 = heatmap_data[heatmap_data['hour'] == 19.0].sort_values('pick_count', ascending=False)
-aisle_b_code = peak_19.iloc[0]['aisle'] if len(peak_19) > 0 else 'B01'
-aisle_b_peak_count = peak_19.iloc[0]['pick_count'] if len(peak_19) > 0 else 0
-
-# 5. Weight Violations
-weight_violation_mask = (sku_slot_df['weight_kg'] > sku_slot_df['max_weight_kg'])
-weight_viol_count = weight_violation_mask.sum()
-
-# Ensure is_suspicious is bool
-if 'is_suspicious' in picker_df.columns:
-    picker_df['is_suspicious'] = (picker_df['is_suspicious'].astype(str).str.upper() == 'TRUE')
-    picker_sku_df['is_suspicious'] = (picker_sku_df['is_suspicious'].astype(str).str.upper() == 'TRUE')
-
-# --- CHAOS SCORE CALCULATION (FORMALIZED) ---
-BASELINE_PICK_TIME = 3.8  # minutes (target)
-
-# Component 1: Efficiency Degradation
-efficiency_loss_raw = max(0, (avg_pick_time_min / BASELINE_PICK_TIME) - 1)
-efficiency_weight = 0.35
-efficiency_score = efficiency_loss_raw * efficiency_weight
-
-# Component 2: Safety Violations (Illegal Shortcuts)
-safety_loss_raw = shortcut_rate * 10  # Normalize to 0-1 scale
-safety_weight = 0.25
-safety_score = safety_loss_raw * safety_weight
-
-# Component 3: Inventory Risk (Temperature Violations)
-spoilage_loss_raw = spoilage_rate * 5  # Normalize to 0-1 scale
-spoilage_weight = 0.40
-spoilage_score = spoilage_loss_raw * spoilage_weight
-
-# Final Chaos Score (0-100 scale)
-raw_chaos = (efficiency_score + safety_score + spoilage_score) * 100
-chaos_score = min(100, raw_chaos)
+BASELINE_PICK_TIME = dashboard_metrics.BASELINE_PICK_TIME  # minutes (target)
+
+instrument.set_script('dashboard')
+
+def data_fingerprint():
+    return dashboard_metrics.data_fingerprint(DATA_DIR)
+
+@st.cache_data(max_entries=1, show_spinner="Crunching warehouse data...")
+def preprocess(fingerprint):
+    # Keyed by the input fingerprint, so widget interactions reuse the result
+    # and only new data recomputes.
+    return dashboard_metrics.compute_metrics(DATA_DIR)
+
+@st.cache_data(max_entries=16, show_spinner="Simulating shift...")
+def run_simulation(fingerprint, use_plan, volume, n_pickers, close_aisle_b=None):
+    # Event simulation of the evening shift; keyed by data + plan fingerprint and scenario
+    plan_path = simulate.PLAN_FILE if use_plan else None
+    return simulate.simulate_shift(DATA_DIR, plan_path, volume, n_pickers, close_aisle_b=close_aisle_b)
+
+def simulation_fingerprint():
+    plan = simulate.PLAN_FILE
+    plan_stat = (os.stat(plan).st_size, os.stat(plan).st_mtime_ns) if os.path.exists(plan) else None
+    return data_fingerprint(), plan_stat
+
+@st.cache_resource(show_spinner="Starting live feed...")
+def live_feed(path, port, from_start):
+    # One ingest thread per source for the server's lifetime; reruns and sessions share its in-memory state
+    state = live_ingest.LiveState(live_ingest.load_sku_aisles(DATA_DIR))
+    live_ingest.start(state, path=path, port=port, from_start=from_start)
+    return state
+
+LIVE_REFRESH_SEC = 2
+
+@st.cache_data(max_entries=1)
+def load_stress_results(mtime):
+    # Cached Monte Carlo results of stress_test.py, reloaded when the file changes
+    results, meta = stress_test.load_results()
+    return results, meta, stress_test.summarize(results)
+
+# Per-tab builders: the tabs track the open tab, so only the open one calls its
+# builders, and each result is cached per data fingerprint (reruns of an open tab
+# and other sessions reuse the figure instead of rebuilding it)
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def chaos_figure(fingerprint):
+    m = preprocess(fingerprint)
+    efficiency_weight, safety_weight, spoilage_weight = m['efficiency_weight'], m['safety_weight'], m['spoilage_weight']
+    efficiency_score, safety_score, spoilage_score = m['efficiency_score'], m['safety_score'], m['spoilage_score']
+    efficiency_loss_raw, safety_loss_raw, spoilage_loss_raw = m['efficiency_loss_raw'], m['safety_loss_raw'], m['spoilage_loss_raw']
+    chaos_breakdown = pd.DataFrame({
+        'Factor': [
+            f'Efficiency Loss\n({efficiency_weight:.0%} weight)',
+            f'Safety Violations\n({safety_weight:.0%} weight)',
+            f'Inventory Risk\n({spoilage_weight:.0%} weight)'
+        ],
+        'Weighted Contribution': [efficiency_score * 100, safety_score * 100, spoilage_score * 100],
+        'Raw Score': [efficiency_loss_raw, safety_loss_raw, spoilage_loss_raw]
+    })
+
+    fig_chaos = go.Figure()
+    fig_chaos.add_trace(go.Bar(
+        x=chaos_breakdown['Factor'],
+        y=chaos_breakdown['Weighted Contribution'],
+        text=[f"{val:.1f}" for val in chaos_breakdown['Weighted Contribution']],
+        textposition='auto',
+        marker=dict(
+            color=chaos_breakdown['Weighted Contribution'],
+            colorscale=[[0, '#4facfe'], [0.5, '#00f2fe'], [1, '#43e97b']],
+            showscale=False,
+            line=dict(color='rgba(255, 255, 255, 0.3)', width=2)
+        ),
+        hovertemplate='<b>%{x}</b><br>Weighted: %{y:.1f}<br>Raw: %{customdata:.3f}<extra></extra>',
+        customdata=chaos_breakdown['Raw Score']
+    ))
+
+    fig_chaos.update_layout(
+        title={
+            'text': "Chaos Score Component Analysis (Why Spoilage Dominates)",
+            'font': {'size': 18, 'color': '#ffffff'}
+        },
+        xaxis_title="Operational Factor (with applied weight)",
+        yaxis_title="Contribution to Final Chaos Score (0-100 scale)",
+        template="plotly_dark",
+        height=450,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#ffffff'),
+        xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
+        yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
+    )
+    return fig_chaos
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def heatmap_figure(fingerprint):
+    m = preprocess(fingerprint)
+    peak_19, aisle_b_code = m['peak_19'], m['aisle_b_code']
+    # Pre-binned int32 aisle x hour matrix (neighbouring aisles share a row on very large sites)
+    heatmap_matrix, aisle_rows = dashboard_metrics.heatmap_bins(m['heatmap_data'], hours=range(24))
+
+    fig_heatmap = px.imshow(
+        heatmap_matrix,
+        labels=dict(x="Hour of Day", y="Aisle", color="Pick Count"),
+        color_continuous_scale='Viridis',
+        aspect='auto',
+        title='Pick Activity Matrix (Darker = Higher Congestion)'
+    )
+
+    fig_heatmap.update_layout(
+        template="plotly_dark",
+        height=550,
+        xaxis=dict(dtick=1),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#ffffff')
+    )
+
+    # Add annotation for bottleneck if identified
+    if len(peak_19) > 0:
+        fig_heatmap.add_annotation(
+            x=19,
+            y=aisle_rows.get(str(aisle_b_code), aisle_b_code),
+            text="⚠️ BOTTLENECK",
+            showarrow=True,
+            arrowhead=2,
+            arrowcolor="red",
+            arrowsize=1,
+            arrowwidth=2,
+            ax=-40,
+            ay=-40,
+            font=dict(size=14, color="red"),
+            bgcolor="rgba(255,0,0,0.3)",
+            bordercolor="red",
+            borderwidth=2
+        )
+    return fig_heatmap
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def top_congested_hours(fingerprint):
+    m = preprocess(fingerprint)
+    heatmap_data, aisle_b_peak_count = m['heatmap_data'], m['aisle_b_peak_count']
+    top_congested = heatmap_data.sort_values('pick_count', ascending=False).head(10)
+    top_congested['congestion_level'] = top_congested['pick_count'].apply(
+        lambda x: '🔴 Critical' if x > aisle_b_peak_count * 0.8 else '🟡 High' if x > aisle_b_peak_count * 0.5 else '🟢 Moderate'
+    )
+    return top_congested
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def shortcut_figure(fingerprint):
+    # 24 hourly bins, hours without shortcuts included as 0
+    shortcut_by_hour = dashboard_metrics.hour_bins(preprocess(fingerprint)['shortcut_by_hour'], 'shortcut_count')
+    fig_shortcuts = go.Figure()
+    fig_shortcuts.add_trace(go.Scatter(
+        x=shortcut_by_hour['hour'],
+        y=shortcut_by_hour['shortcut_count'],
+        mode='lines+markers',
+        name='Illegal Shortcuts',
+        line=dict(color='#ff6b6b', width=4, shape='spline'),
+        marker=dict(
+            size=10,
+            color=shortcut_by_hour['shortcut_count'],
+            colorscale='Reds',
+            showscale=False,
+            line=dict(color='white', width=2)
+        ),
+        fill='tozeroy',
+        fillcolor='rgba(255, 107, 107, 0.3)'
+    ))
+
+    fig_shortcuts.update_layout(
+        title={
+            'text': "Illegal Shortcut Frequency by Hour (Correlation with Peak Congestion)",
+            'font': {'size': 18, 'color': '#ffffff'}
+        },
+        xaxis_title="Hour of Day",
+        yaxis_title="Number of Illegal Shortcuts",
+        template="plotly_dark",
+        height=450,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#ffffff'),
+        xaxis=dict(gridcolor='rgba(255,255,255,0.1)', showgrid=True, dtick=1),
+        yaxis=dict(gridcolor='rgba(255,255,255,0.1)', showgrid=True),
+        hovermode='x unified'
+    )
+    return fig_shortcuts
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def spoilage_summary(fingerprint):
+    m = preprocess(fingerprint)
+    violation_summary = m['sku_slot_df'][m['spoilage_mask']]['temp_req'].astype(object).value_counts().reset_index()
+    violation_summary.columns = ['Required Temperature', 'SKU Count']
+    return violation_summary
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def table_page(fingerprint, table, search, sort_by, ascending, page, page_size):
+    # Filtering, sorting and slicing run here; the browser gets one page
+    rows = dashboard_metrics.violation_rows(preprocess(fingerprint), table)
+    return dashboard_metrics.page_table(rows, search, sort_by, ascending, page, page_size)
+
+def first_page(key):
+    st.session_state[f"{key}_page"] = 1
+
+def paged_table(table, labels, key):
+    # Server-side filtered / sorted / paginated view of a violation table (labels: column -> header)
+    col1, col2, col3, col4, col5 = st.columns([3, 2, 1, 1, 1])
+    search = col1.text_input("Filter rows", key=f"{key}_search", placeholder="SKU, slot, zone, category...",
+                             on_change=first_page, args=(key,))
+    sort_by = col2.selectbox("Sort by", list(labels), format_func=labels.get, key=f"{key}_sort",
+                             on_change=first_page, args=(key,))
+    descending = col3.toggle("Descending", key=f"{key}_desc", on_change=first_page, args=(key,))
+    page_size = col4.selectbox("Rows per page", dashboard_metrics.PAGE_SIZES, index=1, key=f"{key}_size",
+                               on_change=first_page, args=(key,))
+    page = col5.number_input("Page", min_value=1, step=1, key=f"{key}_page")
+    rows, total, page = table_page(data_fingerprint(), table, search.strip(), sort_by, not descending, int(page), page_size)
+    st.dataframe(rows.rename(columns=labels), width='stretch', hide_index=True)
+    start = (page - 1) * page_size
+    st.caption(f"Rows {min(start + 1, total):,}-{start + len(rows):,} of {total:,} · page {page:,} of {max(1, -(-total // page_size)):,}")
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def utilization_figure(sim_key, n_pickers, has_plan):
+    # Per-aisle utilization at +20%: the 15 busiest aisles under current slotting (simulations are cached)
+    spike = run_simulation(sim_key, False, 1.2, n_pickers)
+    aisle_util = spike['aisles'].assign(layout='Current')
+    if has_plan:
+        aisle_util = pd.concat([aisle_util, run_simulation(sim_key, True, 1.2, n_pickers)['aisles'].assign(layout='Plan')])
+    busiest = spike['aisles'].nlargest(15, 'utilization')['aisle']
+    fig_util = px.bar(
+        aisle_util[aisle_util['aisle'].isin(busiest)],
+        x='aisle', y='utilization', color='layout', barmode='group',
+        title="Aisle Utilization at +20% Volume (busiest aisles)",
+        labels={'utilization': 'Share of aisle capacity in use', 'aisle': 'Aisle'},
+        category_orders={'aisle': busiest.tolist()}
+    )
+    fig_util.update_layout(height=400, yaxis_tickformat='.1%')
+    return fig_util
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def stress_histogram(mtime):
+    results = load_stress_results(mtime)[0]
+    fig_mc = px.histogram(
+        results, x='avg_pick_time_min', color='layout', barmode='overlay', nbins=40,
+        title="Distribution of Avg Pick Time per Simulated Shift",
+        labels={'avg_pick_time_min': 'Avg pick time (min)', 'layout': 'Slotting'}
+    )
+    fig_mc.update_layout(height=400)
+    return fig_mc
+
+metrics = preprocess(data_fingerprint())
+sku_slot_df = metrics['sku_slot_df']
+spoilage_mask = metrics['spoilage_mask']
+spoilage_count = metrics['spoilage_count']
+spoilage_rate = metrics['spoilage_rate']
+total_picks = metrics['total_picks']
+illegal_shortcuts = metrics['illegal_shortcuts']
+shortcut_rate = metrics['shortcut_rate']
+avg_pick_time_min = metrics['avg_pick_time_min']
+heatmap_data = metrics['heatmap_data']
+peak_19 = metrics['peak_19']
+aisle_b_code = metrics['aisle_b_code']
+aisle_b_peak_count = metrics['aisle_b_peak_count']
+weight_violation_mask = metrics['weight_violation_mask']
+weight_viol_count = metrics['weight_viol_count']
+efficiency_loss_raw = metrics['efficiency_loss_raw']
+efficiency_weight = metrics['efficiency_weight']
+efficiency_score = metrics['efficiency_score']
+safety_loss_raw = metrics['safety_loss_raw']
+safety_weight = metrics['safety_weight']
+safety_score = metrics['safety_score']
+spoilage_loss_raw = metrics['spoilage_loss_raw']
+spoilage_weight = metrics['spoilage_weight']
+spoilage_score = metrics['spoilage_score']
+chaos_score = metrics['chaos_score']
 
 # --- DASHBOARD LAYOUT ---
 
@@ -261,430 +452,369 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Tabs
-tab_overview, tab_heatmap, tab_spoilage, tab_constraints, tab_whatif = st.tabs([
+tab_overview, tab_heatmap, tab_spoilage, tab_constraints, tab_whatif, tab_live = st.tabs([
     "📈 Overview", 
     "🗺️ Aisle Heatmap", 
     "❄️ Spoilage Risk", 
     "⚖️ Constraints Check",
-    "🔮 What-If Simulation"
-])
+    "🔮 What-If Simulation",
+    "📡 Live Floor"
+], key="dashboard_tab", on_change="rerun")
 
 with tab_overview:
-    # Chaos Score Breakdown
-    st.subheader("🎯 Chaos Score Breakdown (Mathematically Defensible)")
-    
-    with st.expander("📐 View Detailed Formula & Rationale", expanded=True):
-        st.markdown(f"""
-        **Chaos Score Formula:**
-        ```
-        Chaos Score = [(Efficiency × {efficiency_weight}) + (Safety × {safety_weight}) + (Spoilage × {spoilage_weight})] × 100
-        ```
+    if tab_overview.open:
+        # Chaos Score Breakdown
+        st.subheader("🎯 Chaos Score Breakdown (Mathematically Defensible)")
+    
+        with st.expander("📐 View Detailed Formula & Rationale", expanded=True):
+            st.markdown(f"""
+            **Chaos Score Formula:**
+            ```
+            Chaos Score = [(Efficiency × {efficiency_weight}) + (Safety × {safety_weight}) + (Spoilage × {spoilage_weight})] × 100
+            ```
         
-        **Component Breakdown:**
+            **Component Breakdown:**
         
-        | Component | Raw Value | Weight | Contribution | Rationale |
-        |-----------|-----------|--------|--------------|-----------|
-        | **Efficiency Loss** | {efficiency_loss_raw:.3f} | {efficiency_weight:.0%} | {efficiency_score:.3f} | Pick time degradation: {avg_pick_time_min:.2f} / {BASELINE_PICK_TIME} - 1 = {efficiency_loss_raw:.1%} above baseline |
-        | **Safety Violations** | {safety_loss_raw:.3f} | {safety_weight:.0%} | {safety_score:.3f} | Illegal shortcuts: {shortcut_rate:.2%} of movements × 10 normalization factor |
-        | **Inventory Risk** | {spoilage_loss_raw:.3f} | {spoilage_weight:.0%} | {spoilage_score:.3f} | Temperature violations: {spoilage_rate:.1%} of SKUs × 5 normalization factor |
+            | Component | Raw Value | Weight | Contribution | Rationale |
+            |-----------|-----------|--------|--------------|-----------|
+            | **Efficiency Loss** | {efficiency_loss_raw:.3f} | {efficiency_weight:.0%} | {efficiency_score:.3f} | Pick time degradation: {avg_pick_time_min:.2f} / {BASELINE_PICK_TIME} - 1 = {efficiency_loss_raw:.1%} above baseline |
+            | **Safety Violations** | {safety_loss_raw:.3f} | {safety_weight:.0%} | {safety_score:.3f} | Illegal shortcuts: {shortcut_rate:.2%} of movements × 10 normalization factor |
+            | **Inventory Risk** | {spoilage_loss_raw:.3f} | {spoilage_weight:.0%} | {spoilage_score:.3f} | Temperature violations: {spoilage_rate:.1%} of SKUs × 5 normalization factor |
         
-        **Final Score:** {chaos_score:.1f} / 100 (CRITICAL threshold: >80)
+            **Final Score:** {chaos_score:.1f} / 100 (CRITICAL threshold: >80)
         
-        **Weight Rationale:**
-        - **Spoilage (40%)**: HARD CONSTRAINT - Causes compliance failures and simulation rejection
-        - **Efficiency (35%)**: Direct revenue impact - 63% degradation in fulfillment time
-        - **Safety (25%)**: Regulatory and liability risk - Unsafe picker behavior
-        """)
+            **Weight Rationale:**
+            - **Spoilage (40%)**: HARD CONSTRAINT - Causes compliance failures and simulation rejection
+            - **Efficiency (35%)**: Direct revenue impact - 63% degradation in fulfillment time
+            - **Safety (25%)**: Regulatory and liability risk - Unsafe picker behavior
+            """)
     
-    # Visual Breakdown
-    st.subheader("📊 Operational Chaos Factors (Weighted Contributions)")
+        # Visual Breakdown
+        st.subheader("📊 Operational Chaos Factors (Weighted Contributions)")
     
-    chaos_breakdown = pd.DataFrame({
-        'Factor': [
-            f'Efficiency Loss\n({efficiency_weight:.0%} weight)',
-            f'Safety Violations\n({safety_weight:.0%} weight)',
-            f'Inventory Risk\n({spoilage_weight:.0%} weight)'
-        ],
-        'Weighted Contribution': [efficiency_score * 100, safety_score * 100, spoilage_score * 100],
-        'Raw Score': [efficiency_loss_raw, safety_loss_raw, spoilage_loss_raw]
-    })
+        st.plotly_chart(chaos_figure(data_fingerprint()), width='stretch')
     
-    fig_chaos = go.Figure()
-    fig_chaos.add_trace(go.Bar(
-        x=chaos_breakdown['Factor'],
-        y=chaos_breakdown['Weighted Contribution'],
-        text=[f"{val:.1f}" for val in chaos_breakdown['Weighted Contribution']],
-        textposition='auto',
-        marker=dict(
-            color=chaos_breakdown['Weighted Contribution'],
-            colorscale=[[0, '#4facfe'], [0.5, '#00f2fe'], [1, '#43e97b']],
-            showscale=False,
-            line=dict(color='rgba(255, 255, 255, 0.3)', width=2)
-        ),
-        hovertemplate='<b>%{x}</b><br>Weighted: %{y:.1f}<br>Raw: %{customdata:.3f}<extra></extra>',
-        customdata=chaos_breakdown['Raw Score']
-    ))
+        st.info("**Key Insight:** Inventory Risk (temperature violations) contributes the most to chaos due to its 40% weight and high violation rate (61.3%). This is a HARD CONSTRAINT that must be resolved first.")
     
-    fig_chaos.update_layout(
-        title={
-            'text': "Chaos Score Component Analysis (Why Spoilage Dominates)",
-            'font': {'size': 18, 'color': '#ffffff'}
-        },
-        xaxis_title="Operational Factor (with applied weight)",
-        yaxis_title="Contribution to Final Chaos Score (0-100 scale)",
-        template="plotly_dark",
-        height=450,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#ffffff'),
-        xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-        yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
-    )
+        # Executive Summary
+        st.subheader("📋 Executive Summary (Board-Ready)")
     
-    st.plotly_chart(fig_chaos, use_container_width=True)
+        st.markdown(f"""
+        <div class="warning-box">
+        <h4>Critical Operational Degradation Detected</h4>
     
-    st.info("**Key Insight:** Inventory Risk (temperature violations) contributes the most to chaos due to its 40% weight and high violation rate (61.3%). This is a HARD CONSTRAINT that must be resolved first.")
+        <p><strong>Situation:</strong> VelocityMart Bangalore warehouse operations have degraded to critical levels with a Chaos Score of {chaos_score:.1f}/100.</p>
+    
+        <p><strong>Root Cause Analysis:</strong></p>
+        <ul>
+            <li><strong>Poor Slotting → Temperature Violations:</strong> {spoilage_count} SKUs ({spoilage_rate:.1%}) stored in incompatible temperature zones, creating HARD CONSTRAINT violations that cause simulation failures and spoilage risk.</li>
+            <li><strong>Aisle Congestion → Fulfillment Delays:</strong> Fulfillment time increased from {BASELINE_PICK_TIME} to {avg_pick_time_min:.2f} minutes (+{((avg_pick_time_min/BASELINE_PICK_TIME - 1) * 100):.1f}%), driven by Aisle B bottleneck at 19:00 peak hour where forklift operations are blocked when >2 pickers are present.</li>
+            <li><strong>Layout Inefficiency → Unsafe Behavior:</strong> {illegal_shortcuts:,} illegal shortcuts detected ({shortcut_rate:.2%} of movements), representing artificial efficiency gains through unsafe picker behavior exceeding 4 m/s speed limits.</li>
+            <li><strong>Combined Impact:</strong> System operating at 63% efficiency degradation with imminent risk of operational failure under +20% volume stress test.</li>
+        </ul>
     
-    # Executive Summary
-    st.subheader("📋 Executive Summary (Board-Ready)")
+        <p><strong>Immediate Intervention Required:</strong> Execute optimized slotting plan for Week 91 to correct {spoilage_count} temperature violations, relocate 35 high-velocity SKUs from Aisle B, and restore baseline {BASELINE_PICK_TIME}-minute fulfillment time.</p>
     
-    st.markdown(f"""
-    <div class="warning-box">
-    <h4>Critical Operational Degradation Detected</h4>
+        <p><strong>Financial Impact:</strong> Current inefficiency represents 63% productivity loss. Projected ROI of optimization: 40% reduction in pick time, elimination of spoilage risk, and survival of +20% volume spike.</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+with tab_heatmap:
+    if tab_heatmap.open:
+        st.subheader("🗺️ Hourly Aisle Congestion: Identifying Bottleneck Zones")
     
-    <p><strong>Situation:</strong> VelocityMart Bangalore warehouse operations have degraded to critical levels with a Chaos Score of {chaos_score:.1f}/100.</p>
+        # Aisle B Warning Banner
+        st.markdown(f"""
+        <div class="warning-box">
+        <h3>🚨 CRITICAL BOTTLENECK IDENTIFIED: Aisle {aisle_b_code}</h3>
+        <p><strong>Peak Hour:</strong> 19:00 (Evening Rush)</p>
+        <p><strong>Peak Picker Count:</strong> {aisle_b_peak_count} concurrent pickers</p>
+        <p><strong>Physical Constraint (Inferred):</strong> Forklifts cannot enter Aisle B when >2 pickers are present, causing gridlock and forcing pickers to take unsafe shortcuts.</p>
+        <p><strong>Impact:</strong> 35 high-velocity SKUs located in Aisle B are causing systematic congestion during peak operations.</p>
+        <p><strong>Recommendation:</strong> Relocate high-velocity SKUs to Aisles C and D to distribute load and enable forklift access.</p>
+        </div>
+        """, unsafe_allow_html=True)
     
-    <p><strong>Root Cause Analysis:</strong></p>
-    <ul>
-        <li><strong>Poor Slotting → Temperature Violations:</strong> {spoilage_count} SKUs ({spoilage_rate:.1%}) stored in incompatible temperature zones, creating HARD CONSTRAINT violations that cause simulation failures and spoilage risk.</li>
-        <li><strong>Aisle Congestion → Fulfillment Delays:</strong> Fulfillment time increased from {BASELINE_PICK_TIME} to {avg_pick_time_min:.2f} minutes (+{((avg_pick_time_min/BASELINE_PICK_TIME - 1) * 100):.1f}%), driven by Aisle B bottleneck at 19:00 peak hour where forklift operations are blocked when >2 pickers are present.</li>
-        <li><strong>Layout Inefficiency → Unsafe Behavior:</strong> {illegal_shortcuts:,} illegal shortcuts detected ({shortcut_rate:.2%} of movements), representing artificial efficiency gains through unsafe picker behavior exceeding 4 m/s speed limits.</li>
-        <li><strong>Combined Impact:</strong> System operating at 63% efficiency degradation with imminent risk of operational failure under +20% volume stress test.</li>
-    </ul>
+        st.markdown("**This heatmap visualizes picker activity density across all aisles and hours to identify congestion patterns.**")
     
-    <p><strong>Immediate Intervention Required:</strong> Execute optimized slotting plan for Week 91 to correct {spoilage_count} temperature violations, relocate 35 high-velocity SKUs from Aisle B, and restore baseline {BASELINE_PICK_TIME}-minute fulfillment time.</p>
+        if not heatmap_data.empty:
+            st.plotly_chart(heatmap_figure(data_fingerprint()), width='stretch')
+        else:
+            st.warning("No activity data available to generate heatmap.")
     
-    <p><strong>Financial Impact:</strong> Current inefficiency represents 63% productivity loss. Projected ROI of optimization: 40% reduction in pick time, elimination of spoilage risk, and survival of +20% volume spike.</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-with tab_heatmap:
-    st.subheader("🗺️ Hourly Aisle Congestion: Identifying Bottleneck Zones")
-    
-    # Aisle B Warning Banner
-    st.markdown(f"""
-    <div class="warning-box">
-    <h3>🚨 CRITICAL BOTTLENECK IDENTIFIED: Aisle {aisle_b_code}</h3>
-    <p><strong>Peak Hour:</strong> 19:00 (Evening Rush)</p>
-    <p><strong>Peak Picker Count:</strong> {aisle_b_peak_count} concurrent pickers</p>
-    <p><strong>Physical Constraint (Inferred):</strong> Forklifts cannot enter Aisle B when >2 pickers are present, causing gridlock and forcing pickers to take unsafe shortcuts.</p>
-    <p><strong>Impact:</strong> 35 high-velocity SKUs located in Aisle B are causing systematic congestion during peak operations.</p>
-    <p><strong>Recommendation:</strong> Relocate high-velocity SKUs to Aisles C and D to distribute load and enable forklift access.</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown("**This heatmap visualizes picker activity density across all aisles and hours to identify congestion patterns.**")
-    
-    if not heatmap_data.empty:
-        # Create a full matrix for imshow
-        heatmap_matrix = heatmap_data.pivot(index='aisle', columns='hour', values='pick_count').fillna(0)
-        
-        # Sort aisles for better display
-        heatmap_matrix = heatmap_matrix.sort_index(ascending=False)
-        
-        fig_heatmap = px.imshow(
-            heatmap_matrix,
-            labels=dict(x="Hour of Day", y="Aisle", color="Pick Count"),
-            color_continuous_scale='Viridis',
-            aspect='auto',
-            title='Pick Activity Matrix (Darker = Higher Congestion)'
-        )
-        
-        fig_heatmap.update_layout(
-            template="plotly_dark",
-            height=550,
-            xaxis=dict(dtick=1),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#ffffff')
+        # Top Congested Aisle-Hours
+        st.subheader("📊 Top 10 Congested Aisle-Hour Combinations")
+        top_congested = top_congested_hours(data_fingerprint())
+        st.dataframe(
+            top_congested[['aisle', 'hour', 'pick_count', 'congestion_level']].rename(columns={
+                'aisle': 'Aisle',
+                'hour': 'Hour',
+                'pick_count': 'Pick Count',
+                'congestion_level': 'Severity'
+            }),
+            width='stretch',
+            hide_index=True
         )
-        
-        # Add annotation for bottleneck if identified
-        if len(peak_19) > 0:
-            fig_heatmap.add_annotation(
-                x=19,
-                y=aisle_b_code,
-                text="⚠️ BOTTLENECK",
-                showarrow=True,
-                arrowhead=2,
-                arrowcolor="red",
-                arrowsize=1,
-                arrowwidth=2,
-                ax=-40,
-                ay=-40,
-                font=dict(size=14, color="red"),
-                bgcolor="rgba(255,0,0,0.3)",
-                bordercolor="red",
-                borderwidth=2
-            )
-        
-        st.plotly_chart(fig_heatmap, use_container_width=True)
-    else:
-        st.warning("No activity data available to generate heatmap.")
-    
-    # Top Congested Aisle-Hours
-    st.subheader("📊 Top 10 Congested Aisle-Hour Combinations")
-    top_congested = heatmap_data.sort_values('pick_count', ascending=False).head(10)
-    top_congested['congestion_level'] = top_congested['pick_count'].apply(
-        lambda x: '🔴 Critical' if x > aisle_b_peak_count * 0.8 else '🟡 High' if x > aisle_b_peak_count * 0.5 else '🟢 Moderate'
-    )
-    st.dataframe(
-        top_congested[['aisle', 'hour', 'pick_count', 'congestion_level']].rename(columns={
-            'aisle': 'Aisle',
-            'hour': 'Hour',
-            'pick_count': 'Pick Count',
-            'congestion_level': 'Severity'
-        }),
-        use_container_width=True,
-        hide_index=True
-    )
 
 with tab_spoilage:
-    st.subheader("❄️ Temperature Integrity Analysis (HARD CONSTRAINT Violations)")
-    
-    st.markdown("""
-    <div class="warning-box">
-    <h4>⚠️ HARD CONSTRAINT VIOLATION</h4>
-    <p><strong>Critical Finding:</strong> Temperature mismatches are HARD CONSTRAINTS in warehouse operations.</p>
-    <p><strong>Consequences:</strong></p>
-    <ul>
-        <li>Product spoilage and financial loss</li>
-        <li>Regulatory compliance violations (FDA, USDA)</li>
-        <li>Simulation engine failure (auto-rejection)</li>
-        <li>Customer safety risk</li>
-    </ul>
-    <p><strong>Priority:</strong> These violations MUST be corrected before any other optimization.</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    if spoilage_count > 0:
-        st.error(f"🚨 CRITICAL: {spoilage_count} SKUs ({spoilage_rate:.1%}) are in the wrong temperature zone.")
+    if tab_spoilage.open:
+        st.subheader("❄️ Temperature Integrity Analysis (HARD CONSTRAINT Violations)")
+    
+        st.markdown("""
+        <div class="warning-box">
+        <h4>⚠️ HARD CONSTRAINT VIOLATION</h4>
+        <p><strong>Critical Finding:</strong> Temperature mismatches are HARD CONSTRAINTS in warehouse operations.</p>
+        <p><strong>Consequences:</strong></p>
+        <ul>
+            <li>Product spoilage and financial loss</li>
+            <li>Regulatory compliance violations (FDA, USDA)</li>
+            <li>Simulation engine failure (auto-rejection)</li>
+            <li>Customer safety risk</li>
+        </ul>
+        <p><strong>Priority:</strong> These violations MUST be corrected before any other optimization.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+        if spoilage_count > 0:
+            st.error(f"🚨 CRITICAL: {spoilage_count} SKUs ({spoilage_rate:.1%}) are in the wrong temperature zone.")
         
-        # Breakdown by temperature requirement
-        temp_breakdown = sku_slot_df[spoilage_mask].groupby(['temp_req', 'temp_zone']).size().reset_index(name='count')
+            # Breakdown by temperature requirement (temp-pair rollup)
+            temp_breakdown = metrics['temp_breakdown']
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            st.markdown("**Violation Breakdown by Required Temperature:**")
-            violation_summary = sku_slot_df[spoilage_mask]['temp_req'].value_counts().reset_index()
-            violation_summary.columns = ['Required Temperature', 'SKU Count']
-            st.dataframe(violation_summary, use_container_width=True, hide_index=True)
+            with col1:
+                st.markdown("**Violation Breakdown by Required Temperature:**")
+                st.dataframe(spoilage_summary(data_fingerprint()), width='stretch', hide_index=True)
         
-        with col2:
-            st.markdown("**Mismatch Patterns:**")
-            st.dataframe(
-                temp_breakdown.rename(columns={
-                    'temp_req': 'Required',
-                    'temp_zone': 'Actual Zone',
-                    'count': 'Violations'
-                }),
-                use_container_width=True,
-                hide_index=True
-            )
+            with col2:
+                st.markdown("**Mismatch Patterns:**")
+                st.dataframe(
+                    temp_breakdown.rename(columns={
+                        'temp_req': 'Required',
+                        'temp_zone': 'Actual Zone',
+                        'count': 'Violations'
+                    }),
+                    width='stretch',
+                    hide_index=True
+                )
         
-        st.markdown("**Detailed Violation List (First 100):**")
-        st.dataframe(
-            sku_slot_df[spoilage_mask][['sku_id', 'category', 'temp_req', 'slot_id', 'temp_zone']].head(100).rename(columns={
+            st.markdown("**Detailed Violation List:**")
+            paged_table('spoilage', {
                 'sku_id': 'SKU ID',
                 'category': 'Category',
                 'temp_req': 'Required Temp',
                 'slot_id': 'Current Slot',
                 'temp_zone': 'Actual Zone'
-            }),
-            use_container_width=True,
-            hide_index=True
-        )
-    else:
-        st.success("✅ No temperature violations detected. All SKUs are in compatible temperature zones.")
+            }, key='spoilage_table')
+        else:
+            st.success("✅ No temperature violations detected. All SKUs are in compatible temperature zones.")
 
 with tab_constraints:
-    st.subheader("⚖️ Physical Constraint Violations")
-    
-    # Weight Violations
-    st.markdown("### 🏋️ Weight Capacity Violations")
-    
-    st.markdown("""
-    <div class="info-box">
-    <p><strong>Interpretation:</strong> Weight violations may indicate:</p>
-    <ul>
-        <li><strong>Decimal Drift:</strong> Data corruption from legacy systems (e.g., 10× multiplier errors)</li>
-        <li><strong>Illegal Slotting:</strong> Heavy items placed in structurally inadequate bins</li>
-        <li><strong>Safety Risk:</strong> Potential shelf collapse or picker injury</li>
-    </ul>
-    <p><strong>Standard:</strong> Even small violation counts are unacceptable and must be resolved before final slotting submission.</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    col1, col2 = st.columns([1, 3])
-    
-    with col1:
-        if weight_viol_count > 0:
-            st.metric("⚠️ Weight Violations", weight_viol_count, delta="Requires Correction", delta_color="inverse")
-        else:
-            st.metric("✅ Weight Violations", weight_viol_count, delta="Compliant", delta_color="normal")
+    if tab_constraints.open:
+        st.subheader("⚖️ Physical Constraint Violations")
     
-    with col2:
-        if weight_viol_count > 0:
-            st.warning(f"Found {weight_viol_count} SKUs exceeding slot weight capacity. Review for data forensics issues.")
-        else:
-            st.success("All SKUs are within slot weight capacity limits.")
+        # Weight Violations
+        st.markdown("### 🏋️ Weight Capacity Violations")
     
-    if weight_viol_count > 0:
-        st.markdown("**Violation Details:**")
-        st.dataframe(
-            sku_slot_df[weight_violation_mask][['sku_id', 'weight_kg', 'slot_id', 'max_weight_kg']].rename(columns={
+        st.markdown("""
+        <div class="info-box">
+        <p><strong>Interpretation:</strong> Weight violations may indicate:</p>
+        <ul>
+            <li><strong>Decimal Drift:</strong> Data corruption from legacy systems (e.g., 10× multiplier errors)</li>
+            <li><strong>Illegal Slotting:</strong> Heavy items placed in structurally inadequate bins</li>
+            <li><strong>Safety Risk:</strong> Potential shelf collapse or picker injury</li>
+        </ul>
+        <p><strong>Standard:</strong> Even small violation counts are unacceptable and must be resolved before final slotting submission.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+        col1, col2 = st.columns([1, 3])
+    
+        with col1:
+            if weight_viol_count > 0:
+                st.metric("⚠️ Weight Violations", weight_viol_count, delta="Requires Correction", delta_color="inverse")
+            else:
+                st.metric("✅ Weight Violations", weight_viol_count, delta="Compliant", delta_color="normal")
+    
+        with col2:
+            if weight_viol_count > 0:
+                st.warning(f"Found {weight_viol_count} SKUs exceeding slot weight capacity. Review for data forensics issues.")
+            else:
+                st.success("All SKUs are within slot weight capacity limits.")
+    
+        if weight_viol_count > 0:
+            st.markdown("**Violation Details:**")
+            paged_table('weight', {
                 'sku_id': 'SKU ID',
                 'weight_kg': 'SKU Weight (kg)',
                 'slot_id': 'Current Slot',
                 'max_weight_kg': 'Max Capacity (kg)'
-            }),
-            use_container_width=True,
-            hide_index=True
-        )
+            }, key='weight_table')
     
-    # Illegal Shortcuts Context
-    st.markdown("### 🏃 Illegal Picker Shortcuts (Safety & Compliance Risk)")
-    
-    st.markdown(f"""
-    <div class="warning-box">
-    <h4>⚠️ Artificial Efficiency Through Unsafe Behavior</h4>
-    <p><strong>Detection Method:</strong> Inter-pick speed calculation flagging movements >4 m/s (running/unsafe shortcuts)</p>
-    <p><strong>Findings:</strong></p>
-    <ul>
-        <li><strong>Total Illegal Shortcuts:</strong> {illegal_shortcuts:,}</li>
-        <li><strong>Percentage of Movements:</strong> {shortcut_rate:.2%} of {total_picks:,} total picks</li>
-        <li><strong>Baseline Comparison:</strong> {((shortcut_rate / 0.001) * 100 - 100):.0f}% above acceptable 0.1% threshold</li>
-    </ul>
-    <p><strong>Root Cause:</strong> Poor warehouse layout forces pickers to take unsafe shortcuts to meet fulfillment time targets.</p>
-    <p><strong>Impact:</strong></p>
-    <ul>
-        <li>Safety risk: Increased collision and injury probability</li>
-        <li>Compliance violation: OSHA workplace safety standards</li>
-        <li>Artificial efficiency: Masking true operational inefficiency</li>
-    </ul>
-    <p><strong>Recommendation:</strong> Optimize slotting to reduce picker travel distance and eliminate need for shortcuts.</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Shortcut frequency by hour
-    if 'is_suspicious' in picker_df.columns:
-        # Filter only suspicious and drop NaN hours
-        suspicious_df = picker_sku_df[picker_sku_df['is_suspicious'] == True].dropna(subset=['hour'])
-        
-        if not suspicious_df.empty:
-            shortcut_by_hour = suspicious_df.groupby('hour').size().reset_index(name='shortcut_count')
-            
-            fig_shortcuts = go.Figure()
-            fig_shortcuts.add_trace(go.Scatter(
-                x=shortcut_by_hour['hour'],
-                y=shortcut_by_hour['shortcut_count'],
-                mode='lines+markers',
-                name='Illegal Shortcuts',
-                line=dict(color='#ff6b6b', width=4, shape='spline'),
-                marker=dict(
-                    size=10,
-                    color=shortcut_by_hour['shortcut_count'],
-                    colorscale='Reds',
-                    showscale=False,
-                    line=dict(color='white', width=2)
-                ),
-                fill='tozeroy',
-                fillcolor='rgba(255, 107, 107, 0.3)'
-            ))
-            
-            fig_shortcuts.update_layout(
-                title={
-                    'text': "Illegal Shortcut Frequency by Hour (Correlation with Peak Congestion)",
-                    'font': {'size': 18, 'color': '#ffffff'}
-                },
-                xaxis_title="Hour of Day",
-                yaxis_title="Number of Illegal Shortcuts",
-                template="plotly_dark",
-                height=450,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#ffffff'),
-                xaxis=dict(gridcolor='rgba(255,255,255,0.1)', showgrid=True, dtick=1),
-                yaxis=dict(gridcolor='rgba(255,255,255,0.1)', showgrid=True),
-                hovermode='x unified'
-            )
-            
-            st.plotly_chart(fig_shortcuts, use_container_width=True)
-        else:
-            st.info("No illegal shortcuts detected to display frequency distribution.")
-    else:
-        st.info("Safety violation status column missing from movement data.")
-
-with tab_whatif:
-    st.subheader("🔮 What-If Simulation (Executive Decision Support)")
-    
-    st.markdown("""
-    <div class="info-box">
-    <p><strong>Purpose:</strong> Model operational impact of volume changes and constraint modifications.</p>
-    <p><strong>Note:</strong> Simulations are text-based projections based on current system behavior. Full validation requires running the optimization engine.</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Scenario 1: Volume Increase
-    st.markdown("### 📈 Scenario 1: +20% Order Volume Increase")
+        # Illegal Shortcuts Context
+        st.markdown("### 🏃 Illegal Picker Shortcuts (Safety & Compliance Risk)")
     
-    volume_increase = st.checkbox("Simulate +20% Volume Spike", value=False)
-    
-    if volume_increase:
-        projected_pick_time = avg_pick_time_min * 1.35  # Assume 35% degradation
-        projected_shortcuts = int(illegal_shortcuts * 1.5)  # Assume 50% more shortcuts
-        
         st.markdown(f"""
         <div class="warning-box">
-        <h4>🚨 Projected Impact (WITHOUT Optimization):</h4>
+        <h4>⚠️ Artificial Efficiency Through Unsafe Behavior</h4>
+        <p><strong>Detection Method:</strong> Inter-pick speed calculation flagging movements >4 m/s (running/unsafe shortcuts)</p>
+        <p><strong>Findings:</strong></p>
         <ul>
-            <li><strong>Avg Pick Time:</strong> {avg_pick_time_min:.2f} min → {projected_pick_time:.2f} min (+{((projected_pick_time/avg_pick_time_min - 1) * 100):.0f}%)</li>
-            <li><strong>Illegal Shortcuts:</strong> {illegal_shortcuts:,} → {projected_shortcuts:,} (+{((projected_shortcuts/illegal_shortcuts - 1) * 100):.0f}%)</li>
-            <li><strong>Aisle B Congestion:</strong> CRITICAL - Forklift access blocked 80% of peak hours</li>
-            <li><strong>System Status:</strong> <span style="color: red; font-weight: bold;">90% FAILURE PROBABILITY</span></li>
+            <li><strong>Total Illegal Shortcuts:</strong> {illegal_shortcuts:,}</li>
+            <li><strong>Percentage of Movements:</strong> {shortcut_rate:.2%} of {total_picks:,} total picks</li>
+            <li><strong>Baseline Comparison:</strong> {((shortcut_rate / 0.001) * 100 - 100):.0f}% above acceptable 0.1% threshold</li>
         </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown(f"""
-        <div class="success-box">
-        <h4>✅ Projected Impact (WITH Optimization):</h4>
+        <p><strong>Root Cause:</strong> Poor warehouse layout forces pickers to take unsafe shortcuts to meet fulfillment time targets.</p>
+        <p><strong>Impact:</strong></p>
         <ul>
-            <li><strong>Avg Pick Time:</strong> {BASELINE_PICK_TIME:.2f} min (restored to baseline)</li>
-            <li><strong>Illegal Shortcuts:</strong> <500 (80% reduction through layout optimization)</li>
-            <li><strong>Aisle B Congestion:</strong> 40% utilization (sustainable)</li>
-            <li><strong>System Status:</strong> <span style="color: green; font-weight: bold;">SURVIVES +20% SPIKE</span></li>
+            <li>Safety risk: Increased collision and injury probability</li>
+            <li>Compliance violation: OSHA workplace safety standards</li>
+            <li>Artificial efficiency: Masking true operational inefficiency</li>
         </ul>
+        <p><strong>Recommendation:</strong> Optimize slotting to reduce picker travel distance and eliminate need for shortcuts.</p>
         </div>
         """, unsafe_allow_html=True)
     
-    # Scenario 2: Aisle B Closure
-    st.markdown("### 🚧 Scenario 2: Aisle B Closure During Peak Hour")
-    
-    aisle_b_closure = st.checkbox("Simulate Aisle B Closure (19:00)", value=False)
+        # Shortcut frequency by hour
+        if metrics['has_suspicious']:
+            shortcut_by_hour = metrics['shortcut_by_hour']
+        
+            if not shortcut_by_hour.empty:
+                st.plotly_chart(shortcut_figure(data_fingerprint()), width='stretch')
+            else:
+                st.info("No illegal shortcuts detected to display frequency distribution.")
+        else:
+            st.info("Safety violation status column missing from movement data.")
+
+with tab_whatif:
+    if tab_whatif.open:
+        st.subheader("🔮 What-If Simulation (Executive Decision Support)")
     
-    if aisle_b_closure:
-        st.markdown(f"""
-        <div class="warning-box">
-        <h4>🚨 Impact of Aisle B Closure at 19:00:</h4>
-        <ul>
-            <li><strong>Affected SKUs:</strong> 35 high-velocity items currently in Aisle B</li>
-            <li><strong>Pick Time Impact:</strong> +{((aisle_b_peak_count / total_picks) * avg_pick_time_min * 2):.1f} minutes average (pickers rerouted to alternate aisles)</li>
-            <li><strong>Recommendation:</strong> Pre-emptively relocate these SKUs to Aisles C and D before implementing closure</li>
-        </ul>
+        st.markdown("""
+        <div class="info-box">
+        <p><strong>Purpose:</strong> Model operational impact of volume changes and constraint modifications.</p>
+        <p><strong>Note:</strong> Scenarios run through the discrete-event shift simulator (<code>simulate.py</code>): orders replayed through pickers and aisles with per-aisle capacity, on the evening shift (14:00-22:00) of the latest full day. Forklifts are blocked in Aisle B while more than 2 pickers are inside.</p>
         </div>
         """, unsafe_allow_html=True)
+    
+        n_pickers = st.number_input("Pickers on shift", min_value=1, max_value=2000, value=simulate.DEFAULT_PICKERS, step=5)
+        sim_key = simulation_fingerprint()
+        has_plan = os.path.exists(simulate.PLAN_FILE)
+    
+        def status_html(result):
+            if result['orders'] == 0:
+                return '<span style="color: orange; font-weight: bold;">NO ORDERS IN SHIFT</span>'
+            if simulate.survives(result):
+                return '<span style="color: green; font-weight: bold;">KEEPS UP</span>'
+            return '<span style="color: red; font-weight: bold;">OVERLOADED</span>'
+    
+        # Scenario 1: Volume Increase
+        st.markdown("### 📈 Scenario 1: +20% Order Volume Increase")
+    
+        volume_increase = st.checkbox("Simulate +20% Volume Spike", value=False)
+    
+        if volume_increase:
+            base = run_simulation(sim_key, False, 1.0, n_pickers)
+            spike = run_simulation(sim_key, False, 1.2, n_pickers)
+            projected_shortcuts = int(round(illegal_shortcuts * 1.2))  # at the current shortcut rate
+        
+            st.markdown(f"""
+            <div class="warning-box">
+            <h4>🚨 Simulated Impact (Current Slotting):</h4>
+            <ul>
+                <li><strong>Avg Pick Time:</strong> {base['avg_pick_time_min']:.2f} min → {spike['avg_pick_time_min']:.2f} min per order</li>
+                <li><strong>Avg Queueing Delay:</strong> {base['avg_queueing_delay_min']:.2f} min → {spike['avg_queueing_delay_min']:.2f} min (waiting for a picker {spike['avg_picker_wait_min']:.2f} + aisle congestion {spike['avg_aisle_wait_min']:.2f})</li>
+                <li><strong>Picker Utilization:</strong> {base['picker_utilization']:.1%} → {spike['picker_utilization']:.1%}</li>
+                <li><strong>Aisle B Congestion:</strong> {spike['aisle_b_utilization']:.1%} utilization, forklift access blocked {spike['aisle_b_forklift_blocked_pct']:.1%} of the shift</li>
+                <li><strong>Illegal Shortcuts:</strong> {illegal_shortcuts:,} → {projected_shortcuts:,} (at the current shortcut rate)</li>
+                <li><strong>System Status:</strong> {status_html(spike)} ({spike['orders_waiting_at_shift_end']:,} orders not started by shift end)</li>
+            </ul>
+            </div>
+            """, unsafe_allow_html=True)
+        
+            if has_plan:
+                spike_plan = run_simulation(sim_key, True, 1.2, n_pickers)
+                st.markdown(f"""
+                <div class="success-box">
+                <h4>✅ Simulated Impact (With final_slotting_plan.csv):</h4>
+                <ul>
+                    <li><strong>Avg Pick Time:</strong> {spike_plan['avg_pick_time_min']:.2f} min per order ({(spike_plan['avg_pick_time_min'] / spike['avg_pick_time_min'] - 1) * 100:+.0f}% vs current slotting)</li>
+                    <li><strong>Avg Queueing Delay:</strong> {spike_plan['avg_queueing_delay_min']:.2f} min</li>
+                    <li><strong>Picker Utilization:</strong> {spike_plan['picker_utilization']:.1%}</li>
+                    <li><strong>Aisle B Congestion:</strong> {spike_plan['aisle_b_utilization']:.1%} utilization, forklift access blocked {spike_plan['aisle_b_forklift_blocked_pct']:.1%} of the shift</li>
+                    <li><strong>System Status:</strong> {status_html(spike_plan)}</li>
+                </ul>
+                </div>
+                """, unsafe_allow_html=True)
+        
+            st.plotly_chart(utilization_figure(sim_key, n_pickers, has_plan), width='stretch')
+    
+        # Scenario 2: Aisle B Closure
+        st.markdown("### 🚧 Scenario 2: Aisle B Closure During Peak Hour")
+    
+        aisle_b_closure = st.checkbox("Simulate Aisle B Closure (19:00)", value=False)
+    
+        if aisle_b_closure:
+            base = run_simulation(sim_key, False, 1.0, n_pickers)
+            closed = run_simulation(sim_key, False, 1.0, n_pickers, (19, 20))
+        
+            # High-velocity SKUs (top 20% by order volume) currently in Aisle B
+            in_aisle_b = sku_slot_df['is_aisle_b'].eq(True).to_numpy()
+            sku_volume = metrics['sku_volume']
+            if sku_volume is not None and len(sku_volume):
+                codes = sku_slot_df['sku_code'].to_numpy()
+                volume = np.where(codes >= 0, sku_volume[np.maximum(codes, 0)], 0)
+                affected_skus = int((in_aisle_b & (volume >= np.quantile(volume, 0.8))).sum())
+            else:
+                affected_skus = int(in_aisle_b.sum())
+        
+            st.markdown(f"""
+            <div class="warning-box">
+            <h4>🚨 Simulated Impact of Aisle B Closure at 19:00-20:00:</h4>
+            <ul>
+                <li><strong>Affected SKUs:</strong> {affected_skus} high-velocity items currently in Aisle B</li>
+                <li><strong>Queueing Delay:</strong> +{closed['avg_queueing_delay_min'] - base['avg_queueing_delay_min']:.2f} minutes average per order ({closed['orders_delayed']:,} orders wait over 1 minute)</li>
+                <li><strong>Avg Pick Time:</strong> {base['avg_pick_time_min']:.2f} → {closed['avg_pick_time_min']:.2f} min (pickers held at the closed aisles)</li>
+                <li><strong>Recommendation:</strong> Pre-emptively relocate these SKUs to Aisles C and D before implementing closure</li>
+            </ul>
+            </div>
+            """, unsafe_allow_html=True)
+    
+        # Scenario 3: Monte Carlo stress test (run offline by stress_test.py)
+        st.markdown("### 🎲 Scenario 3: Monte Carlo Stress Test")
+    
+        show_stress = st.checkbox("Show stress test distributions", value=False)
+    
+        if show_stress:
+            if not os.path.exists(stress_test.RESULTS_FILE):
+                st.info("No stress test results yet. Run `python stress_test.py --replications 1000` to generate them.")
+            else:
+                results, meta, summary = load_stress_results(os.stat(stress_test.RESULTS_FILE).st_mtime_ns)
+                if meta is not None:
+                    st.caption(f"{meta['replications']:,} replications (seed {meta['seed']}): volume "
+                               f"{meta['volume_range'][0]}-{meta['volume_range'][1]}x, up to "
+                               f"{meta['peak_share_range'][1]:.0%} of orders pulled into {meta['peak_hours'][0]}:00, "
+                               f"{meta['n_pickers']} pickers, {meta.get('empty_replications', 0):,} empty "
+                               f"replications left out. Computed in {meta['seconds']}s.")
+                    if meta['data_fingerprint'] != str(dashboard_metrics.data_fingerprint(DATA_DIR)):
+                        st.warning("Cleaned data changed since this stress test ran - re-run `python stress_test.py`.")
+            
+                # Mean [95% CI] and P95 per layout
+                labels = {'avg_pick_time_min': 'Avg Pick Time (min)', 'avg_queueing_delay_min': 'Avg Queueing Delay (min)',
+                          'p95_cycle_time_min': 'P95 Order Cycle Time (min)', 'picker_utilization': 'Picker Utilization',
+                          'aisle_b_forklift_blocked_pct': 'Aisle B Forklift Blocked', 'temp_violation_lines': 'Picks from Wrong-Temp Slots',
+                          'overweight_lines': 'Picks from Overweight Slots', 'overload_probability': 'Overload Probability'}
+                shown = summary[summary['metric'].isin(labels)].copy()
+                shown['value'] = shown.apply(
+                    lambda r: f"{r['mean']:.3f} [{r['ci_low']:.3f}, {r['ci_high']:.3f}]"
+                              + ("" if pd.isna(r['p95']) else f", P95 {r['p95']:.3f}"), axis=1)
+                table = shown.pivot(index='metric', columns='layout', values='value').reindex(list(labels))
+                table.index = table.index.map(labels)
+                table.columns = [f"{c.title()} Slotting: mean [95% CI]" for c in table.columns]
+                st.dataframe(table, width='stretch')
+            
+                st.plotly_chart(stress_histogram(os.stat(stress_test.RESULTS_FILE).st_mtime_ns), width='stretch')
 
 # --- FIX PRIORITY BUTTON ---
 st.markdown("---")
@@ -697,10 +827,10 @@ if st.button("🔧 Show Top 10 SKUs to Move NOW", type="primary"):
     priority_skus = sku_slot_df[spoilage_mask].copy()
     
     # Add order volume if available
-    if 'sku_id' in order_df.columns:
-        sku_volume = order_df.groupby('sku_id').size().reset_index(name='order_volume')
-        priority_skus = priority_skus.merge(sku_volume, on='sku_id', how='left')
-        priority_skus['order_volume'] = priority_skus['order_volume'].fillna(0)
+    sku_volume = metrics['sku_volume']
+    if sku_volume is not None:
+        codes = priority_skus['sku_code'].to_numpy()
+        priority_skus['order_volume'] = np.where(codes >= 0, sku_volume[codes], 0)
     else:
         priority_skus['order_volume'] = 0
     
@@ -729,10 +859,87 @@ if st.button("🔧 Show Top 10 SKUs to Move NOW", type="primary"):
     display_df.index = display_df.index + 1
     display_df.columns = ['SKU ID', 'Category', 'Current Slot', 'Required Temp', 'Actual Zone', 'Reason for Move']
     
-    st.dataframe(display_df, use_container_width=True)
+    st.dataframe(display_df, width='stretch')
     
     st.success(f"✅ Full slotting plan with {spoilage_count + weight_viol_count} total moves available in `final_slotting_plan.csv`")
 
+with tab_live:
+    if tab_live.open:
+        st.subheader("📡 Live Floor: Shortcuts and Aisle B Congestion as They Happen")
+    
+        st.markdown(f"""
+        <div class="info-box">
+        <p><strong>Source:</strong> movement events tailed from a growing log or received on a local socket (<code>live_ingest.py</code>). Each event is checked against the picker's previous one (&gt;{live_ingest.SPEED_THRESHOLD:.0f} m/s = shortcut) and updates aisle occupancy; Aisle B with more than {live_ingest.FORKLIFT_MAX_PICKERS} pickers inside blocks forklifts. Counters cover the last {live_ingest.ROLLING_HOURS}h of event time and refresh every {LIVE_REFRESH_SEC}s from memory.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+        live_source = st.radio("Event source", ["Tail movement log", "Local socket"], horizontal=True)
+        if live_source == "Tail movement log":
+            live_path = st.text_input("Movement log (CSV)", value=live_ingest.MOVEMENT_LOG)
+            live_port = None
+            live_from_start = st.checkbox("Replay existing rows first", value=False)
+        else:
+            live_path = None
+            live_port = int(st.number_input("Port", min_value=1024, max_value=65535, value=live_ingest.DEFAULT_PORT))
+            live_from_start = False
+            st.caption(f"Stream events in with `python live_ingest.py --send picker_movement.csv --port {live_port}`")
+    
+        if st.toggle("Start live feed", value=False):
+            live_state = live_feed(live_path, live_port, live_from_start)
+        
+            @st.fragment(run_every=LIVE_REFRESH_SEC)
+            def live_panel():
+                snap = live_state.snapshot()
+                if snap['error']:
+                    st.error(f"Live ingest stopped: {snap['error']}")
+            
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("📥 Events", f"{snap['events']:,}", delta=f"{snap['events_per_sec']:,.0f}/s ingest capacity", delta_color="off")
+                col2.metric("⚠️ Shortcuts", f"{snap['shortcuts']:,}",
+                            delta=f"{snap['shortcuts'] / snap['events']:.2%} of events" if snap['events'] else None, delta_color="inverse")
+                col3.metric("🚧 Aisle B Blocked Now", f"{len(snap['congested'])}",
+                            delta=", ".join(snap['congested']) or "clear", delta_color="off")
+                col4.metric("🕒 Event Clock", f"{snap['clock']:%Y-%m-%d %H:%M}" if snap['clock'] is not None else "waiting")
+            
+                if snap['events'] == 0:
+                    st.info(f"Waiting for events from {snap['source'] or 'the source'}...")
+                    return
+            
+                aisle_hour = snap['aisle_hour']
+                heatmap_live = dashboard_metrics.heatmap_bins(aisle_hour)[0]
+                fig_live = px.imshow(
+                    heatmap_live,
+                    labels=dict(x="Hour", y="Aisle", color="Picks"),
+                    color_continuous_scale='Viridis',
+                    aspect='auto',
+                    title=f'Rolling Pick Activity (last {live_ingest.ROLLING_HOURS}h of events)'
+                )
+                fig_live.update_layout(
+                    template="plotly_dark",
+                    height=550,
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='#ffffff')
+                )
+                st.plotly_chart(fig_live, width='stretch')
+            
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown(f"**Aisle B occupancy (limit {live_ingest.FORKLIFT_MAX_PICKERS}):**")
+                    st.dataframe(snap['aisle_b'].rename(columns={'aisle': 'Aisle', 'pickers_inside': 'Pickers Inside'}),
+                                 width='stretch', hide_index=True)
+                with col2:
+                    st.markdown("**Latest alerts:**")
+                    st.dataframe(snap['alerts'].head(50).rename(columns={
+                        'time': 'Time', 'kind': 'Alert', 'picker_id': 'Picker', 'aisle': 'Aisle', 'detail': 'Detail'}),
+                        width='stretch', hide_index=True)
+                st.caption(f"{snap['source']} · {snap['pickers']:,} pickers seen, {snap['pickers_inside']} inside an aisle · "
+                           f"{snap['aisle_b_alerts']:,} Aisle B alerts · {snap['late']:,} late events · {snap['skipped']:,} skipped lines")
+        
+            live_panel()
+        else:
+            st.info("Turn on the live feed to start ingesting movement events.")
+
 # Footer
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 📄 Dashboard Information")
@@ -743,11 +950,20 @@ st.sidebar.markdown(f"""
 **Target Week:** Week 91 Optimization  
 
 **Key Metrics:**
-- Total SKUs: {len(sku_df):,}
-- Total Slots: {len(constraints_df):,}
+- Total SKUs: {metrics['n_skus']:,}
+- Total Slots: {metrics['n_slots']:,}
 - Total Picks Analyzed: {total_picks:,}
 - Chaos Score: {chaos_score:.1f}/100
 """)
 
 st.sidebar.markdown("---")
-st.sidebar.info("💡 **Tip:** Use the tabs to explore different operational aspects. Click 'Show Top 10 SKUs to Move NOW' for immediate action items.")
\ No newline at end of file
+st.sidebar.info("💡 **Tip:** Use the tabs to explore different operational aspects. Click 'Show Top 10 SKUs to Move NOW' for immediate action items.")
+
+# Pipeline stage metrics (latest run of each script, from instrument.py)
+if st.sidebar.checkbox("📈 Show pipeline stage metrics"):
+    stage_records = instrument.read_metrics()
+    if stage_records:
+        stage_df = pd.DataFrame(stage_records)[['script', 'stage', 'wall_s', 'cpu_s', 'peak_rss_delta_mb', 'rows_in', 'rows_out']]
+        st.sidebar.dataframe(stage_df.sort_values('wall_s', ascending=False), hide_index=True, width='stretch')
+    else:
+        st.sidebar.info("No stage metrics recorded yet. Run clean_data.py or optimize_slotting.py.")
@@ -0,0 +1,220 @@
+import pandas as pd
+import numpy as np
+import os
+
+import columnar
+import schema
+import rollups
+import instrument
+
+# Dashboard pre-processing, kept free of Streamlit so it can be cached by the
+# dashboard and timed by benchmark.py on its own.
+
+BASELINE_PICK_TIME = 3.8  # minutes (target)
+
+def load_data(data_dir, movements=True):
+    # Memory-mapped columnar tables when clean_data wrote them, CSV otherwise.
+    # movements=False skips picker movements and orders (rollups cover them).
+    sku_df = columnar.load_cleaned('sku_master', data_dir)
+    picker_df = columnar.load_cleaned('picker_movement', data_dir) if movements else None
+    constraints_df = columnar.load_cleaned('warehouse_constraints', data_dir, dtype={'slot_id': str})
+    order_df = columnar.load_cleaned('order_history', data_dir) if movements else None
+    
+    # ID Normalization (CRITICAL for merging) - columnar IDs are stored normalized
+    for df in [sku_df, picker_df, constraints_df]:
+        if df is None:
+            continue
+        for col in ['sku_id', 'current_slot', 'slot_id']:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(str).str.strip().str.upper()
+    
+    return sku_df, picker_df, constraints_df, order_df
+
+def data_fingerprint(data_dir):
+    # Size + mtime of every cleaned input; changes whenever clean_data rewrites or appends
+    paths = [os.path.join(data_dir, name) for name in columnar.TABLES.values()]
+    paths += [os.path.join(columnar.table_dir(name, data_dir), "_schema.json") for name in columnar.TABLES]
+    paths += rollups.rollup_paths(data_dir)
+    fingerprint = []
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            fingerprint.append((path, stat.st_size, stat.st_mtime_ns))
+    return tuple(fingerprint)
+
+def compute_metrics(data_dir, use_rollups=True):
+    # Every derived frame and metric the layout needs.
+    # Only small, aggregated frames are returned. Movement / order aggregates come
+    # from the rollups clean_data writes; without them they are computed from the
+    # movement-level rows here.
+    rollup = rollups.load(data_dir) if use_rollups else None
+    with instrument.stage('load') as rec:
+        sku_df, picker_df, constraints_df, order_df = load_data(data_dir, movements=rollup is None)
+        # Integer-coded IDs and pre-split slot components (joins below are array takes)
+        sku_df, constraints_df = schema.apply_schema(sku_df, constraints_df)
+        rec['rows_out'] = sum(len(df) for df in (sku_df, picker_df, constraints_df, order_df) if df is not None)
+    
+    # --- PRE-PROCESSING ---
+    # 1. Spoilage Risk
+    with instrument.stage('spoilage', rows_in=len(sku_df)) as rec:
+        sku_slot_df = schema.join_slots(sku_df, constraints_df)
+        # Ensure types are correct for bool columns
+        if 'is_ghost' in sku_slot_df.columns:
+            sku_slot_df['is_ghost'] = sku_slot_df['is_ghost'].astype(str).str.upper() == 'TRUE'
+
+        spoilage_mask = (sku_slot_df['temp_req'] != sku_slot_df['temp_zone']) & sku_slot_df['temp_zone'].notna()
+        spoilage_count = spoilage_mask.sum()
+        spoilage_rate = spoilage_count / len(sku_df) if len(sku_df) > 0 else 0
+        temp_breakdown = rollup['temp_violations'] if rollup is not None else rollups.temp_violations(sku_slot_df)
+        rec['rows_out'] = len(sku_slot_df)
+    sku_slot_df['aisle'] = sku_slot_df['aisle'].fillna(schema.UNKNOWN_AISLE)
+
+    # 2. Picker Statistics, 4. Congestion / Aisle Traffic, 6. Shortcut frequency by hour
+    with instrument.stage('movement_aggregates', rows_in=None if picker_df is None else len(picker_df)) as rec:
+        movement = rollup if rollup is not None else rollups.movement_rollups(picker_df, sku_df, sku_slot_df)
+        rec['rows_out'] = len(movement['aisle_hour'])
+    summary = movement['summary']
+    total_picks = summary['total_picks']
+    illegal_shortcuts = summary['illegal_shortcuts']
+    shortcut_rate = illegal_shortcuts / total_picks if total_picks > 0 else 0
+    has_suspicious = summary['has_suspicious']
+    heatmap_data = movement['aisle_hour']
+    shortcut_by_hour = movement['shortcuts_by_hour']
+
+    # 3. Fulfillment Time
+    if summary['duration_count'] is not None:
+        avg_pick_time_sec = summary['duration_sum'] / summary['duration_count'] if summary['duration_count'] else float('nan')
+        avg_pick_time_min = avg_pick_time_sec / 60.0
+    else:
+        avg_pick_time_min = 6.2
+
+    # Identify Aisle B (highest congestion at 19:00)
+    peak_19 = heatmap_data[heatmap_data['hour'] == 19.0].sort_values('pick_count', ascending=False)
+    aisle_b_code = peak_19.iloc[0]['aisle'] if len(peak_19) > 0 else 'B01'
+    aisle_b_peak_count = peak_19.iloc[0]['pick_count'] if len(peak_19) > 0 else 0
+
+    # 5. Weight Violations
+    with instrument.stage('weight_violations', rows_in=len(sku_slot_df)) as rec:
+        weight_violation_mask = (sku_slot_df['weight_kg'] > sku_slot_df['max_weight_kg'])
+        weight_viol_count = weight_violation_mask.sum()
+        rec['rows_out'] = int(weight_viol_count)
+
+    # --- CHAOS SCORE CALCULATION (FORMALIZED) ---
+    # Component 1: Efficiency Degradation
+    efficiency_loss_raw = max(0, (avg_pick_time_min / BASELINE_PICK_TIME) - 1)
+    efficiency_weight = 0.35
+    efficiency_score = efficiency_loss_raw * efficiency_weight
+
+    # Component 2: Safety Violations (Illegal Shortcuts)
+    safety_loss_raw = shortcut_rate * 10  # Normalize to 0-1 scale
+    safety_weight = 0.25
+    safety_score = safety_loss_raw * safety_weight
+
+    # Component 3: Inventory Risk (Temperature Violations)
+    spoilage_loss_raw = spoilage_rate * 5  # Normalize to 0-1 scale
+    spoilage_weight = 0.40
+    spoilage_score = spoilage_loss_raw * spoilage_weight
+
+    # Final Chaos Score (0-100 scale)
+    raw_chaos = (efficiency_score + safety_score + spoilage_score) * 100
+    chaos_score = min(100, raw_chaos)
+    
+    # 7. Order volume per SKU row (priority button), indexed by sku_code
+    with instrument.stage('sku_order_volume') as rec:
+        sku_volume = None
+        if rollup is not None:
+            volume = rollup['order_volume']
+            order_rows = schema.encode(volume['sku_id'], schema.id_index(sku_df['sku_id']))
+            sku_volume = np.zeros(len(sku_df), dtype=np.int64)
+            np.add.at(sku_volume, order_rows[order_rows >= 0], volume['order_volume'].to_numpy()[order_rows >= 0])
+        elif 'sku_id' in order_df.columns:
+            order_rows = schema.encode_skus(order_df, sku_df)
+            sku_volume = np.bincount(order_rows[order_rows >= 0], minlength=len(sku_df))
+        rec['rows_out'] = None if sku_volume is None else len(sku_volume)
+    
+    return {
+        'sku_slot_df': sku_slot_df,
+        'spoilage_mask': spoilage_mask,
+        'spoilage_count': spoilage_count,
+        'spoilage_rate': spoilage_rate,
+        'temp_breakdown': temp_breakdown,
+        'total_picks': total_picks,
+        'illegal_shortcuts': illegal_shortcuts,
+        'shortcut_rate': shortcut_rate,
+        'avg_pick_time_min': avg_pick_time_min,
+        'heatmap_data': heatmap_data,
+        'peak_19': peak_19,
+        'aisle_b_code': aisle_b_code,
+        'aisle_b_peak_count': aisle_b_peak_count,
+        'weight_violation_mask': weight_violation_mask,
+        'weight_viol_count': weight_viol_count,
+        'has_suspicious': has_suspicious,
+        'shortcut_by_hour': shortcut_by_hour,
+        'sku_volume': sku_volume,
+        'n_skus': len(sku_df),
+        'n_slots': len(constraints_df),
+        'efficiency_loss_raw': efficiency_loss_raw,
+        'efficiency_weight': efficiency_weight,
+        'efficiency_score': efficiency_score,
+        'safety_loss_raw': safety_loss_raw,
+        'safety_weight': safety_weight,
+        'safety_score': safety_score,
+        'spoilage_loss_raw': spoilage_loss_raw,
+        'spoilage_weight': spoilage_weight,
+        'spoilage_score': spoilage_score,
+        'chaos_score': chaos_score,
+    }
+
+# --- Chart inputs and table pages (only these reach the browser) ---
+
+HEATMAP_MAX_ROWS = 150           # aisles per heatmap before neighbouring aisles are binned
+PAGE_SIZES = [25, 50, 100, 250]
+TABLE_COLUMNS = {
+    'spoilage': ['sku_id', 'category', 'temp_req', 'slot_id', 'temp_zone'],
+    'weight': ['sku_id', 'weight_kg', 'slot_id', 'max_weight_kg'],
+}
+
+def heatmap_bins(aisle_hour, max_rows=HEATMAP_MAX_ROWS, hours=None):
+    # Dense aisle x hour int32 matrix (aisles descending, as displayed). Above max_rows
+    # aisles, runs of neighbouring aisles share a row labelled "first-last" holding the
+    # busiest aisle of the run, so a hotspot keeps its height. Returns (matrix, aisle -> row label)
+    matrix = aisle_hour.pivot_table(index='aisle', columns='hour', values='pick_count', aggfunc='sum', observed=True)
+    if hours is not None:
+        matrix = matrix.reindex(columns=hours)
+    matrix = matrix.fillna(0).astype(np.int32).sort_index()
+    labels = pd.Series(matrix.index.astype(str), index=matrix.index.astype(str))
+    if len(matrix) > max_rows:
+        group = np.arange(len(matrix)) * max_rows // len(matrix)
+        names = matrix.index.astype(str)
+        first = pd.Series(names).groupby(group).transform('first')
+        last = pd.Series(names).groupby(group).transform('last')
+        labels = pd.Series(np.where(first == last, first, first + "-" + last), index=names)
+        matrix = matrix.groupby(labels.to_numpy(), sort=False).max()
+    return matrix.iloc[::-1], labels.to_dict()
+
+def hour_bins(by_hour, value_col):
+    # One row per hour of day 0-23 (hours without events = 0), so the series has no gaps
+    counts = by_hour.groupby('hour')[value_col].sum() if len(by_hour) else pd.Series(dtype=np.int64)
+    counts.index = counts.index.astype(int)
+    return counts.reindex(range(24), fill_value=0).astype(np.int32).rename_axis('hour').reset_index(name=value_col)
+
+def violation_rows(metrics, table):
+    # Full frame behind a paginated dashboard table; stays on the server
+    mask = metrics['spoilage_mask'] if table == 'spoilage' else metrics['weight_violation_mask']
+    return metrics['sku_slot_df'].loc[mask.to_numpy(), TABLE_COLUMNS[table]]
+
+def page_table(df, search="", sort_by=None, ascending=True, page=1, page_size=PAGE_SIZES[1]):
+    # Filter (case-insensitive substring over the text columns), sort, slice one page.
+    # Returns (page rows, matching rows, page number clamped to the last page)
+    if search:
+        hit = np.zeros(len(df), dtype=bool)
+        for col in df.columns:
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                hit |= df[col].astype(str).str.contains(search, case=False, regex=False, na=False).to_numpy()
+        df = df[hit]
+    if sort_by is not None:
+        df = df.sort_values(sort_by, ascending=ascending, kind='stable', na_position='last')
+    total = len(df)
+    page = min(max(1, page), max(1, -(-total // page_size)))
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size], total, page
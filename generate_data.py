@@ -0,0 +1,215 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import argparse
+
+# Seeded synthetic warehouse generator.
+#
+# Writes sku_master.csv, warehouse_constraints.csv, order_history.csv and
+# picker_movement.csv with the same columns the pipeline reads, scaled from the
+# shipped snapshot (800 SKUs, 18,000 slots) by a scale factor. Data quality
+# issues are injected at known rates and recorded in _manifest.json, so a run of
+# clean_data.py can be checked against what was injected:
+#   decimal drift - SKU weight x10 (always > 80 kg, so clean_data catches it)
+#   ghost slots   - current_slot outside the slot grid
+#   shortcuts     - travel_distance_m implying > 4 m/s since the picker's last pick
+
+SCALES = [1, 10, 100, 1000]
+
+# Layout of the 1x snapshot; aisles per zone grow with the scale factor
+ZONES = {'A': 'Ambient', 'B': 'Ambient', 'C': 'Refrigerated', 'D': 'Frozen', 'E': 'Ambient', 'F': 'Ambient'}
+NARROW_ZONE = 'B'                    # 1.2 m aisles, 2.0 m elsewhere
+AISLES_PER_ZONE = 25
+LEVEL_CAPACITY = {'A': 150, 'B': 150, 'C': 150, 'D': 150, 'E': 25, 'F': 25}
+POSITIONS = 20
+
+SKUS_PER_SCALE = 800
+PICKERS_PER_SCALE = 60
+LINES_PER_SKU = 75                   # order lines (= pick movements) per SKU
+CATEGORIES = ['Beverages', 'Dairy', 'Frozen', 'Groceries', 'Health', 'Snacks']
+TEMP_MIX = {'Ambient': 0.50, 'Frozen': 0.275, 'Refrigerated': 0.225}
+
+# Picker behaviour
+WALK_SPEED_MS = (0.8, 1.6)           # normal picks stay far below the 4 m/s threshold
+HANDLING_SEC = 40
+SHIFT_LINES = 300                    # picks per shift before a 16h break
+SHORTCUT_SPEED_MS = (4.5, 9.0)
+START = pd.Timestamp('2026-01-05')
+
+DEFAULT_DRIFT_RATE = 0.0175
+DEFAULT_GHOST_RATE = 0.01
+DEFAULT_SHORTCUT_RATE = 0.02
+
+
+def _ids(prefix, numbers, width):
+    return pd.Series(numbers).astype(str).str.zfill(width).radd(prefix).to_numpy(dtype=object)
+
+
+def make_constraints(scale):
+    aisles = AISLES_PER_ZONE * scale
+    width = max(2, len(str(aisles)))
+    zones = np.array(list(ZONES))
+    aisle_ids = np.concatenate([_ids(z, np.arange(1, aisles + 1), width) for z in zones])
+    levels = np.array(list(LEVEL_CAPACITY))
+    suffix = np.array([f"-{lvl}-{pos:02d}" for lvl in levels for pos in range(1, POSITIONS + 1)], dtype=object)
+
+    per_aisle = len(suffix)
+    aisle_col = np.repeat(aisle_ids, per_aisle)
+    zone_col = np.repeat(zones, aisles * per_aisle)
+    level_col = np.tile(np.repeat(levels, POSITIONS), len(aisle_ids))
+    return pd.DataFrame({
+        'slot_id': aisle_col + np.tile(suffix, len(aisle_ids)),
+        'zone': zone_col,
+        'aisle_id': aisle_col,
+        'shelf_level': level_col,
+        'temp_zone': pd.Series(zone_col).map(ZONES).to_numpy(),
+        'max_weight_kg': pd.Series(level_col).map(LEVEL_CAPACITY).to_numpy(),
+        'aisle_width_m': np.where(zone_col == NARROW_ZONE, 1.2, 2.0),
+    })
+
+
+def make_skus(rng, scale, constraints_df, drift_rate, ghost_rate):
+    n = SKUS_PER_SCALE * scale
+    weight = np.clip(rng.lognormal(np.log(5.0), 0.8, n), 0.5, 68.0)
+    drift = rng.random(n) < drift_rate
+    # Drifted weights land above clean_data's 80 kg cut-off
+    weight[drift] = rng.uniform(8.1, 12.0, drift.sum()) * 10
+
+    current_slot = constraints_df['slot_id'].to_numpy()[rng.integers(0, len(constraints_df), n)]
+    ghost = rng.random(n) < ghost_rate
+    aisles = AISLES_PER_ZONE * scale
+    width = max(2, len(str(aisles + 9)))
+    ghost_aisle = _ids('', aisles + rng.integers(1, 10, ghost.sum()), width)
+    current_slot[ghost] = rng.choice(list(ZONES), ghost.sum()).astype(object) + ghost_aisle + '-A-01'
+
+    sku_df = pd.DataFrame({
+        'sku_id': _ids('SKU-', 10000 + np.arange(n), 5),
+        'category': rng.choice(CATEGORIES, n),
+        'weight_kg': weight.round(2),
+        'temp_req': rng.choice(list(TEMP_MIX), n, p=list(TEMP_MIX.values())),
+        'is_fragile': rng.random(n) < 0.18,
+        'current_slot': current_slot,
+    })
+    return sku_df, int(drift.sum()), int(ghost.sum())
+
+
+def make_orders_and_movements(rng, scale, sku_df, shortcut_rate):
+    n_lines = LINES_PER_SKU * len(sku_df)
+    n_pickers = PICKERS_PER_SCALE * scale
+
+    # Skewed SKU popularity (1 / rank^0.8) in random SKU order
+    popularity = 1.0 / np.arange(1, len(sku_df) + 1) ** 0.8
+    rng.shuffle(popularity)
+    popularity /= popularity.sum()
+
+    # Orders of 1+ lines, each picked in one go by one picker
+    sizes = rng.geometric(0.6, int(n_lines / 1.5) + 10)
+    order_of_line = np.repeat(np.arange(len(sizes)), sizes)[:n_lines]
+    n_orders = order_of_line[-1] + 1
+    picker_of_order = rng.integers(0, n_pickers, n_orders)
+    picker = picker_of_order[order_of_line]
+
+    # Picker timelines: lines in order sequence, whole-second gaps = walk + handling.
+    # distance / gap below are in picker-sequence order (seq_order)
+    seq_order = np.argsort(picker, kind='stable')
+    picker_sorted = picker[seq_order]
+    distance = rng.gamma(2.0, 30.0, n_lines).round(1)
+    walk = distance / rng.uniform(*WALK_SPEED_MS, n_lines)
+    gap = np.ceil(walk + rng.exponential(HANDLING_SEC, n_lines)).astype(np.int64)
+    gap = np.maximum(gap, 1)
+
+    first = np.ones(n_lines, dtype=bool)
+    first[1:] = picker_sorted[1:] != picker_sorted[:-1]
+    idx = np.arange(n_lines)
+    group_start = np.maximum.accumulate(np.where(first, idx, 0))
+    seq_in_picker = idx - group_start
+    shift_break = (seq_in_picker > 0) & (seq_in_picker % SHIFT_LINES == 0)
+    gap[shift_break] += 16 * 3600
+    gap[first] = 0
+
+    elapsed = np.cumsum(gap)
+    elapsed -= elapsed[group_start]
+    picker_start = rng.integers(0, 24 * 3600, n_pickers)
+    seconds = np.empty(n_lines, dtype=np.int64)
+    seconds[seq_order] = picker_start[picker_sorted] + elapsed
+
+    # Shortcuts: distance too long for the time since the picker's previous pick
+    eligible = ~first & ~shift_break
+    shortcut = eligible & (rng.random(n_lines) < shortcut_rate)
+    distance[shortcut] = (gap[shortcut] * rng.uniform(*SHORTCUT_SPEED_MS, shortcut.sum())).round(1)
+    line_distance = np.empty(n_lines)
+    line_distance[seq_order] = distance
+
+    sku_ids = sku_df['sku_id'].to_numpy()[rng.choice(len(sku_df), n_lines, p=popularity)]
+    order_ids = _ids('ORD-', order_of_line, 7 if n_orders < 10 ** 7 else len(str(n_orders)))
+    picker_ids = _ids('P', picker, max(3, len(str(n_pickers))))
+    movement_ts = START + pd.to_timedelta(seconds, unit='s')
+
+    # Orders are placed 5-60 minutes before their first pick
+    first_pick = pd.Series(seconds).groupby(order_of_line).min().to_numpy()
+    placed = first_pick - rng.integers(300, 3600, n_orders)
+    order_ts = START + pd.to_timedelta(placed[order_of_line], unit='s')
+
+    order_df = pd.DataFrame({
+        'order_id': order_ids,
+        'sku_id': sku_ids,
+        'order_timestamp': order_ts.strftime('%Y-%m-%d %H:%M:%S'),
+        'quantity': rng.integers(1, 5, n_lines),
+    }).iloc[np.argsort(placed[order_of_line], kind='stable')]
+
+    # Logs are appended in time order
+    picker_df = pd.DataFrame({
+        'picker_id': picker_ids,
+        'order_id': order_ids,
+        'sku_id': sku_ids,
+        'movement_timestamp': movement_ts.strftime('%Y-%m-%d %H:%M:%S'),
+        'travel_distance_m': line_distance,
+    }).iloc[np.argsort(seconds, kind='stable')]
+
+    return order_df, picker_df, int(shortcut.sum())
+
+
+def generate(out_dir, scale=1, seed=7, drift_rate=DEFAULT_DRIFT_RATE, ghost_rate=DEFAULT_GHOST_RATE,
+             shortcut_rate=DEFAULT_SHORTCUT_RATE):
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    constraints_df = make_constraints(scale)
+    sku_df, n_drift, n_ghost = make_skus(rng, scale, constraints_df, drift_rate, ghost_rate)
+    order_df, picker_df, n_shortcuts = make_orders_and_movements(rng, scale, sku_df, shortcut_rate)
+
+    sku_df.to_csv(os.path.join(out_dir, "sku_master.csv"), index=False)
+    constraints_df.to_csv(os.path.join(out_dir, "warehouse_constraints.csv"), index=False)
+    order_df.to_csv(os.path.join(out_dir, "order_history.csv"), index=False)
+    picker_df.to_csv(os.path.join(out_dir, "picker_movement.csv"), index=False)
+
+    manifest = {
+        'scale': scale,
+        'seed': seed,
+        'rows': {'sku_master': len(sku_df), 'warehouse_constraints': len(constraints_df),
+                 'order_history': len(order_df), 'picker_movement': len(picker_df)},
+        'rates': {'decimal_drift': drift_rate, 'ghost_slots': ghost_rate, 'shortcuts': shortcut_rate},
+        'injected': {'decimal_drift': n_drift, 'ghost_slots': n_ghost, 'shortcuts': n_shortcuts},
+    }
+    with open(os.path.join(out_dir, "_manifest.json"), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seeded synthetic VelocityMart datasets")
+    parser.add_argument('--scale', type=int, default=1, help=f"scale factor vs the shipped snapshot, e.g. {SCALES}")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--out', help="output directory (default: synthetic/<scale>x)")
+    parser.add_argument('--drift-rate', type=float, default=DEFAULT_DRIFT_RATE)
+    parser.add_argument('--ghost-rate', type=float, default=DEFAULT_GHOST_RATE)
+    parser.add_argument('--shortcut-rate', type=float, default=DEFAULT_SHORTCUT_RATE)
+    args = parser.parse_args()
+
+    out_dir = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "synthetic", f"{args.scale}x")
+    manifest = generate(out_dir, args.scale, args.seed, args.drift_rate, args.ghost_rate, args.shortcut_rate)
+    print(f"Wrote {out_dir}")
+    for name, rows in manifest['rows'].items():
+        print(f" - {name}: {rows:,} rows")
+    print("Injected: " + ", ".join(f"{k}={v:,}" for k, v in manifest['injected'].items()))
@@ -0,0 +1,170 @@
+import os
+import sys
+import json
+import time
+import functools
+import contextlib
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+# Stage instrumentation for the pipeline scripts.
+#
+#   with instrument.stage('merge', rows_in=len(df)) as rec:
+#       ...
+#       rec['rows_out'] = len(out)
+#
+# or @instrument.timed('fix_decimal_drift') on a function taking / returning a
+# frame. Each stage appends one JSON line to the metrics file with wall and CPU
+# seconds, the growth of the process' peak RSS during the stage and rows in/out.
+# VELOCITYMART_TRACEMALLOC=1 also records peak traced allocations per stage
+# (slower; an inner stage resets the peak seen by its outer stage). Set
+# VELOCITYMART_METRICS to another path, or to "off" to disable the file.
+
+METRICS_FILE = os.environ.get(
+    'VELOCITYMART_METRICS',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "stage_metrics.jsonl"))
+
+TRACE_ALLOCATIONS = os.environ.get('VELOCITYMART_TRACEMALLOC') == '1'
+if TRACE_ALLOCATIONS:
+    tracemalloc.start()
+
+# Records kept in memory for print_summary(). Long-lived processes (the dashboard,
+# live ingest) never print a summary, so only the latest ones are kept there.
+MAX_BUFFERED_RECORDS = 1000
+
+RUN_ID = f"{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+_script = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+_records = deque(maxlen=MAX_BUFFERED_RECORDS)
+_suppressed = 0
+
+
+def set_script(name):
+    # Label for records of this process (defaults to the running script's name)
+    global _script
+    _script = name
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def _write(record):
+    if METRICS_FILE == 'off':
+        return
+    with open(METRICS_FILE, 'a') as f:
+        f.write(json.dumps(record) + "\n")
+
+
+@contextlib.contextmanager
+def suppressed():
+    # Stages inside are not recorded (e.g. the same stage repeated per replication)
+    global _suppressed
+    _suppressed += 1
+    try:
+        yield
+    finally:
+        _suppressed -= 1
+
+
+@contextlib.contextmanager
+def stage(name, rows_in=None):
+    rec = {'rows_in': rows_in, 'rows_out': None}
+    if _suppressed:
+        yield rec
+        return
+    tracing = TRACE_ALLOCATIONS and tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        traced_start = tracemalloc.get_traced_memory()[0]
+    peak_start = _peak_rss_mb()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    error = None
+    try:
+        yield rec
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        peak_end = _peak_rss_mb()
+        record = {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'run_id': RUN_ID,
+            'script': _script,
+            'stage': name,
+            'wall_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'peak_rss_delta_mb': None if peak_start is None else round(peak_end - peak_start, 2),
+            'rows_in': _as_int(rec['rows_in']),
+            'rows_out': _as_int(rec['rows_out']),
+        }
+        if tracing:
+            record['peak_alloc_mb'] = round((tracemalloc.get_traced_memory()[1] - traced_start) / 1024 ** 2, 2)
+        if error:
+            record['error'] = error
+        _records.append(record)
+        _write(record)
+
+
+def _as_int(value):
+    return None if value is None else int(value)
+
+
+def _rows(value):
+    # Row count of a frame / array, or of the first frame in a returned tuple
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    return len(value) if hasattr(value, '__len__') and not isinstance(value, (str, dict)) else None
+
+
+def timed(name):
+    # Decorator form of stage(); rows in/out from the first argument and the result
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with stage(name, rows_in=_rows(args[0]) if args else None) as rec:
+                result = fn(*args, **kwargs)
+                rec['rows_out'] = _rows(result)
+            return result
+        return inner
+    return wrap
+
+
+def print_summary(records=None):
+    records = _records if records is None else records
+    if not records:
+        return
+    print("\n--- STAGE METRICS ---")
+    print(f"{'stage':<28}{'wall (s)':>10}{'cpu (s)':>10}{'peak +MB':>10}{'rows in':>12}{'rows out':>12}")
+    for r in records:
+        peak = '-' if r['peak_rss_delta_mb'] is None else f"{r['peak_rss_delta_mb']:.1f}"
+        rows_in = '-' if r['rows_in'] is None else f"{r['rows_in']:,}"
+        rows_out = '-' if r['rows_out'] is None else f"{r['rows_out']:,}"
+        print(f"{r['stage']:<28}{r['wall_s']:>10.3f}{r['cpu_s']:>10.3f}{peak:>10}{rows_in:>12}{rows_out:>12}")
+    if METRICS_FILE != 'off':
+        print(f"Stage metrics appended to {METRICS_FILE}")
+    if records is _records:
+        _records.clear()
+
+
+def read_metrics(path=METRICS_FILE, last_run_per_script=True):
+    # Records from the metrics file; by default only each script's latest run
+    if path == 'off' or not os.path.exists(path):
+        return []
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if last_run_per_script:
+        latest = {}
+        for r in records:
+            latest[r['script']] = r['run_id']
+        records = [r for r in records if latest[r['script']] == r['run_id']]
+    return records
@@ -0,0 +1,393 @@
+import pandas as pd
+import os
+import math
+import time
+import socket
+import argparse
+import threading
+from collections import deque
+from datetime import date, datetime
+
+import columnar
+import instrument
+from clean_data import SPEED_THRESHOLD, MAX_INTERVAL_SEC
+from simulate import FORKLIFT_MAX_PICKERS
+from slot_index import is_aisle_b
+
+# Live ingest of picker movement events.
+#
+# Events are picker_movement rows (picker_id, order_id, sku_id,
+# movement_timestamp, travel_distance_m) read from a growing CSV log (tail) or
+# from newline-delimited CSV lines on a local TCP socket. LiveState keeps, per
+# event and in O(1) work:
+#   - each picker's last event time and aisle: the speed check against the
+#     previous event is the batch shortcut rule (> SPEED_THRESHOLD m/s over a
+#     gap under MAX_INTERVAL_SEC)
+#   - aisle occupancy: a picker counts as inside the aisle of their last pick
+#     for PRESENCE_SEC or until their next pick elsewhere. Presences expire from
+#     a FIFO queue as the event clock advances. Aisle B with more than
+#     FORKLIFT_MAX_PICKERS pickers inside raises an alert
+#   - rolling aisle x hour pick counters and shortcuts per hour over the last
+#     ROLLING_HOURS hours of event time
+# The aisle of a pick is the aisle of the SKU's current slot (cleaned_data).
+# Events are expected in near time order; an event older than its picker's last
+# one is counted but does not move the picker or feed the speed check.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "cleaned_data")
+MOVEMENT_LOG = os.path.join(BASE_DIR, "picker_movement.csv")
+EVENT_COLUMNS = ['picker_id', 'order_id', 'sku_id', 'movement_timestamp', 'travel_distance_m']
+UNKNOWN_AISLE = 'Unknown'
+
+PRESENCE_SEC = 120
+ROLLING_HOURS = 24
+MAX_ALERTS = 200
+POLL_SEC = 0.2
+READ_BYTES = 1 << 20
+DEFAULT_PORT = 9099
+
+_day_seconds = {}
+
+
+def parse_time(text):
+    # 'YYYY-MM-DD HH:MM:SS[.f]' -> seconds since 0001-01-01 (naive); other formats via fromisoformat
+    day = _day_seconds.get(text[:10])
+    if day is None:
+        try:
+            day = _day_seconds[text[:10]] = date.fromisoformat(text[:10]).toordinal() * 86400
+        except ValueError:
+            day = None
+    if day is not None and len(text) >= 19 and text[13] == ':' and text[16] == ':':
+        return day + int(text[11:13]) * 3600 + int(text[14:16]) * 60 + float(text[17:])
+    t = datetime.fromisoformat(text)
+    return t.toordinal() * 86400 + t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
+
+
+def format_time(seconds):
+    day, rest = divmod(seconds, 86400)
+    return datetime.fromordinal(int(day)) + pd.Timedelta(seconds=rest)
+
+
+def load_sku_aisles(data_dir=DATA_DIR):
+    # sku_id -> aisle of its current slot
+    sku_df = columnar.load_cleaned('sku_master', data_dir)
+    constraints_df = columnar.load_cleaned('warehouse_constraints', data_dir, dtype={'slot_id': str})
+    slot_aisle = pd.Series(constraints_df['aisle_id'].astype(str).to_numpy(),
+                           index=columnar.normalize_ids(constraints_df['slot_id']).to_numpy())
+    slot_aisle = slot_aisle[~slot_aisle.index.duplicated()]
+    aisles = slot_aisle.reindex(columnar.normalize_ids(sku_df['current_slot']).to_numpy()).fillna(UNKNOWN_AISLE)
+    return dict(zip(columnar.normalize_ids(sku_df['sku_id']).to_numpy(), aisles.to_numpy()))
+
+
+class LiveState:
+    def __init__(self, sku_aisle, presence_sec=PRESENCE_SEC, rolling_hours=ROLLING_HOURS):
+        self.sku_aisle = sku_aisle
+        self.presence_sec = presence_sec
+        self.rolling_sec = rolling_hours * 3600
+        self.aisle_b = {}               # aisle -> is Aisle B
+        self.pickers = {}               # picker_id -> [last event time, aisle, inside]
+        self.occupancy = {}             # aisle -> pickers inside
+        self.presences = deque()        # (expires at, picker_id, event time)
+        self.congested = {}             # Aisle B aisle -> time it went over FORKLIFT_MAX_PICKERS
+        self.hours = {}                 # hour start -> {aisle: picks}
+        self.shortcut_hours = {}        # hour start -> shortcuts
+        self.alerts = deque(maxlen=MAX_ALERTS)
+        self.clock = -math.inf
+        self.events = 0
+        self.shortcuts = 0
+        self.aisle_b_alerts = 0
+        self.late = 0
+        self.skipped = 0
+        self.busy_sec = 0.0
+        self.started = time.time()
+        self.source = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    def _is_b(self, aisle):
+        b = self.aisle_b.get(aisle)
+        if b is None:
+            b = self.aisle_b[aisle] = is_aisle_b(aisle) and aisle != UNKNOWN_AISLE
+        return b
+
+    def _enter(self, aisle, t):
+        n = self.occupancy.get(aisle, 0) + 1
+        self.occupancy[aisle] = n
+        if n > FORKLIFT_MAX_PICKERS and aisle not in self.congested and self._is_b(aisle):
+            self.congested[aisle] = t
+            self.aisle_b_alerts += 1
+            self.alerts.append((t, 'aisle_b', None, aisle, f"{n} pickers inside, forklifts blocked"))
+
+    def _leave(self, aisle, t):
+        n = self.occupancy[aisle] - 1
+        self.occupancy[aisle] = n
+        if n <= FORKLIFT_MAX_PICKERS and aisle in self.congested:
+            since = self.congested.pop(aisle)
+            self.alerts.append((t, 'aisle_b_clear', None, aisle, f"cleared after {t - since:.0f}s"))
+
+    def _expire(self, now):
+        presences, pickers = self.presences, self.pickers
+        while presences and presences[0][0] <= now:
+            expires, picker, t = presences.popleft()
+            state = pickers[picker]
+            if state[0] == t and state[2]:
+                state[2] = False
+                self._leave(state[1], expires)
+
+    def _count_hour(self, hour, aisle):
+        bucket = self.hours.get(hour)
+        if bucket is None:
+            bucket = self.hours[hour] = {}
+            # A new hour: drop the ones that left the window (at most ROLLING_HOURS + 1 kept)
+            for old in [h for h in self.hours if h <= hour - self.rolling_sec]:
+                del self.hours[old]
+                self.shortcut_hours.pop(old, None)
+        bucket[aisle] = bucket.get(aisle, 0) + 1
+
+    def add(self, picker, sku, t, distance):
+        # One movement event (picker_id, sku_id, event time in seconds, travel_distance_m)
+        aisle = self.sku_aisle.get(sku, UNKNOWN_AISLE)
+        self.events += 1
+        if t > self.clock:
+            self.clock = t
+            if self.presences and self.presences[0][0] <= t:
+                self._expire(t)
+        hour = t - t % 3600
+        if hour > self.clock - self.rolling_sec:
+            self._count_hour(hour, aisle)
+
+        state = self.pickers.get(picker)
+        if state is not None:
+            dt = t - state[0]
+            if dt < 0:
+                self.late += 1
+                return
+            if 0 < dt < MAX_INTERVAL_SEC and distance / dt > SPEED_THRESHOLD:
+                self.shortcuts += 1
+                if hour in self.hours:
+                    self.shortcut_hours[hour] = self.shortcut_hours.get(hour, 0) + 1
+                self.alerts.append((t, 'shortcut', picker, aisle, f"{distance / dt:.1f} m/s over {distance:.0f} m"))
+            if state[2]:
+                self._leave(state[1], t)
+            state[0], state[1], state[2] = t, aisle, True
+        else:
+            self.pickers[picker] = [t, aisle, True]
+        self._enter(aisle, t)
+        self.presences.append((t + self.presence_sec, picker, t))
+
+    def ingest(self, lines, columns=EVENT_COLUMNS):
+        # Parse and apply a batch of CSV lines (header lines are skipped); returns events applied
+        i_picker, i_sku = columns.index('picker_id'), columns.index('sku_id')
+        i_time, i_dist = columns.index('movement_timestamp'), columns.index('travel_distance_m')
+        width = max(i_picker, i_sku, i_time, i_dist) + 1
+        start = time.perf_counter()
+        applied = 0
+        with self.lock:
+            add = self.add
+            for line in lines:
+                fields = line.rstrip('\r\n').split(',')
+                if len(fields) < width:
+                    self.skipped += bool(line.strip())
+                    continue
+                if fields[i_picker] == 'picker_id':
+                    continue
+                try:
+                    t = parse_time(fields[i_time].strip())
+                    distance = float(fields[i_dist])
+                except ValueError:
+                    self.skipped += 1
+                    continue
+                if distance != distance:
+                    self.skipped += 1
+                    continue
+                add(fields[i_picker].strip().upper(), fields[i_sku].strip().upper(), t, distance)
+                applied += 1
+            self.busy_sec += time.perf_counter() - start
+        return applied
+
+    def snapshot(self):
+        # Copy of the state for rendering: counters, rolling aisle x hour frame, Aisle B occupancy, alerts
+        with self.lock:
+            rows = [(hour, aisle, n) for hour, bucket in self.hours.items() for aisle, n in bucket.items()]
+            shortcut_rows = list(self.shortcut_hours.items())
+            aisle_b = {a: n for a, n in self.occupancy.items() if self._is_b(a)}
+            alerts = list(self.alerts)
+            snap = {
+                'events': self.events, 'shortcuts': self.shortcuts, 'aisle_b_alerts': self.aisle_b_alerts,
+                'late': self.late, 'skipped': self.skipped, 'pickers': len(self.pickers),
+                'pickers_inside': sum(1 for s in self.pickers.values() if s[2]),
+                'congested': sorted(self.congested), 'busy_sec': self.busy_sec,
+                'uptime_sec': time.time() - self.started, 'source': self.source, 'error': self.error,
+                'clock': format_time(self.clock) if self.events else None,
+            }
+        aisle_hour = pd.DataFrame(rows, columns=['hour', 'aisle', 'pick_count'])
+        aisle_hour['hour'] = [format_time(h) for h in aisle_hour['hour']]
+        shortcuts = pd.DataFrame(shortcut_rows, columns=['hour', 'shortcut_count'])
+        shortcuts['hour'] = [format_time(h) for h in shortcuts['hour']]
+        snap['aisle_hour'] = aisle_hour
+        snap['shortcuts_by_hour'] = shortcuts.sort_values('hour')
+        snap['aisle_b'] = pd.DataFrame(sorted(aisle_b.items()), columns=['aisle', 'pickers_inside'])
+        snap['alerts'] = pd.DataFrame(
+            [(format_time(t), kind, picker, aisle, detail) for t, kind, picker, aisle, detail in reversed(alerts)],
+            columns=['time', 'kind', 'picker_id', 'aisle', 'detail'])
+        snap['events_per_sec'] = snap['events'] / snap['busy_sec'] if snap['busy_sec'] else 0.0
+        return snap
+
+
+def _split_lines(buffer, data):
+    # (complete lines, trailing partial line)
+    buffer += data
+    end = buffer.rfind('\n') + 1
+    return buffer[:end].splitlines(), buffer[end:]
+
+
+def follow(state, path=MOVEMENT_LOG, from_start=False, stop=None, poll_sec=POLL_SEC):
+    # Tail a growing movement CSV: new complete lines are ingested as they are appended.
+    # Starts at the end of the file unless from_start; a truncated file is read again from the top.
+    state.source = f"tail {path}"
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        with open(path, 'r', newline='') as f:
+            columns = [c.strip() for c in f.readline().rstrip('\r\n').split(',')]
+            if not from_start:
+                f.seek(0, os.SEEK_END)
+            buffer = ''
+            while not stop.is_set():
+                data = f.read(READ_BYTES)
+                if data:
+                    lines, buffer = _split_lines(buffer, data)
+                    state.ingest(lines, columns)
+                    continue
+                if os.path.getsize(path) < f.tell():
+                    from_start = True
+                    break
+                stop.wait(poll_sec)
+
+
+def listen(state, host='127.0.0.1', port=DEFAULT_PORT, stop=None):
+    # Newline-delimited CSV events (EVENT_COLUMNS order) from producers on a local TCP socket
+    state.source = f"socket {host}:{port}"
+    stop = stop or threading.Event()
+    server = socket.create_server((host, port))
+    server.settimeout(POLL_SEC)
+    with server:
+        while not stop.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            threading.Thread(target=_read_connection, args=(state, conn, stop), daemon=True).start()
+
+
+def _read_connection(state, conn, stop):
+    conn.settimeout(POLL_SEC)
+    buffer = ''
+    with conn:
+        while not stop.is_set():
+            try:
+                data = conn.recv(READ_BYTES)
+            except socket.timeout:
+                continue
+            if not data:
+                break
+            lines, buffer = _split_lines(buffer, data.decode('utf-8', errors='replace'))
+            state.ingest(lines)
+    if buffer:
+        state.ingest([buffer])
+
+
+def start(state, path=None, port=None, from_start=False):
+    # Ingest on a daemon thread (tail `path`, or listen on `port`); returns the stop event
+    stop = threading.Event()
+
+    def run():
+        try:
+            if port is not None:
+                listen(state, port=port, stop=stop)
+            else:
+                follow(state, path or MOVEMENT_LOG, from_start, stop)
+        except Exception as e:
+            state.error = f"{type(e).__name__}: {e}"
+
+    threading.Thread(target=run, name='live_ingest', daemon=True).start()
+    return stop
+
+
+def send(path, host='127.0.0.1', port=DEFAULT_PORT, rate=None, limit=None):
+    # Stand-in producer: stream a movement CSV to the socket (rate = events/s, default unthrottled)
+    with open(path) as f, socket.create_connection((host, port)) as conn:
+        header = f.readline()
+        columns = [c.strip() for c in header.rstrip('\r\n').split(',')]
+        if columns != EVENT_COLUMNS:
+            raise ValueError(f"{path}: expected columns {EVENT_COLUMNS}, got {columns}")
+        sent, start, batch = 0, time.perf_counter(), []
+        for line in f:
+            batch.append(line)
+            sent += 1
+            if len(batch) == 1000 or sent == limit:
+                conn.sendall(''.join(batch).encode())
+                batch = []
+                if rate:
+                    ahead = sent / rate - (time.perf_counter() - start)
+                    if ahead > 0:
+                        time.sleep(ahead)
+            if sent == limit:
+                break
+        if batch:
+            conn.sendall(''.join(batch).encode())
+    return sent
+
+
+def print_status(snap):
+    print(f"[{snap['clock']}] {snap['events']:,} events ({snap['events_per_sec']:,.0f}/s ingest), "
+          f"{snap['shortcuts']:,} shortcuts, {snap['pickers_inside']} pickers inside aisles, "
+          f"Aisle B over {FORKLIFT_MAX_PICKERS}: {', '.join(snap['congested']) or 'none'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live picker movement ingest: shortcuts, Aisle B congestion, "
+                                                 "rolling aisle x hour counts")
+    parser.add_argument('--dir', default=DATA_DIR, help="cleaned_data directory (SKU -> aisle map)")
+    parser.add_argument('--follow', metavar='CSV', help=f"tail a growing movement log (default {MOVEMENT_LOG})")
+    parser.add_argument('--from-start', action='store_true', help="with --follow: read the existing rows first")
+    parser.add_argument('--listen', type=int, metavar='PORT', help="read events from a local TCP socket")
+    parser.add_argument('--send', metavar='CSV', help="stream a movement CSV to --port (stand-in producer)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--rate', type=float, default=None, help="with --send: events per second")
+    parser.add_argument('--bench', metavar='CSV', help="replay a movement CSV through the state and time it")
+    parser.add_argument('--every', type=float, default=5.0, help="seconds between status lines")
+    args = parser.parse_args()
+
+    if args.send:
+        sent = send(args.send, port=args.port, rate=args.rate)
+        print(f"Sent {sent:,} events to port {args.port}")
+    elif args.bench:
+        state = LiveState(load_sku_aisles(args.dir))
+        with open(args.bench) as f:
+            columns = [c.strip() for c in f.readline().rstrip('\r\n').split(',')]
+            lines = f.readlines()
+        with instrument.stage('live_ingest_bench', rows_in=len(lines)) as rec:
+            start = time.perf_counter()
+            for i in range(0, len(lines), 10000):
+                state.ingest(lines[i:i + 10000], columns)
+            seconds = time.perf_counter() - start
+            rec['rows_out'] = state.events
+        snap = state.snapshot()
+        print(f"Replayed {state.events:,} events in {seconds:.2f}s: {state.events / seconds:,.0f} events/s")
+        print(f"Shortcuts: {snap['shortcuts']:,}  Aisle B congestion alerts: {snap['aisle_b_alerts']:,}  "
+              f"Late events: {snap['late']:,}  Skipped lines: {snap['skipped']:,}")
+        print(f"Rolling window: {len(snap['aisle_hour']):,} aisle-hour cells over the last {ROLLING_HOURS}h")
+        instrument.print_summary()
+    else:
+        state = LiveState(load_sku_aisles(args.dir))
+        stop = start(state, path=args.follow, port=args.listen, from_start=args.from_start)
+        print(f"Ingesting from {'port ' + str(args.listen) if args.listen is not None else args.follow or MOVEMENT_LOG} "
+              f"(Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(args.every)
+                if state.error:
+                    raise SystemExit(f"Ingest failed: {state.error}")
+                print_status(state.snapshot())
+        except KeyboardInterrupt:
+            stop.set()
@@ -0,0 +1,288 @@
+import pandas as pd
+import numpy as np
+import math
+import time
+
+import columnar
+import schema
+import topology
+from assignment_solver import INFEASIBLE, AISLE_B_PENALTY
+
+# Time-budgeted simulated annealing on a finished slotting plan.
+#
+# Cost of a plan = sum over SKUs of
+#     order_count x walking distance from the dock to its slot
+#   + INFEASIBLE for a temp mismatch or weight over capacity (also for no slot)
+#   + AISLE_B_PENALTY for a high-velocity SKU in Aisle B
+#   + MOVE_COST when the SKU ends up away from its current slot (a forklift move)
+# + AISLE_B_LOAD_WEIGHT x sum over Aisle B aisles of (order_count in the aisle)^2,
+#   so demand in the narrow aisles is spread out instead of stacked.
+#
+# Neighbours are relocations (a SKU to an empty slot of its temp zone) and swaps
+# (two SKUs in slots of the same temp zone trade places). Both change the SKU
+# terms of at most two SKUs and the load of at most two aisles, so a candidate is
+# scored by an O(1) delta; empty slots and SKUs are kept in per-zone lists with
+# swap-remove. The temperature falls geometrically over the time budget and the
+# best plan seen is kept.
+
+MOVE_COST = 1000.0            # order_count x metres, i.e. worth ~10 m for a 100-order SKU
+AISLE_B_LOAD_WEIGHT = 0.001   # per (orders in the aisle)^2
+RELOCATE_SHARE = 0.5          # share of relocations among the candidate moves
+FINAL_TEMPERATURE = 1.0
+BATCH = 4096                  # random numbers drawn per numpy call
+SNAPSHOT_EVERY = 20000        # iterations between best-plan checks
+
+
+def _sku_cost(velocity, weight, temp, high_velocity, home, slot, slot_temp, slot_capacity, slot_b, dock):
+    # Cost of one SKU in one slot (-1 = no slot)
+    if slot < 0:
+        return INFEASIBLE
+    cost = velocity * dock[slot]
+    if slot_temp[slot] >= 0 and slot_temp[slot] != temp:
+        cost += INFEASIBLE
+    if weight > slot_capacity[slot]:
+        cost += INFEASIBLE
+    if high_velocity and slot_b[slot]:
+        cost += AISLE_B_PENALTY
+    if slot != home:
+        cost += MOVE_COST
+    return cost
+
+
+def plan_cost(codes, home, velocity, weight, temp, high_velocity, slot_temp, slot_capacity, slot_b, slot_aisle, dock):
+    # Full (vectorized) cost of a plan by component; the annealing deltas add up to the change of 'total'
+    placed = codes >= 0
+    s = np.where(placed, codes, 0)
+    penalty = np.where(placed, 0.0, INFEASIBLE)
+    penalty += np.where(placed & (slot_temp[s] >= 0) & (slot_temp[s] != temp), INFEASIBLE, 0.0)
+    penalty += np.where(placed & (weight > slot_capacity[s]), INFEASIBLE, 0.0)
+    penalty += np.where(placed & high_velocity & slot_b[s], AISLE_B_PENALTY, 0.0)
+    in_b = placed & slot_b[s]
+    load = np.bincount(slot_aisle[s][in_b], weights=velocity[in_b], minlength=slot_aisle.max() + 1)
+    parts = {
+        'travel': float(np.where(placed, velocity * dock[s], 0.0).sum()),
+        'aisle_b_load': float(AISLE_B_LOAD_WEIGHT * (load ** 2).sum()),
+        'moves': float(MOVE_COST * (placed & (codes != home)).sum()),
+        'penalties': float(penalty.sum()),
+    }
+    parts['total'] = sum(parts.values())
+    return parts
+
+
+def _initial_temperature(deltas):
+    # Typical uphill step that is not a constraint penalty, accepted with probability ~1/2
+    uphill = [d for d in deltas if 0 < d < AISLE_B_PENALTY]
+    return max(float(np.median(uphill)) / math.log(2), FINAL_TEMPERATURE * 10) if uphill else FINAL_TEMPERATURE * 10
+
+
+def anneal(codes, home, velocity, weight, temp, high_velocity, slot_temp, slot_capacity, slot_b, slot_aisle, dock,
+           seconds, seed=0):
+    # codes: slot code per SKU (-1 = no slot), at most one SKU per slot. Returns (best codes, stats)
+    rng = np.random.default_rng(seed)
+    n_skus, n_slots = len(codes), len(slot_temp)
+    # Python lists / floats: per-iteration work is scalar, where numpy indexing is slow
+    plan = [int(c) for c in codes]
+    home_l = [int(h) for h in home]
+    vel, wt = velocity.tolist(), weight.tolist()
+    tmp, hv = temp.tolist(), high_velocity.tolist()
+    s_temp, s_cap, s_b = slot_temp.tolist(), slot_capacity.tolist(), slot_b.tolist()
+    s_aisle, s_dock = slot_aisle.tolist(), dock.tolist()
+
+    def cost_of(i, slot):
+        return _sku_cost(vel[i], wt[i], tmp[i], hv[i], home_l[i], slot, s_temp, s_cap, s_b, s_dock)
+
+    # Aisle B load, empty slots per temp zone, SKUs per temp zone of their slot
+    load = {}
+    occupied = [False] * n_slots
+    for i, s in enumerate(plan):
+        if s >= 0:
+            occupied[s] = True
+            if s_b[s]:
+                load[s_aisle[s]] = load.get(s_aisle[s], 0.0) + vel[i]
+    empty, empty_pos = {}, {}
+    for s in range(n_slots):
+        if not occupied[s] and s_temp[s] >= 0:
+            lst = empty.setdefault(s_temp[s], [])
+            empty_pos[s] = len(lst)
+            lst.append(s)
+    skus, sku_pos = {}, {}
+    for i, s in enumerate(plan):
+        zone = s_temp[s] if s >= 0 else -1
+        lst = skus.setdefault(zone, [])
+        sku_pos[i] = len(lst)
+        lst.append(i)
+
+    def remove(lists, pos, zone, item):
+        lst = lists[zone]
+        k = pos.pop(item)
+        last = lst.pop()
+        if last != item:
+            lst[k] = last
+            pos[last] = k
+
+    def add(lists, pos, zone, item):
+        lst = lists.setdefault(zone, [])
+        pos[item] = len(lst)
+        lst.append(item)
+
+    def load_delta(aisle, change):
+        # Change of AISLE_B_LOAD_WEIGHT * load^2 when `change` orders enter (or leave, < 0) aisle
+        current = load.get(aisle, 0.0)
+        return AISLE_B_LOAD_WEIGHT * ((current + change) ** 2 - current ** 2)
+
+    def relocate_delta(i, e):
+        s = plan[i]
+        delta = cost_of(i, e) - cost_of(i, s)
+        if s >= 0 and s_b[s] and s_b[e] and s_aisle[s] == s_aisle[e]:
+            return delta
+        if s >= 0 and s_b[s]:
+            delta += load_delta(s_aisle[s], -vel[i])
+        if s_b[e]:
+            delta += load_delta(s_aisle[e], vel[i])
+        return delta
+
+    def swap_delta(i, j):
+        si, sj = plan[i], plan[j]
+        delta = cost_of(i, sj) + cost_of(j, si) - cost_of(i, si) - cost_of(j, sj)
+        if s_b[si] and s_b[sj] and s_aisle[si] == s_aisle[sj]:
+            return delta
+        if s_b[si]:
+            delta += load_delta(s_aisle[si], vel[j] - vel[i])
+        if s_b[sj]:
+            delta += load_delta(s_aisle[sj], vel[i] - vel[j])
+        return delta
+
+    def propose(u1, u2, u3):
+        # (kind, i, target) of a random candidate move, or None
+        i = int(u1 * n_skus)
+        zone = tmp[i]
+        if u3 < RELOCATE_SHARE:
+            pool = empty.get(zone)
+            if not pool:
+                return None
+            return 0, i, pool[int(u2 * len(pool))]
+        pool = skus.get(zone)
+        if not pool or plan[i] < 0:
+            return None
+        j = pool[int(u2 * len(pool))]
+        if j == i or plan[j] < 0:
+            return None
+        return 1, i, j
+
+    def apply(kind, i, target):
+        s = plan[i]
+        if kind == 0:
+            if s >= 0:
+                if s_b[s]:
+                    load[s_aisle[s]] -= vel[i]
+                if s_temp[s] >= 0:
+                    add(empty, empty_pos, s_temp[s], s)
+            remove(empty, empty_pos, s_temp[target], target)
+            if s_b[target]:
+                load[s_aisle[target]] = load.get(s_aisle[target], 0.0) + vel[i]
+            old_zone = s_temp[s] if s >= 0 else -1
+            if old_zone != s_temp[target]:
+                remove(skus, sku_pos, old_zone, i)
+                add(skus, sku_pos, s_temp[target], i)
+            plan[i] = target
+        else:
+            j = target
+            sj = plan[j]
+            if s_b[s]:
+                load[s_aisle[s]] += vel[j] - vel[i]
+            if s_b[sj]:
+                load[s_aisle[sj]] += vel[i] - vel[j]
+            # Both slots keep their temp zones, so the per-zone SKU lists only change if they differ
+            if s_temp[s] != s_temp[sj]:
+                remove(skus, sku_pos, s_temp[s], i)
+                remove(skus, sku_pos, s_temp[sj], j)
+                add(skus, sku_pos, s_temp[sj], i)
+                add(skus, sku_pos, s_temp[s], j)
+            plan[i], plan[j] = sj, s
+
+    def delta_of(kind, i, target):
+        return relocate_delta(i, target) if kind == 0 else swap_delta(i, target)
+
+    # Starting temperature from a sample of candidate deltas
+    sample = rng.random((2000, 3))
+    deltas = []
+    for u1, u2, u3 in sample:
+        move = propose(u1, u2, u3)
+        if move is not None:
+            deltas.append(delta_of(*move))
+    t0 = _initial_temperature(deltas)
+
+    args = (home, velocity, weight, temp, high_velocity, slot_temp, slot_capacity, slot_b, slot_aisle, dock)
+    initial = plan_cost(np.asarray(codes), *args)
+    current = best = initial['total']
+    best_plan = list(plan)
+    iterations = accepted = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    cooling = math.log(FINAL_TEMPERATURE / t0) if t0 > FINAL_TEMPERATURE else 0.0
+    temperature = t0
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        temperature = t0 * math.exp(cooling * (now - start) / seconds)
+        draws = rng.random((BATCH, 4)).tolist()
+        for u1, u2, u3, u4 in draws:
+            iterations += 1
+            move = propose(u1, u2, u3)
+            if move is None:
+                continue
+            delta = delta_of(*move)
+            if delta < 0 or (delta < AISLE_B_PENALTY and u4 < math.exp(-delta / temperature)):
+                apply(*move)
+                current += delta
+                accepted += 1
+        if current < best and iterations % SNAPSHOT_EVERY < BATCH:
+            best, best_plan = current, list(plan)
+    if current < best:
+        best, best_plan = current, list(plan)
+    elapsed = time.perf_counter() - start
+
+    best_codes = np.array(best_plan, dtype=np.int32)
+    final = plan_cost(best_codes, *args)
+    stats = {
+        'iterations': iterations, 'accepted': accepted, 'seconds': elapsed,
+        'iterations_per_sec': iterations / elapsed if elapsed else 0.0,
+        'initial_temperature': t0, 'initial_cost': initial, 'final_cost': final,
+        'gain': initial['total'] - final['total'], 'tracked_cost': best,
+        'changed_skus': int((best_codes != np.asarray(codes)).sum()),
+    }
+    return best_codes, stats
+
+
+def improve(sku_df, constraints_df, bins, seconds, base_dir=columnar.CLEANED_DIR, seed=0):
+    # Anneal a plan given as Bin_ID per sku_df row (typed frames from schema.apply_schema,
+    # order_count / is_high_velocity from mark_velocity). Returns (Bin_ID per row, stats)
+    slot_index = schema.id_index(constraints_df['slot_id'])
+    codes = schema.encode(pd.Series(bins, dtype=object), slot_index)
+    topo = topology.load(base_dir, constraints_df)
+    rows = np.arange(len(constraints_df))
+    # Duplicate slot_id rows are never offered as targets (codes point at the first row)
+    usable = constraints_df['slot_code'].to_numpy() == rows
+    slot_temp = np.where(usable, constraints_df['temp_zone'].cat.codes.to_numpy(), -1)
+    best_codes, stats = anneal(
+        codes, sku_df['slot_code'].to_numpy(),
+        sku_df['order_count'].to_numpy(dtype=float), sku_df['weight_kg'].to_numpy(dtype=float),
+        sku_df['temp_req'].cat.codes.to_numpy(), sku_df['is_high_velocity'].to_numpy(dtype=bool),
+        slot_temp, constraints_df['max_weight_kg'].to_numpy(dtype=float),
+        constraints_df['is_aisle_b'].eq(True).to_numpy(), np.asarray(topo.slot_aisle, dtype=np.int64),
+        np.nan_to_num(topo.dock_distance(rows)), seconds, seed)
+    slot_ids = constraints_df['slot_id'].astype(str).to_numpy()
+    return np.where(best_codes >= 0, slot_ids[np.maximum(best_codes, 0)], None), stats
+
+
+def print_stats(stats):
+    print("\n--- LOCAL SEARCH (simulated annealing) ---")
+    print(f"Iterations: {stats['iterations']:,} in {stats['seconds']:.2f}s "
+          f"({stats['iterations_per_sec']:,.0f}/s), {stats['accepted']:,} accepted")
+    before, after = stats['initial_cost'], stats['final_cost']
+    for name in ['travel', 'aisle_b_load', 'moves', 'penalties', 'total']:
+        change = after[name] - before[name]
+        share = f" ({change / before[name]:+.1%})" if before[name] else ""
+        print(f" - {name}: {before[name]:,.0f} -> {after[name]:,.0f}{share}")
+    print(f"Gain: {stats['gain']:,.0f}; SKUs re-slotted by the search: {stats['changed_skus']:,}")
@@ -0,0 +1,211 @@
+import pandas as pd
+import numpy as np
+import os
+import argparse
+from scipy.optimize import linear_sum_assignment
+
+import columnar
+from slot_index import is_aisle_b
+
+# Executable move sequence for a slotting plan.
+#
+# Every moving SKU is an edge from its current slot to its planned slot. A slot
+# holds one SKU and receives at most one, so the edges form disjoint chains and
+# cycles. A SKU can move once its target is empty: a chain runs from the SKU
+# whose target is already empty and continues with the SKU waiting for the slot
+# just vacated (one forklift trip per move, no staging). A cycle needs one SKU
+# parked in a buffer first (one extra trip). Buffers are empty rack slots of the
+# parked SKU's temp zone when there are any - cycles run one after another, so
+# one slot per zone is reused - and a floor position otherwise. Chains and
+# cycles are found in one pass over the moves.
+#
+# rotate_unplaced() turns SKUs the greedy loop could not place (no compatible
+# empty slot) into swaps / rotations among their own slots where that makes
+# each of them compliant.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEQUENCE_FILE = os.path.join(BASE_DIR, "move_sequence.csv")
+FLOOR = "FLOOR"
+STAY_COST = 1.0
+INFEASIBLE = 1e9
+
+
+def sequence_moves(sku_ids, from_slots, to_slots, constraints_df, sku_temp=None):
+    # Returns (steps DataFrame, summary dict). from_slots = occupancy before the plan
+    # (all SKUs, moving or not), to_slots = planned slot (NaN = stays).
+    sku_ids = np.asarray(sku_ids, dtype=object)
+    src = pd.Series(from_slots).astype(object).to_numpy()
+    dst = pd.Series(to_slots).astype(object).to_numpy()
+    moving = pd.notna(dst) & (dst != src)
+    idx = np.flatnonzero(moving)
+    temps = pd.Series(sku_temp if sku_temp is not None else [None] * len(sku_ids)).astype(object).to_numpy()
+
+    # A slot targeted twice cannot be executed; slots shared with a SKU that stays are shared bins already
+    staying = set(src[~moving & pd.notna(src)])
+    targets, conflicts = set(), []
+    for i in idx:
+        if dst[i] in targets:
+            conflicts.append(i)
+        targets.add(dst[i])
+    # ... and neither can anything waiting (down a chain) for a conflicting SKU's slot
+    target_of = {dst[i]: i for i in idx}
+    conflict_set = set(conflicts)
+    for c in list(conflicts):
+        w = target_of.get(src[c])
+        while w is not None and w not in conflict_set:
+            conflicts.append(w)
+            conflict_set.add(w)
+            w = target_of.get(src[w])
+    idx = [i for i in idx if i not in conflict_set]
+
+    # i waits for every moving SKU still in its target slot (one per slot unless bins are shared)
+    occupants = {}
+    for i in idx:
+        occupants.setdefault(src[i], []).append(i)
+    waiting = {i: 0 for i in idx}
+    dependents = {}
+    for i in idx:
+        for b in occupants.get(dst[i], ()):
+            if b != i:
+                waiting[i] += 1
+                dependents.setdefault(b, []).append(i)
+
+    steps, done, parked = [], set(), {}
+    group = [-1]
+
+    def vacate(i):
+        # i has left its slot: SKUs waiting for it may be ready
+        ready = []
+        for j in dependents.get(i, ()):
+            waiting[j] -= 1
+            if waiting[j] == 0:
+                ready.append(j)
+        return ready
+
+    def run(stack, kind):
+        # Depth-first so each chain is emitted contiguously
+        while stack:
+            i = stack.pop()
+            if i in parked:
+                steps.append((group[0], 'from_buffer', sku_ids[i], parked.pop(i), dst[i]))
+            else:
+                steps.append((group[0], kind, sku_ids[i], src[i], dst[i]))
+                stack.extend(vacate(i))
+            done.add(i)
+
+    # Chains: heads have an empty target; ordered by target so the forklift works aisle by aisle
+    for head in sorted((i for i in idx if waiting[i] == 0), key=lambda i: str(dst[i])):
+        group[0] += 1
+        run([head], 'chain')
+    n_chains = group[0] + 1
+
+    # Empty rack slots after the chains, one staging slot per temp zone
+    zone = pd.Series(constraints_df['temp_zone'].astype(object).to_numpy(), index=constraints_df['slot_id'].astype(str))
+    zone = zone[~zone.index.duplicated()]
+    occupied = staying | {src[i] for i in idx if i not in done} | {dst[i] for i in done} | set(src[conflicts])
+    free = zone[~zone.index.isin(list(occupied))].dropna().drop_duplicates()
+    staging = dict(zip(free.to_numpy(), free.index))
+
+    # Cycles: park one member in a buffer (rack slot of its temp zone, else the floor), run the rest
+    n_cycles, floor_cycles = 0, 0
+    for start in idx:
+        if start in done:
+            continue
+        # Walk waiting links from start until a SKU repeats: that loop is a cycle
+        seen, i = {}, start
+        while i not in seen:
+            seen[i] = len(seen)
+            i = next(b for b in occupants[dst[i]] if b not in done and b not in parked and b != i)
+        cycle = list(seen)[seen[i]:]
+        p = next((m for m in cycle if temps[m] in staging), cycle[0])
+        buffer = staging.get(temps[p], FLOOR)
+        floor_cycles += buffer == FLOOR
+        group[0] += 1
+        steps.append((group[0], 'to_buffer', sku_ids[p], src[p], buffer))
+        parked[p] = buffer
+        stack = [p] if waiting[p] == 0 else []
+        ready = vacate(p)
+        run(stack + ready, 'cycle')
+        n_cycles += 1
+
+    steps = pd.DataFrame(steps, columns=['group', 'kind', 'sku_id', 'from_slot', 'to_slot'])
+    steps.insert(0, 'step', np.arange(1, len(steps) + 1))
+    chain_lengths = steps[steps['kind'] == 'chain'].groupby('group').size()
+    summary = {
+        'moves': len(idx),
+        'chains': n_chains,
+        'longest_chain': int(chain_lengths.max()) if len(chain_lengths) else 0,
+        'cycles': n_cycles,
+        'forklift_trips': len(steps),
+        'rack_buffer_cycles': n_cycles - int(floor_cycles),
+        'floor_buffer_slots': int(floor_cycles > 0),
+        'shared_bins': int(sum(dst[i] in staying for i in idx)),
+        'conflicts': [sku_ids[i] for i in conflicts],
+    }
+    return steps, summary
+
+
+def rotate_unplaced(unplaced, constraints_df):
+    # Swaps / rotations among SKUs stuck in violating slots. Each SKU may take the
+    # slot of another stuck SKU if it complies there (temp, weight, no high-velocity
+    # SKU in Aisle B); a min-cost assignment (cost 0 = compliant move, STAY_COST =
+    # stay) maximizes the number fixed. Returns [{'sku_id', 'current_slot', 'new_slot'}].
+    if len(unplaced) < 2:
+        return []
+    slots = constraints_df.set_index(constraints_df['slot_id'].astype(str))
+    slots = slots[~slots.index.duplicated()]
+    current = unplaced['current_slot'].astype(str).to_numpy()
+    known = np.isin(current, slots.index)
+    unplaced, current = unplaced[known], current[known]
+    slot_temp = slots['temp_zone'].astype(object).reindex(current).to_numpy()
+    slot_capacity = slots['max_weight_kg'].reindex(current).to_numpy(dtype=float)
+    if 'is_aisle_b' in slots.columns:
+        slot_b = slots['is_aisle_b'].reindex(current).eq(True).to_numpy()
+    else:
+        slot_b = np.array([is_aisle_b(a) for a in slots['aisle_id'].reindex(current)])
+
+    temp = unplaced['temp_req'].astype(object).to_numpy()
+    weight = unplaced['weight_kg'].to_numpy(dtype=float)
+    high_velocity = unplaced['is_high_velocity'].astype(bool).to_numpy()
+    fits = (np.equal.outer(temp, slot_temp) & np.less_equal.outer(weight, slot_capacity)
+            & ~np.logical_and.outer(high_velocity, slot_b))
+    cost = np.where(fits, 0.0, INFEASIBLE)
+    np.fill_diagonal(cost, STAY_COST)
+    rows, cols = linear_sum_assignment(cost)
+    move = (rows != cols) & (cost[rows, cols] == 0)
+    return [{'sku_id': unplaced['sku_id'].iloc[r], 'current_slot': current[r], 'new_slot': current[c]}
+            for r, c in zip(rows[move], cols[move])]
+
+
+def print_summary(summary):
+    print("\n--- MOVE SEQUENCE ---")
+    print(f"Moves: {summary['moves']} in {summary['chains']} chains (longest {summary['longest_chain']}) "
+          f"and {summary['cycles']} cycles")
+    print(f"Forklift trips: {summary['forklift_trips']} "
+          f"({summary['cycles']} extra for cycle buffers, {summary['rack_buffer_cycles']} of them via empty rack slots)")
+    print(f"Floor buffer positions needed: {summary['floor_buffer_slots']}")
+    if summary['shared_bins']:
+        print(f"Moves into a bin shared with a SKU that stays: {summary['shared_bins']}")
+    if summary['conflicts']:
+        print(f"WARNING: {len(summary['conflicts'])} moves target a slot another move also targets "
+              f"(not sequenced): {', '.join(map(str, summary['conflicts'][:5]))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sequence the moves of a slotting plan")
+    parser.add_argument('--plan', default=os.path.join(BASE_DIR, "final_slotting_plan.csv"))
+    parser.add_argument('--dir', default=columnar.CLEANED_DIR, help="cleaned_data directory")
+    parser.add_argument('--output', default=SEQUENCE_FILE)
+    args = parser.parse_args()
+
+    sku_df = columnar.load_cleaned('sku_master', args.dir)
+    constraints_df = columnar.load_cleaned('warehouse_constraints', args.dir, dtype={'slot_id': str})
+    sku_df['sku_id'] = columnar.normalize_ids(sku_df['sku_id'])
+    plan = pd.read_csv(args.plan, dtype={'sku_id': str, 'Bin_ID': str})
+    planned = pd.Series(columnar.normalize_ids(plan['Bin_ID']).to_numpy(), index=columnar.normalize_ids(plan['sku_id']))
+    planned = planned[~planned.index.duplicated()].reindex(sku_df['sku_id']).to_numpy()
+    steps, summary = sequence_moves(sku_df['sku_id'], columnar.normalize_ids(sku_df['current_slot']), planned,
+                                    constraints_df, sku_df['temp_req'])
+    print_summary(summary)
+    steps.to_csv(args.output, index=False)
+    print(f"Sequence: {args.output}")
@@ -0,0 +1,225 @@
+import pandas as pd
+import os
+import time
+import hashlib
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import columnar
+import instrument
+import clean_data
+import optimize_slotting
+from shared_arrays import SharedArrays, attach
+
+# Multi-site slotting: one optimize() per warehouse, sites in a process pool.
+#
+# A site is a subdirectory of the sites directory laid out like the repo root
+# (raw CSVs, cleaned_data/). Sites without cleaned_data are cleaned first, in
+# the same pool. The parent then loads every site's slot table and SKU master
+# attributes and puts each distinct table into shared memory once - sites built
+# from the same slot template or SKU catalog map the same block. Columns use the
+# columnar.py encoding (numeric arrays, categorical codes + categories), so a
+# worker rebuilds its frames as views on the shared blocks, read-only like the
+# memory-mapped columnar tables; only block names are pickled. The per-site
+# current_slot column is shared the same way. order_history stays per site and
+# is read by the worker. Each site's optimize() output goes to
+# <site>/optimize.log; clean_data.main() and optimize() get the site directory
+# explicitly, so plan, move sequence and slotting state are written into it.
+
+LOG_FILE = "optimize.log"
+SLOT_COLUMNS_EXCLUDED = ['current_slot']   # per-site columns of sku_master, not part of the shared catalog
+
+
+def find_sites(sites_dir):
+    # Subdirectories holding raw CSVs or cleaned_data, sorted by name
+    sites = []
+    for name in sorted(os.listdir(sites_dir)):
+        site_dir = os.path.join(sites_dir, name)
+        if os.path.isdir(site_dir) and (os.path.exists(os.path.join(site_dir, "sku_master.csv"))
+                                        or os.path.isdir(os.path.join(site_dir, "cleaned_data"))):
+            sites.append((name, site_dir))
+    return sites
+
+
+def is_cleaned(site_dir):
+    cleaned = os.path.join(site_dir, "cleaned_data")
+    return all(columnar.has_table(name, cleaned) or os.path.exists(os.path.join(cleaned, columnar.TABLES[name]))
+               for name in ['sku_master', 'warehouse_constraints', 'order_history'])
+
+
+def _clean_site(name, site_dir):
+    instrument.set_script(f"multi_site:{name}")
+    start = time.perf_counter()
+    with open(os.path.join(site_dir, "clean_data.log"), 'w') as log, contextlib.redirect_stdout(log):
+        clean_data.main(data_dir=site_dir)
+    return name, time.perf_counter() - start
+
+
+def fingerprint(df):
+    # Content hash of a table (column names, dtypes and values)
+    h = hashlib.sha1(repr([(c, str(df[c].dtype)) for c in df.columns]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def share_table(shm, key, df):
+    # Columns of df into shared memory as <key>/<column>[.codes|.categories]; returns the column layout
+    columns = []
+    for col in df.columns:
+        s = df[col]
+        if col in columnar.ID_COLUMNS:
+            s = columnar.normalize_ids(s)
+        if pd.api.types.is_datetime64_any_dtype(s):
+            shm.put(f"{key}/{col}", s.to_numpy(dtype='datetime64[ns]'))
+            columns.append((col, 'array'))
+        elif pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+            shm.put(f"{key}/{col}", s.to_numpy())
+            columns.append((col, 'array'))
+        else:
+            cat = s.astype('category')
+            # Codes in the dtype pandas picks, so from_codes wraps the shared block without a copy
+            shm.put(f"{key}/{col}.codes", cat.cat.codes.to_numpy())
+            shm.put(f"{key}/{col}.categories", cat.cat.categories.to_numpy(dtype=str))
+            columns.append((col, 'category'))
+    return columns
+
+
+def read_shared(arrays, key, columns):
+    # Frame of read-only views on a shared table (same shape as columnar.read_table)
+    data = {}
+    for col, kind in columns:
+        if kind == 'category':
+            codes = arrays[f"{key}/{col}.codes"]
+            codes.flags.writeable = False
+            data[col] = pd.Categorical.from_codes(codes, categories=arrays[f"{key}/{col}.categories"], validate=False)
+        else:
+            values = arrays[f"{key}/{col}"]
+            values.flags.writeable = False
+            data[col] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def _optimize_site(name, site_dir, specs, layouts, solver, use_affinity):
+    blocks, arrays = attach(specs)
+    try:
+        instrument.set_script(f"multi_site:{name}")
+
+        start = time.perf_counter()
+        sku_df = read_shared(arrays, *layouts['sku_attributes'])
+        sku_df['current_slot'] = read_shared(arrays, *layouts['sku_slots'])['current_slot']
+        constraints_df = read_shared(arrays, *layouts['slots'])
+        with open(os.path.join(site_dir, LOG_FILE), 'w') as log, contextlib.redirect_stdout(log):
+            result = optimize_slotting.optimize(solver, use_affinity, tables=(sku_df, constraints_df),
+                                                paths=optimize_slotting.site_paths(site_dir))
+        result['seconds'] = time.perf_counter() - start
+        return name, result
+    finally:
+        del arrays
+        for shm in blocks:
+            shm.close()
+
+
+def run_sites(sites_dir, workers=None, solver='greedy', use_affinity=False, clean=False):
+    workers = workers or os.cpu_count()
+    sites = find_sites(sites_dir)
+    if not sites:
+        print(f"No site datasets in {sites_dir}")
+        return None
+    start = time.perf_counter()
+
+    to_clean = [(name, site_dir) for name, site_dir in sites if clean or not is_cleaned(site_dir)]
+    if to_clean:
+        with instrument.stage('clean_sites', rows_in=len(to_clean)) as rec:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for name, seconds in pool.map(_clean_site, *zip(*to_clean)):
+                    print(f"Cleaned {name} in {seconds:.2f}s")
+            rec['rows_out'] = len(to_clean)
+
+    shm = SharedArrays()
+    try:
+        # Every distinct table goes into shared memory once; sites keep (key, column layout) references
+        with instrument.stage('share_tables', rows_in=len(sites)) as rec:
+            shared, site_layouts, site_bytes = {}, {}, 0
+            for name, site_dir in sites:
+                cleaned = os.path.join(site_dir, "cleaned_data")
+                sku_df = columnar.load_cleaned('sku_master', cleaned)
+                constraints_df = columnar.load_cleaned('warehouse_constraints', cleaned, dtype={'slot_id': str})
+                tables = {
+                    'slots': constraints_df,
+                    'sku_attributes': sku_df.drop(columns=SLOT_COLUMNS_EXCLUDED),
+                    'sku_slots': sku_df[SLOT_COLUMNS_EXCLUDED],
+                }
+                layouts = {}
+                for kind, df in tables.items():
+                    key = f"{kind}-{fingerprint(df)}"
+                    if key not in shared:
+                        shared[key] = share_table(shm, key, df)
+                    layouts[kind] = (key, shared[key])
+                site_layouts[name] = layouts
+                site_bytes += sum(df.memory_usage(deep=True).sum() for df in tables.values())
+            rec['rows_out'] = len(shared)
+        shared_bytes = sum(block.size for block in shm.blocks.values())
+        kinds = pd.Series([key.split('-')[0] for key in shared]).value_counts()
+        print(f"Shared tables: {len(shared)} distinct for {len(sites)} sites "
+              f"({', '.join(f'{n} {kind}' for kind, n in kinds.items())}), "
+              f"{shared_bytes / 1024 ** 2:.1f} MB in shared memory vs {site_bytes / 1024 ** 2:.1f} MB as per-site copies")
+
+        results = []
+        optimize_start = time.perf_counter()
+        with instrument.stage('optimize_sites', rows_in=len(sites)) as rec:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {}
+                for name, site_dir in sites:
+                    keys = [key for key, _ in site_layouts[name].values()]
+                    specs = {k: v for k, v in shm.specs.items() if k.split('/')[0] in keys}
+                    futures[pool.submit(_optimize_site, name, site_dir, specs, site_layouts[name],
+                                        solver, use_affinity)] = name
+                for future in as_completed(futures):
+                    try:
+                        name, result = future.result()
+                    except Exception as e:
+                        name, result = futures[future], {'error': f"{type(e).__name__}: {e}"}
+                    print(f"  {name}: {result['seconds']:.2f}s" if 'seconds' in result else f"  {name}: {result['error']}")
+                    results.append({'site': name, **result})
+            rec['rows_out'] = len(results)
+    finally:
+        shm.close()
+
+    optimize_wall = time.perf_counter() - optimize_start
+    summary = pd.DataFrame(results).sort_values('site').reset_index(drop=True)
+    print_report(summary, optimize_wall, time.perf_counter() - start, workers)
+    return summary
+
+
+def print_report(summary, optimize_wall, wall, workers):
+    print("\n--- MULTI-SITE SUMMARY ---")
+    ok = summary[summary['seconds'].notna()] if 'seconds' in summary else summary.iloc[:0]
+    columns = ['site', 'skus', 'slots', 'to_move', 'temp_violations', 'weight_violations', 'aisle_b_congestion',
+               'moves', 'without_bin', 'plan_violations', 'seconds']
+    if len(ok):
+        table = ok[columns].copy()
+        table['seconds'] = table['seconds'].round(2)
+        print(table.to_string(index=False))
+    for row in summary[summary['error'].notna()].itertuples() if 'error' in summary else ():
+        print(f"FAILED {row.site}: {row.error}")
+    print(f"\nSites: {len(ok)} optimized, {len(summary) - len(ok)} failed ({workers} workers)")
+    if len(ok):
+        print(f"SKUs: {int(ok['skus'].sum()):,}  Violations: {int(ok['to_move'].sum()):,}  "
+              f"Moves planned: {int(ok['moves'].sum()):,}")
+        slowest = ok.loc[ok['seconds'].idxmax()]
+        print(f"Optimize wall time: {optimize_wall:.2f}s (slowest site {slowest['site']}: {slowest['seconds']:.2f}s, "
+              f"sum of site times {ok['seconds'].sum():.2f}s, speed-up {ok['seconds'].sum() / optimize_wall:.1f}x)")
+    print(f"Total wall time incl. cleaning and sharing: {wall:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the slotting optimization for every site in a directory")
+    parser.add_argument('sites_dir', help="directory with one subdirectory per site (raw CSVs and/or cleaned_data)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--solver', choices=['greedy', 'assignment'], default='greedy')
+    parser.add_argument('--affinity', action='store_true')
+    parser.add_argument('--clean', action='store_true', help="re-run clean_data for every site first")
+    args = parser.parse_args()
+    run_sites(args.sites_dir, args.workers, args.solver, args.affinity, args.clean)
+    instrument.print_summary()
@@ -1,41 +1,244 @@
 import pandas as pd
 import numpy as np
 import os
+import json
+import hashlib
+import argparse
+
+import columnar
+import schema
+import instrument
+import affinity
+import velocity
+import move_planner
+import plan_validator
+import local_search
+from slot_index import FreeSlotIndex, is_aisle_b
 
 # Paths
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cleaned_data")
 OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "final_slotting_plan.csv")
+# SKU / slot attributes the last plan was computed against (for --incremental)
+STATE_DIR = os.path.join(DATA_DIR, "slotting_state")
+
+def site_paths(site_dir=None):
+    # Where a run reads cleaned data and writes its plan, move sequence and slotting state:
+    # the module paths, or a dataset directory laid out like the repo root (multi_site.py sites)
+    if site_dir is None:
+        return {'data': DATA_DIR, 'plan': OUTPUT_FILE, 'sequence': move_planner.SEQUENCE_FILE, 'state': STATE_DIR}
+    data_dir = os.path.join(site_dir, "cleaned_data")
+    return {'data': data_dir, 'plan': os.path.join(site_dir, "final_slotting_plan.csv"),
+            'sequence': os.path.join(site_dir, "move_sequence.csv"), 'state': os.path.join(data_dir, "slotting_state")}
 
-def load_data():
-    sku_df = pd.read_csv(os.path.join(DATA_DIR, "sku_master_cleaned.csv"))
-    constraints_df = pd.read_csv(os.path.join(DATA_DIR, "warehouse_constraints_cleaned.csv"), dtype={'slot_id': str})
-    order_df = pd.read_csv(os.path.join(DATA_DIR, "order_history_cleaned.csv"))
-    # Clean slot IDs in SKU if not done
-    sku_df['current_slot'] = sku_df['current_slot'].astype(str).str.strip()
-    constraints_df['slot_id'] = constraints_df['slot_id'].astype(str).str.strip()
+def load_data(tables=None, data_dir=None):
+    # Memory-mapped columnar tables when clean_data wrote them, CSV otherwise.
+    # tables = (sku_df, constraints_df) already in memory (multi_site.py shares them between sites)
+    data_dir = data_dir or DATA_DIR
+    if tables is None:
+        sku_df = columnar.load_cleaned('sku_master', data_dir)
+        constraints_df = columnar.load_cleaned('warehouse_constraints', data_dir, dtype={'slot_id': str})
+    else:
+        sku_df, constraints_df = tables
+    order_df = columnar.load_cleaned('order_history', data_dir)
+    # Same ID normalization on both paths (columnar tables store IDs already normalized)
+    for df, cols in [(sku_df, ['sku_id', 'current_slot']), (constraints_df, ['slot_id']), (order_df, ['sku_id'])]:
+        for col in cols:
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = columnar.normalize_ids(df[col])
+    sku_df['current_slot'] = sku_df['current_slot'].astype(str)
+    constraints_df['slot_id'] = constraints_df['slot_id'].astype(str)
+    # Integer-coded IDs, pre-split slot components, categoricals
+    sku_df, constraints_df = schema.apply_schema(sku_df, constraints_df)
     return sku_df, constraints_df, order_df
 
-def optimize():
-    sku_df, constraints_df, order_df = load_data()
-    
-    print(f"Total SKUs: {len(sku_df)}")
-    print(f"Total Slots: {len(constraints_df)}")
+def order_counts(sku_ids):
+    # value_counts() with ties in first-seen order, also for categorical columns
+    # (categorical value_counts breaks ties by category order instead)
+    if not isinstance(sku_ids.dtype, pd.CategoricalDtype):
+        return sku_ids.value_counts()
+    codes = sku_ids.cat.codes.to_numpy()
+    codes = codes[codes >= 0]
+    seen, first = np.unique(codes, return_index=True)
+    counts = np.bincount(codes, minlength=len(sku_ids.cat.categories))[seen]
+    order = np.lexsort((first, -counts))
+    return pd.Series(counts[order], index=sku_ids.cat.categories[seen[order]].astype(str), name='count')
+
+def file_hash(path):
+    return hashlib.sha1(open(path, 'rb').read()).hexdigest()
+
+def save_state(sku_df, constraints_df, paths=None):
+    # Called right after the plan is written; the plan hash ties the state to that plan
+    paths = paths or site_paths()
+    os.makedirs(paths['state'], exist_ok=True)
+    pd.DataFrame({'sku_id': sku_df['sku_id'].astype(str), 'weight_kg': sku_df['weight_kg'],
+                  'temp_req': sku_df['temp_req'].astype(object), 'is_high_velocity': sku_df['is_high_velocity']}
+                 ).to_csv(os.path.join(paths['state'], "skus.csv"), index=False)
+    pd.DataFrame({'slot_id': constraints_df['slot_id'].astype(str), 'temp_zone': constraints_df['temp_zone'].astype(object),
+                  'max_weight_kg': constraints_df['max_weight_kg']}).to_csv(os.path.join(paths['state'], "slots.csv"), index=False)
+    with open(os.path.join(paths['state'], "_plan.json"), 'w') as f:
+        json.dump({'plan_sha1': file_hash(paths['plan'])}, f)
+
+def load_state(paths=None):
+    # (skus, slots) of the last plan, or None when missing or the plan was replaced since
+    paths = paths or site_paths()
+    meta_path = os.path.join(paths['state'], "_plan.json")
+    if not (os.path.exists(meta_path) and os.path.exists(paths['plan'])):
+        return None
+    with open(meta_path) as f:
+        if json.load(f)['plan_sha1'] != file_hash(paths['plan']):
+            return None
+    skus = pd.read_csv(os.path.join(paths['state'], "skus.csv"), dtype={'sku_id': str, 'temp_req': str})
+    slots = pd.read_csv(os.path.join(paths['state'], "slots.csv"), dtype={'slot_id': str, 'temp_zone': str})
+    return skus.drop_duplicates('sku_id').set_index('sku_id'), slots.drop_duplicates('slot_id').set_index('slot_id')
+
+def apply_move(slot_map, sku_id, current_slot, new_slot):
+    if current_slot in slot_map and slot_map[current_slot] == sku_id:
+        del slot_map[current_slot]
+    slot_map[new_slot] = sku_id
+
+def shared_surplus(sku_df):
+    # SKUs sharing a current slot with a later SKU: slot_map (dict(zip(...))) keeps the
+    # last one in the slot, the others have to be re-slotted
+    codes = pd.Series(sku_df['slot_code'].to_numpy(), index=sku_df.index)
+    return (codes >= 0) & codes.duplicated(keep='last')
+
+def plan_bins(sku_df, moves):
+    # Bin per SKU: its move target, else its current slot. A SKU that could not leave
+    # a shared slot stays in it (the validator reports the shared slot, not an eviction).
+    current = sku_df['current_slot']
+    bins = dict(zip(sku_df['sku_id'], current.where(current != 'nan')))  # load_data turns NaN into 'nan'
+    bins.update((m['sku_id'], m['new_slot']) for m in moves)
+    return bins
+
+def affinity_aisles(sku_id, neighbours, sku_slot, slot_aisle, allow_aisle_b):
+    # Aisles holding sku_id's affinity neighbours (strongest total co-picks first), then their adjacent aisles
+    weight = {}
+    for other, count in neighbours.get(sku_id, ()):
+        aisle_id = slot_aisle.get(sku_slot.get(other))
+        if aisle_id is not None:
+            weight[aisle_id] = weight.get(aisle_id, 0) + count
+    ranked = sorted(weight, key=weight.get, reverse=True)
+    aisles = ranked + [a for r in ranked for a in affinity.adjacent_aisles(r) if a not in weight]
+    return [a for a in dict.fromkeys(aisles) if allow_aisle_b or not is_aisle_b(a)]
+
+@instrument.timed('greedy_assign')
+def greedy_assign(to_move_skus, free_slots, slot_map, verbose=True, neighbours=None, slot_aisle=None):
+    # Greedy first-fit in priority order; updates slot_map and free_slots in place.
+    # With affinity neighbours, a free slot next to the SKU's co-picked SKUs wins over first-fit.
+    moves = []
+    sku_slot = {v: k for k, v in slot_map.items()} if neighbours else None
     
-    # 1. Identify High Velocity SKUs
-    # Count orders per SKU
-    sku_counts = order_df['sku_id'].value_counts()
-    # Top 50 or Top 10%?
-    # "Identify the top 50 SKUs to move immediately"
-    # Let's consider High Velocity as Top 100 for checking congestion.
-    high_velocity_skus = set(sku_counts.head(200).index)
+    for row in to_move_skus[['sku_id', 'current_slot', 'temp_req', 'weight_kg', 'is_high_velocity', 'priority']].itertuples(index=False):
+        sku_id = row.sku_id
+        current_slot = row.current_slot
+        
+        # Requirements
+        req_temp = row.temp_req
+        weight = row.weight_kg
+        avoid_aisle_b = row.is_high_velocity 
+        
+        # Find valid candidates (temp match, weight limit, avoid Aisle B if high velocity)
+        best_slot = None
+        if neighbours:
+            aisles = affinity_aisles(sku_id, neighbours, sku_slot, slot_aisle, allow_aisle_b=not avoid_aisle_b)
+            best_slot = free_slots.find_in_aisles(req_temp, weight, aisles)
+        if best_slot is None:
+            best_slot = free_slots.find(req_temp, weight, allow_aisle_b=not avoid_aisle_b)
+        
+        if best_slot is None and row.priority >= 1000:
+            best_slot = free_slots.find(req_temp, weight, allow_aisle_b=True)
+        
+        if best_slot is not None:
+            # Record Move
+            moves.append({'sku_id': sku_id, 'new_slot': best_slot})
+            apply_move(slot_map, sku_id, current_slot, best_slot)
+            if sku_slot is not None:
+                sku_slot[sku_id] = best_slot
+            
+            # Remove from free slots, add old slot back (unless another SKU still holds it)
+            free_slots.acquire(best_slot)
+            if current_slot not in slot_map:
+                free_slots.release(current_slot)
+        elif verbose:
+            print(f"Could not find slot for {sku_id} (Temp: {req_temp}, W: {weight})")
     
-    sku_df['is_high_velocity'] = sku_df['sku_id'].isin(high_velocity_skus)
-    sku_df['order_count'] = sku_df['sku_id'].map(sku_counts).fillna(0)
+    return moves
+
+def resolve_unplaced(to_move_skus, moves, constraints_df, slot_map):
+    # SKUs the greedy loop could not place: swap / rotate them among their own slots (move_planner)
+    placed = {m['sku_id'] for m in moves}
+    unplaced = to_move_skus[~to_move_skus['sku_id'].isin(placed)]
+    rotations = move_planner.rotate_unplaced(unplaced, constraints_df)
+    for m in rotations:
+        apply_move(slot_map, m['sku_id'], m['current_slot'], m['new_slot'])
+    if rotations:
+        print(f"Placed {len(rotations)} of {len(unplaced)} unplaced SKUs by swapping / rotating their slots.")
+    return [{'sku_id': m['sku_id'], 'new_slot': m['new_slot']} for m in rotations]
+
+def write_sequence(sku_df, final_plan, constraints_df, sequence_file=None):
+    # Executable order of the plan's moves (chains, then cycles through a buffer)
+    sequence_file = sequence_file or move_planner.SEQUENCE_FILE
+    with instrument.stage('sequence', rows_in=len(final_plan)) as rec:
+        steps, summary = move_planner.sequence_moves(sku_df['sku_id'], sku_df['current_slot'], final_plan['Bin_ID'],
+                                                     constraints_df, sku_df['temp_req'])
+        steps.to_csv(sequence_file, index=False)
+        rec['rows_out'] = len(steps)
+    move_planner.print_summary(summary)
+    print(f"Saved move sequence to {sequence_file}")
+
+def improve_plan(sku_df, constraints_df, final_plan, moves, seconds, data_dir=None):
+    # Time-budgeted local search on the finished plan (local_search.py); returns the
+    # improved plan and its moves (solver moves first, then SKUs the search re-slotted)
+    with instrument.stage('local_search', rows_in=len(final_plan)) as rec:
+        bins, stats = local_search.improve(sku_df, constraints_df, final_plan['Bin_ID'].to_numpy(), seconds,
+                                             data_dir or DATA_DIR)
+        rec['rows_out'] = stats['changed_skus']
+    local_search.print_stats(stats)
+    improved = final_plan.copy()
+    improved['Bin_ID'] = bins
     
-    # 2. Merge Constraints to current slots
-    current_state = sku_df.merge(constraints_df, left_on='current_slot', right_on='slot_id', how='left')
+    new_slot = dict(zip(improved['sku_id'], bins))
+    current_slot = dict(zip(sku_df['sku_id'], sku_df['current_slot']))
+    ordered = [m['sku_id'] for m in moves] + list(improved['sku_id'][improved['Bin_ID'].ne(final_plan['Bin_ID'])
+                                                                     & improved['Bin_ID'].notna()])
+    improved_moves = []
+    for sku_id in dict.fromkeys(ordered):
+        if new_slot[sku_id] is not None and new_slot[sku_id] != current_slot[sku_id]:
+            improved_moves.append({'sku_id': sku_id, 'new_slot': new_slot[sku_id]})
+    return improved, improved_moves
+
+def validate_plan(sku_df, constraints_df, final_plan, plan_file=None):
+    # Independent hard-constraint check of the written plan over every SKU (plan_validator)
+    with instrument.stage('validate', rows_in=len(final_plan)) as rec:
+        counts, offenders, unknown = plan_validator.PlanValidator(sku_df, constraints_df).validate(final_plan)
+        rec['rows_out'] = len(offenders)
+    plan_validator.print_report(counts, unknown, os.path.basename(plan_file or OUTPUT_FILE))
+    return counts
+
+def mark_velocity(sku_df, order_df, decayed=False, data_dir=None):
+    # Adds is_high_velocity / order_count to sku_df; returns the high-velocity SKU IDs.
+    # decayed: top SKUs by time-decayed order count from the incremental velocity state
+    # (only order rows added since its last update are read), order_count = decayed count
+    if decayed:
+        state = velocity.refresh(order_df, data_dir or DATA_DIR)
+        high_velocity_skus = set(velocity.top_k(state, velocity.TOP_K)['sku_id'])
+        order_count = pd.Series(velocity.decayed_orders(state, sku_df['sku_id'].astype(str)), index=sku_df.index)
+    else:
+        # Count orders per SKU
+        sku_counts = order_counts(order_df['sku_id'])
+        # Top 50 or Top 10%?
+        # "Identify the top 50 SKUs to move immediately"
+        # Let's consider High Velocity as Top 100 for checking congestion.
+        high_velocity_skus = set(sku_counts.head(velocity.TOP_K).index)
+        order_count = sku_df['sku_id'].map(sku_counts).fillna(0)
     
-    # 3. Identify Violations
+    sku_index = schema.id_index(sku_df['sku_id'])
+    high_velocity_codes = schema.encode(pd.Series(list(high_velocity_skus), dtype=object), sku_index)
+    sku_df['is_high_velocity'] = np.isin(sku_df['sku_code'], high_velocity_codes[high_velocity_codes >= 0])
+    sku_df['order_count'] = order_count
+    return high_velocity_skus
+
+def find_violations(current_state):
     # Temp Mismatch
     # Handle NaN in temp_zone (maybe ambient?) - Assuming constraints are complete.
     temp_violation = (current_state['temp_req'] != current_state['temp_zone']) & current_state['temp_zone'].notna()
@@ -49,32 +252,127 @@ def optimize():
     # Let's assume Aisle IDs are 'A01', 'B01', 'C01' etc?
     # If aisle_id starts with 'B', it's Aisle B.
     
-    current_state['aisle_prefix'] = current_state['current_slot'].str.split('-').str[0].str[0] 
-    
-    is_aisle_b = current_state['aisle_id'].astype(str).str.startswith('B')
+    # (aisle / level / position are pre-split in the schema; is_aisle_b is per slot)
+    is_aisle_b = current_state['is_aisle_b'].eq(True)
     congestion_risk = (current_state['is_high_velocity']) & (is_aisle_b)
-    
+    return temp_violation, weight_violation, congestion_risk
+
+def move_candidates(current_state, temp_violation, weight_violation, congestion_risk, vacate=None):
     # Priority for Moving
     # 1. Temp Violations (Critical)
     # 2. Weight Violations (Critical)
     # 3. Congestion Risk (High Impact)
+    # vacate: SKUs that have to leave their slot (ghost slot, surplus SKU of a shared slot)
     
     to_move_mask = temp_violation | weight_violation | congestion_risk
+    if vacate is not None:
+        to_move_mask = to_move_mask | vacate
     to_move_skus = current_state[to_move_mask].copy()
     
-    print(f"Found {len(to_move_skus)} SKUs to move.")
-    print(f" - Temp Violations: {temp_violation.sum()}")
-    print(f" - Weight Violations: {weight_violation.sum()}")
-    print(f" - Aisle B Congestion: {congestion_risk.sum()}")
-    
     # Sort by 'Chaos Contribution'? 
     # Violations first, then Order Volume.
-    to_move_skus['priority'] = 0
+    to_move_skus['priority'] = np.zeros(len(to_move_skus), dtype=to_move_skus['order_count'].dtype)  # float for decayed counts
     to_move_skus.loc[temp_violation, 'priority'] += 1000
     to_move_skus.loc[weight_violation, 'priority'] += 1000
     to_move_skus.loc[congestion_risk, 'priority'] += to_move_skus.loc[congestion_risk, 'order_count']
+    if vacate is not None:
+        to_move_skus.loc[vacate, 'priority'] += 1000
+    
+    return to_move_skus.sort_values('priority', ascending=False)
+
+def colocated_affinity(neighbours, sku_slot, slot_aisle):
+    # Co-pick count of affinity pairs placed in the same or an adjacent aisle (each pair counted once)
+    total = 0
+    for sku_id, pairs in neighbours.items():
+        aisle_id = slot_aisle.get(sku_slot.get(sku_id))
+        if aisle_id is None:
+            continue
+        near = {aisle_id, *affinity.adjacent_aisles(aisle_id)}
+        total += sum(count for other, count in pairs
+                     if other > sku_id and slot_aisle.get(sku_slot.get(other)) in near)
+    return total
+
+def affinity_neighbours(order_df, sku_df, constraints_df, data_dir=None):
+    # Top-k co-picked SKUs from the affinity stage (built here if affinity.py has not run), slot -> aisle
+    data_dir = data_dir or DATA_DIR
+    with instrument.stage('affinity', rows_in=len(order_df)) as rec:
+        state = affinity.load(data_dir) if affinity.exists(data_dir) else affinity.build(order_df, sku_df['sku_id'])
+        neighbours = affinity.neighbours(state)
+        slot_aisle = dict(zip(constraints_df['slot_id'], constraints_df['aisle_id'].astype(str)))
+        rec['rows_out'] = len(neighbours)
+    return neighbours, slot_aisle
+
+def solve_moves(solver, to_move_skus, sku_df, constraints_df, empty_slots, slot_map, neighbours=None, slot_aisle=None):
+    # Moves for to_move_skus with the chosen solver; updates slot_map. Returns (moves,
+    # (greedy, assignment) objective over the SKUs to move) - the objective is None for greedy.
+    if solver != 'assignment':
+        free_slots = FreeSlotIndex(constraints_df, empty_slots)
+        moves = greedy_assign(to_move_skus, free_slots, slot_map, neighbours=neighbours, slot_aisle=slot_aisle)
+        moves += resolve_unplaced(to_move_skus, moves, constraints_df, slot_map)
+        return moves, None
+    
+    from assignment_solver import solve_assignment, plan_cost
     
-    to_move_skus = to_move_skus.sort_values('priority', ascending=False)
+    # Greedy plan as the reference objective
+    greedy_slot_map = dict(slot_map)
+    greedy_moves = greedy_assign(to_move_skus, FreeSlotIndex(constraints_df, empty_slots), greedy_slot_map, verbose=False)
+    
+    # Moving SKUs vacate their slots unless another (staying) SKU shares it
+    staying_slots = set(sku_df.loc[~np.isin(sku_df['sku_code'], to_move_skus['sku_code']), 'current_slot'])
+    free_pool = empty_slots | (set(to_move_skus['current_slot']) - staying_slots)
+    with instrument.stage('assignment_solve', rows_in=len(to_move_skus)) as rec:
+        moves, unplaced = solve_assignment(to_move_skus, constraints_df, free_pool)
+        rec['rows_out'] = len(moves)
+    for m in moves:
+        apply_move(slot_map, m['sku_id'], m['current_slot'], m['new_slot'])
+    for sku_id in unplaced:
+        print(f"Could not find slot for {sku_id}")
+    
+    # Objective over the SKUs to move (unmoved SKUs are scored at their current slot)
+    def final_slots(plan_moves):
+        new_slot = {m['sku_id']: m['new_slot'] for m in plan_moves}
+        return [new_slot.get(s, c) for s, c in zip(to_move_skus['sku_id'], to_move_skus['current_slot'])]
+    greedy_cost = plan_cost(to_move_skus, final_slots(greedy_moves), constraints_df).sum()
+    assign_cost = plan_cost(to_move_skus, final_slots(moves), constraints_df).sum()
+    return moves, (greedy_cost, assign_cost)
+
+def print_objective(greedy_cost, assign_cost):
+    gain = greedy_cost - assign_cost
+    print(f"Objective (greedy): {greedy_cost:,.0f}")
+    print(f"Objective (assignment): {assign_cost:,.0f}")
+    print(f"Objective gain over greedy: {gain:,.0f} ({gain / greedy_cost:.1%})" if greedy_cost else "Objective gain over greedy: 0")
+
+def optimize(solver='greedy', use_affinity=False, tables=None, decayed_velocity=False, improve_seconds=0, paths=None):
+    # Returns the headline numbers of the run (multi_site.py collects them per site).
+    # paths: site_paths() of the dataset to read and write (default: the module paths)
+    paths = paths or site_paths()
+    with instrument.stage('load') as rec:
+        sku_df, constraints_df, order_df = load_data(tables, paths['data'])
+        rec['rows_out'] = len(sku_df) + len(constraints_df) + len(order_df)
+    
+    print(f"Total SKUs: {len(sku_df)}")
+    print(f"Total Slots: {len(constraints_df)}")
+    
+    # 1. Identify High Velocity SKUs
+    with instrument.stage('velocity', rows_in=len(order_df)) as rec:
+        high_velocity_skus = mark_velocity(sku_df, order_df, decayed_velocity, paths['data'])
+        rec['rows_out'] = len(sku_df)
+    
+    # 2. Merge Constraints to current slots
+    with instrument.stage('merge', rows_in=len(sku_df)) as rec:
+        current_state = schema.join_slots(sku_df, constraints_df)
+        rec['rows_out'] = len(current_state)
+    
+    # 3. Identify Violations
+    temp_violation, weight_violation, congestion_risk = find_violations(current_state)
+    shared_slot = shared_surplus(current_state)
+    to_move_skus = move_candidates(current_state, temp_violation, weight_violation, congestion_risk, shared_slot)
+    
+    print(f"Found {len(to_move_skus)} SKUs to move.")
+    print(f" - Temp Violations: {temp_violation.sum()}")
+    print(f" - Weight Violations: {weight_violation.sum()}")
+    print(f" - Aisle B Congestion: {congestion_risk.sum()}")
+    print(f" - Sharing a slot: {shared_slot.sum()}")
     
     # Strategy: Find destinations
     # Set of occupied slots
@@ -82,78 +380,39 @@ def optimize():
     
     # Available slots (All - Occupied)
     all_slots = set(constraints_df['slot_id'])
-    empty_slots = list(all_slots - occupied_slots)
-    # Build DF for empty slots
-    empty_slots_df = constraints_df[constraints_df['slot_id'].isin(empty_slots)].copy()
-    
-    # Optimization Loop
-    moves = []
+    empty_slots = all_slots - occupied_slots
     
     # Track used slots
     slot_map = dict(zip(sku_df['current_slot'], sku_df['sku_id']))
     
-    moved_count = 0
+    neighbours, slot_aisle = None, None
+    if use_affinity:
+        neighbours, slot_aisle = affinity_neighbours(order_df, sku_df, constraints_df, paths['data'])
+        colocated_before = colocated_affinity(neighbours, {v: k for k, v in slot_map.items()}, slot_aisle)
     
-    for idx, row in to_move_skus.iterrows():
-        sku_id = row['sku_id']
-        current_slot = row['current_slot']
-        
-        # Requirements
-        req_temp = row['temp_req']
-        weight = row['weight_kg']
-        avoid_aisle_b = row['is_high_velocity'] 
-        
-        # Find valid candidates
-        # 1. Temp match
-        candidates = empty_slots_df[empty_slots_df['temp_zone'] == req_temp]
-        # 2. Weight limit
-        candidates = candidates[candidates['max_weight_kg'] >= weight]
-        # 3. Avoid Aisle B if high velocity
-        if avoid_aisle_b:
-             candidates = candidates[~candidates['aisle_id'].str.startswith('B')]
-        
-        if candidates.empty:
-             if row['priority'] >= 1000:
-                  candidates = empty_slots_df[empty_slots_df['temp_zone'] == req_temp]
-                  candidates = candidates[candidates['max_weight_kg'] >= weight]
-        
-        if not candidates.empty:
-            best_slot = candidates.iloc[0]['slot_id']
-            
-            # Record Move
-            moves.append({'sku_id': sku_id, 'new_slot': best_slot})
-            
-            # Update State
-            if current_slot in slot_map and slot_map[current_slot] == sku_id:
-                del slot_map[current_slot]
-            
-            slot_map[best_slot] = sku_id
-            
-            # Remove from empty_slots_df
-            empty_slots_df = empty_slots_df[empty_slots_df['slot_id'] != best_slot]
-            
-            # Add old slot to empty
-            old_slot_data = constraints_df[constraints_df['slot_id'] == current_slot]
-            if not old_slot_data.empty:
-                 empty_slots_df = pd.concat([empty_slots_df, old_slot_data])
-            
-            moved_count += 1
-        else:
-            print(f"Could not find slot for {sku_id} (Temp: {req_temp}, W: {weight})")
+    moves, objective = solve_moves(solver, to_move_skus, sku_df, constraints_df, empty_slots, slot_map,
+                                   neighbours, slot_aisle)
     
+    moved_count = len(moves)
     print(f"Planned {moved_count} moves.")
     
-    final_sku_slot = []
-    # Invert map
-    sku_to_slot = {v: k for k, v in slot_map.items()}
-    
-    # Original DF
+    sku_to_slot = plan_bins(sku_df, moves)
     final_plan = sku_df[['sku_id']].copy()
     final_plan['Bin_ID'] = final_plan['sku_id'].map(sku_to_slot)
+    if improve_seconds:
+        final_plan, moves = improve_plan(sku_df, constraints_df, final_plan, moves, improve_seconds, paths['data'])
+        moved_count = len(moves)
+        sku_to_slot = dict(zip(final_plan['sku_id'], final_plan['Bin_ID']))
+        print(f"Moves after local search: {moved_count}")
     
     # Save
-    final_plan.to_csv(OUTPUT_FILE, index=False)
-    print(f"Saved optimization plan to {OUTPUT_FILE}")
+    with instrument.stage('save', rows_in=len(final_plan)) as rec:
+        final_plan.to_csv(paths['plan'], index=False)
+        save_state(sku_df, constraints_df, paths)
+        rec['rows_out'] = len(final_plan)
+    print(f"Saved optimization plan to {paths['plan']}")
+    write_sequence(sku_df, final_plan, constraints_df, paths['sequence'])
+    validation = validate_plan(sku_df, constraints_df, final_plan, paths['plan'])
     
     # OUTPUT METRICS FOR REPORT
     print("\n--- METRICS FOR REPORT ---")
@@ -161,9 +420,132 @@ def optimize():
     # Recalculate basic stats
     print(f"Total High Velocity SKUs: {len(high_velocity_skus)}")
     print(f"Moves Planned: {moved_count}")
+    if objective is not None:
+        print_objective(*objective)
+    if use_affinity:
+        colocated_after = colocated_affinity(neighbours, sku_to_slot, slot_aisle)
+        print(f"Affinity co-picks in same/adjacent aisles: {colocated_before:,} -> {colocated_after:,}")
     print(f"Top 5 Moves:")
     for m in moves[:5]:
         print(m)
+    instrument.print_summary()
+    return {'skus': len(sku_df), 'slots': len(constraints_df), 'to_move': len(to_move_skus),
+            'temp_violations': int(temp_violation.sum()), 'weight_violations': int(weight_violation.sum()),
+            'aisle_b_congestion': int(congestion_risk.sum()), 'moves': moved_count,
+            'without_bin': validation['unassigned'] + validation['evicted'],
+            'plan_violations': sum(validation[name] for name in plan_validator.HARD_CHECKS)}
+
+def changed_skus(sku_df, constraints_df, prev_skus, prev_slots):
+    # Masks over sku_df (plan slots in current_slot) of what changed since the last plan
+    prev = prev_skus.reindex(sku_df['sku_id'].astype(str))
+    new = prev['weight_kg'].isna().to_numpy() & prev['temp_req'].isna().to_numpy()
+    velocity_changed = ~new & (prev['is_high_velocity'].astype(bool).to_numpy() != sku_df['is_high_velocity'].to_numpy())
+    weight = ~new & ~np.isclose(prev['weight_kg'].to_numpy(dtype=float), sku_df['weight_kg'].to_numpy(dtype=float),
+                                equal_nan=True)
+    temp = ~new & (prev['temp_req'].fillna('').to_numpy() != sku_df['temp_req'].astype(object).fillna('').to_numpy())
+    
+    # Slots that disappeared or whose temp zone / capacity changed
+    slots = pd.DataFrame({'temp_zone': constraints_df['temp_zone'].astype(object).to_numpy(),
+                          'max_weight_kg': constraints_df['max_weight_kg'].to_numpy(dtype=float)},
+                         index=constraints_df['slot_id'].astype(str).to_numpy())
+    slots = slots[~slots.index.duplicated()]
+    old = prev_slots.reindex(slots.index)
+    slot_changed = ((old['temp_zone'].fillna('').to_numpy() != slots['temp_zone'].fillna('').to_numpy())
+                    | ~np.isclose(old['max_weight_kg'].to_numpy(dtype=float), slots['max_weight_kg'].to_numpy(),
+                                  equal_nan=True))
+    changed_slots = set(slots.index[slot_changed]) | set(prev_slots.index.difference(slots.index))
+    slot = sku_df['current_slot'].isin(changed_slots).to_numpy() | (sku_df['slot_code'].to_numpy() < 0)
+    return {'new': new, 'velocity': velocity_changed, 'weight': weight, 'temp': temp, 'slot': slot}
+
+def optimize_incremental(solver='greedy', use_affinity=False, decayed_velocity=False, improve_seconds=0, paths=None):
+    # Warm start: the previous final_slotting_plan.csv is the current state and only
+    # SKUs whose velocity, weight, temp requirement or slot changed are re-checked;
+    # those that now violate are re-slotted (the slots they vacate go back to the pool)
+    paths = paths or site_paths()
+    state = load_state(paths)
+    if state is None:
+        print("No slotting state for the current plan - running a full optimization.")
+        return optimize(solver=solver, use_affinity=use_affinity, decayed_velocity=decayed_velocity,
+                        improve_seconds=improve_seconds, paths=paths)
+    prev_skus, prev_slots = state
+    
+    with instrument.stage('load') as rec:
+        sku_df, constraints_df, order_df = load_data(data_dir=paths['data'])
+        rec['rows_out'] = len(sku_df) + len(constraints_df) + len(order_df)
+    with instrument.stage('velocity', rows_in=len(order_df)) as rec:
+        high_velocity_skus = mark_velocity(sku_df, order_df, decayed_velocity, paths['data'])
+        rec['rows_out'] = len(sku_df)
+    
+    # The previous plan is the starting layout (SKUs it left unplaced or new SKUs keep current_slot)
+    plan = pd.read_csv(paths['plan'], dtype={'sku_id': str, 'Bin_ID': str})
+    plan_slot = pd.Series(columnar.normalize_ids(plan['Bin_ID']).to_numpy(), index=columnar.normalize_ids(plan['sku_id']))
+    planned = plan_slot[~plan_slot.index.duplicated()].reindex(sku_df['sku_id'].astype(str)).to_numpy()
+    sku_df['current_slot'] = np.where(pd.isna(planned), sku_df['current_slot'].to_numpy(), planned)
+    sku_df['slot_code'] = schema.encode(sku_df['current_slot'], schema.id_index(constraints_df['slot_id']))
+    
+    with instrument.stage('detect_changes', rows_in=len(sku_df)) as rec:
+        changes = changed_skus(sku_df, constraints_df, prev_skus, prev_slots)
+        shared_slot = shared_surplus(sku_df).to_numpy()
+        changes['shared_slot'] = shared_slot
+        changed = np.logical_or.reduce(list(changes.values()))
+        current_state = schema.join_slots(sku_df[changed], constraints_df)
+        temp_violation, weight_violation, congestion_risk = find_violations(current_state)
+        # A planned slot that no longer exists in the constraints has to be vacated too,
+        # and so does every SKU but one of a shared slot
+        vacate = (current_state['slot_code'] < 0) | pd.Series(shared_slot[changed], index=current_state.index)
+        to_move_skus = move_candidates(current_state, temp_violation, weight_violation, congestion_risk, vacate)
+        rec['rows_out'] = int(changed.sum())
+    
+    print(f"SKUs changed since the last plan: {changed.sum()} of {len(sku_df)}")
+    for reason, mask in changes.items():
+        print(f" - {reason}: {mask.sum()}")
+    print(f"Changed SKUs that now violate a constraint: {len(to_move_skus)}")
+    
+    slot_map = dict(zip(sku_df['current_slot'], sku_df['sku_id']))
+    empty_slots = set(constraints_df['slot_id']) - set(sku_df['current_slot'])
+    neighbours, slot_aisle = None, None
+    if use_affinity:
+        neighbours, slot_aisle = affinity_neighbours(order_df, sku_df, constraints_df, paths['data'])
+    moves, objective = solve_moves(solver, to_move_skus, sku_df, constraints_df, empty_slots, slot_map,
+                                   neighbours, slot_aisle)
+    print(f"Planned {len(moves)} moves.")
+    if objective is not None:
+        print_objective(*objective)
+    
+    sku_to_slot = plan_bins(sku_df, moves)
+    final_plan = sku_df[['sku_id']].copy()
+    final_plan['Bin_ID'] = final_plan['sku_id'].map(sku_to_slot)
+    if improve_seconds:
+        final_plan, moves = improve_plan(sku_df, constraints_df, final_plan, moves, improve_seconds, paths['data'])
+        print(f"Moves after local search: {len(moves)}")
+    with instrument.stage('save', rows_in=len(final_plan)) as rec:
+        final_plan.to_csv(paths['plan'], index=False)
+        save_state(sku_df, constraints_df, paths)
+        rec['rows_out'] = len(final_plan)
+    print(f"Saved optimization plan to {paths['plan']}")
+    write_sequence(sku_df, final_plan, constraints_df, paths['sequence'])
+    validate_plan(sku_df, constraints_df, final_plan, paths['plan'])
+    print(f"Total High Velocity SKUs: {len(high_velocity_skus)}")
+    for m in moves[:5]:
+        print(m)
+    instrument.print_summary()
 
 if __name__ == "__main__":
-    optimize()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="VelocityMart slotting optimization")
+    parser.add_argument('--solver', choices=['greedy', 'assignment'], default='greedy',
+                        help="greedy first-fit (default) or global min-cost assignment per temp zone")
+    parser.add_argument('--affinity', action='store_true',
+                        help="place SKUs next to their most co-picked SKUs (greedy solver)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="warm start from the previous plan; re-slot only SKUs whose inputs changed")
+    parser.add_argument('--decayed-velocity', action='store_true',
+                        help=f"high velocity = top {velocity.TOP_K} by time-decayed orders (incremental state, velocity.py)")
+    parser.add_argument('--improve', type=float, default=0, metavar='SECONDS',
+                        help="refine the plan by simulated annealing for this many seconds (local_search.py)")
+    args = parser.parse_args()
+    if args.incremental:
+        optimize_incremental(solver=args.solver, use_affinity=args.affinity, decayed_velocity=args.decayed_velocity,
+                             improve_seconds=args.improve)
+    else:
+        optimize(solver=args.solver, use_affinity=args.affinity, decayed_velocity=args.decayed_velocity,
+                 improve_seconds=args.improve)
\ No newline at end of file
@@ -0,0 +1,198 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+import argparse
+
+import columnar
+import schema
+import instrument
+
+# Hard-constraint check of a slotting plan (sku_id -> Bin_ID) over every SKU.
+#
+# A plan is encoded once into an int32 slot code per SKU row of the master
+# (UNASSIGNED = no bin, GHOST = bin not in the constraints). Checks are then
+# gathers and compares on int arrays:
+#   temp               temp_req != temp_zone of the bin (bins without a zone pass)
+#   weight             weight_kg > max_weight_kg of the bin
+#   shared_slot        bin holds more than one SKU (every SKU in it is counted)
+#   ghost_slot         bin does not exist
+#   aisle_b_velocity   high-velocity SKU in an Aisle B bin
+#   evicted            SKU that had a bin before the plan (current_slot) and has none in it
+#   unassigned         SKU without a bin
+# The same checks run on a 2-D array of plans (one row per candidate plan,
+# columns = SKU rows), which is what search / simulation code scores with.
+
+UNASSIGNED = -1
+GHOST = -2
+CHECKS = ['temp', 'weight', 'shared_slot', 'ghost_slot', 'aisle_b_velocity', 'evicted', 'unassigned']
+# Checks a compliant plan must pass (SKUs that never had a bin are reported, not failed)
+HARD_CHECKS = ['temp', 'weight', 'shared_slot', 'ghost_slot', 'aisle_b_velocity', 'evicted']
+
+
+class PlanValidator:
+    # Built from typed frames (schema.apply_schema); the SKU master needs
+    # is_high_velocity (optimize_slotting.mark_velocity) unless high_velocity is given.
+    # The layout before the plan is sku_df['current_slot'] unless previous (slot codes) is given
+    def __init__(self, sku_df, constraints_df, high_velocity=None, previous=None):
+        self.sku_ids = sku_df['sku_id'].astype(str).to_numpy()
+        self.sku_index = schema.id_index(sku_df['sku_id'])
+        self.slot_index = schema.id_index(constraints_df['slot_id'])
+        first = self.slot_index.to_numpy()
+        self.slot_ids = constraints_df['slot_id'].astype(str).to_numpy()[first]
+
+        # Slot attributes by slot code (first row of each slot_id); one extra entry
+        # at the end stands for "no slot" so negative codes gather something harmless
+        n = len(first)
+        self.slot_temp = np.append(constraints_df['temp_zone'].cat.codes.to_numpy()[first], -1)
+        self.slot_capacity = np.append(constraints_df['max_weight_kg'].to_numpy(dtype=float)[first], np.nan)
+        self.slot_b = np.append(constraints_df['is_aisle_b'].eq(True).to_numpy()[first], False)
+        self.no_slot = n
+
+        self.sku_temp = sku_df['temp_req'].cat.codes.to_numpy()
+        self.sku_weight = sku_df['weight_kg'].to_numpy(dtype=float)
+        if high_velocity is None:
+            high_velocity = sku_df['is_high_velocity'] if 'is_high_velocity' in sku_df.columns else False
+        self.sku_high_velocity = np.broadcast_to(np.asarray(high_velocity, dtype=bool), len(sku_df)).copy()
+        if previous is None:
+            previous = (schema.encode(sku_df['current_slot'], self.slot_index) if 'current_slot' in sku_df.columns
+                        else np.full(len(sku_df), UNASSIGNED, dtype=np.int32))
+        self.previously_slotted = np.asarray(previous) >= 0
+
+    def encode(self, plan):
+        # Slot codes of a plan (DataFrame sku_id / Bin_ID, Series or dict sku_id -> Bin_ID)
+        # aligned to the SKU master; returns (codes, unknown plan SKUs)
+        if isinstance(plan, pd.DataFrame):
+            plan = pd.Series(plan['Bin_ID'].to_numpy(), index=plan['sku_id'].to_numpy())
+        elif isinstance(plan, dict):
+            plan = pd.Series(plan, dtype=object)
+        sku_ids = columnar.normalize_ids(pd.Series(plan.index, dtype=object))
+        bins = columnar.normalize_ids(pd.Series(plan.to_numpy(), dtype=object))
+        rows = schema.encode(sku_ids, self.sku_index)
+        unknown = sku_ids[rows < 0].tolist()
+
+        slot_codes = schema.encode(bins, self.slot_index)
+        slot_codes[(slot_codes < 0) & bins.notna().to_numpy()] = GHOST
+        codes = np.full(len(self.sku_ids), UNASSIGNED, dtype=np.int32)
+        known = rows >= 0
+        # The last entry wins for a SKU listed twice, like dict(zip(...))
+        codes[rows[known]] = slot_codes[known]
+        return codes, unknown
+
+    def violations(self, codes):
+        # Boolean masks per check; codes is (n_skus,) or (n_plans, n_skus)
+        codes = np.asarray(codes)
+        gather = np.where(codes >= 0, codes, self.no_slot)
+        placed = codes >= 0
+
+        temp = placed & (self.slot_temp[gather] >= 0) & (self.slot_temp[gather] != self.sku_temp)
+        weight = placed & (self.sku_weight > self.slot_capacity[gather])
+        aisle_b = placed & self.sku_high_velocity & self.slot_b[gather]
+
+        # Shared slots: sort each plan's codes, mark runs of equal placed codes
+        flat = np.atleast_2d(codes)
+        order = np.argsort(flat, axis=1, kind='stable')
+        ranked = np.take_along_axis(flat, order, axis=1)
+        same = (ranked[:, 1:] == ranked[:, :-1]) & (ranked[:, 1:] >= 0)
+        dup_sorted = np.zeros(ranked.shape, dtype=bool)
+        dup_sorted[:, 1:] |= same
+        dup_sorted[:, :-1] |= same
+        shared = np.zeros(flat.shape, dtype=bool)
+        np.put_along_axis(shared, order, dup_sorted, axis=1)
+        shared = shared.reshape(codes.shape)
+
+        return {'temp': temp, 'weight': weight, 'shared_slot': shared, 'ghost_slot': codes == GHOST,
+                'aisle_b_velocity': aisle_b, 'evicted': self.previously_slotted & (codes == UNASSIGNED),
+                'unassigned': ~self.previously_slotted & (codes == UNASSIGNED)}
+
+    def score(self, codes):
+        # Violation counts per check: ints for one plan, arrays of length n_plans for a batch
+        masks = self.violations(codes)
+        return {name: mask.sum(axis=-1) for name, mask in masks.items()}
+
+    def validate(self, plan):
+        # One plan: (counts per check, DataFrame of offending SKUs, unknown plan SKUs)
+        codes, unknown = self.encode(plan)
+        masks = self.violations(codes)
+        counts = {name: int(mask.sum()) for name, mask in masks.items()}
+        bins = np.where(codes >= 0, self.slot_ids[np.maximum(codes, 0)], None)
+        rows = []
+        for name in CHECKS:
+            hit = np.flatnonzero(masks[name])
+            rows.append(pd.DataFrame({'sku_id': self.sku_ids[hit], 'Bin_ID': bins[hit], 'check': name}))
+        return counts, pd.concat(rows, ignore_index=True), unknown
+
+
+def is_valid(counts):
+    return all(counts[name] == 0 for name in HARD_CHECKS)
+
+
+def print_report(counts, unknown=(), label="plan"):
+    print(f"\n--- PLAN VALIDATION ({label}) ---")
+    for name in CHECKS:
+        print(f" - {name}: {counts[name]}")
+    if unknown:
+        print(f" - SKUs not in the SKU master: {len(unknown)} (e.g. {', '.join(map(str, unknown[:5]))})")
+    print("Plan passes every hard constraint." if is_valid(counts)
+          else f"Plan FAILS: {sum(counts[name] for name in HARD_CHECKS)} hard-constraint violations.")
+
+
+def load_validator(data_dir=columnar.CLEANED_DIR):
+    # Validator over cleaned_data, high velocity as optimize_slotting defines it
+    from optimize_slotting import mark_velocity
+
+    sku_df = columnar.load_cleaned('sku_master', data_dir)
+    constraints_df = columnar.load_cleaned('warehouse_constraints', data_dir, dtype={'slot_id': str})
+    order_df = columnar.load_cleaned('order_history', data_dir)
+    sku_df['sku_id'] = columnar.normalize_ids(sku_df['sku_id'])
+    sku_df['current_slot'] = columnar.normalize_ids(sku_df['current_slot'])
+    constraints_df['slot_id'] = columnar.normalize_ids(constraints_df['slot_id'])
+    sku_df, constraints_df = schema.apply_schema(sku_df, constraints_df)
+    mark_velocity(sku_df, order_df)
+    return PlanValidator(sku_df, constraints_df), sku_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate a slotting plan against every hard constraint")
+    parser.add_argument('--plan', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "final_slotting_plan.csv"))
+    parser.add_argument('--dir', default=columnar.CLEANED_DIR, help="cleaned_data directory")
+    parser.add_argument('--current', action='store_true', help="also validate the current slotting")
+    parser.add_argument('--show', type=int, default=10, help="offending SKUs to list")
+    parser.add_argument('--bench', type=int, default=0, metavar='N', help="score N perturbed copies of the plan as one batch")
+    parser.add_argument('--strict', action='store_true', help="exit with status 1 when the plan fails")
+    args = parser.parse_args()
+
+    validator, sku_df = load_validator(args.dir)
+    plan = pd.read_csv(args.plan, dtype={'sku_id': str, 'Bin_ID': str})
+    with instrument.stage('validate', rows_in=len(plan)) as rec:
+        counts, offenders, unknown = validator.validate(plan)
+        rec['rows_out'] = len(offenders)
+    print_report(counts, unknown, os.path.basename(args.plan))
+    if len(offenders):
+        print(offenders.head(args.show).to_string(index=False))
+
+    if args.current:
+        current_counts, _, _ = validator.validate(pd.Series(sku_df['current_slot'].to_numpy(), index=sku_df['sku_id']))
+        print_report(current_counts, label="current slotting")
+
+    if args.bench:
+        # Random swaps of bins between SKUs: the kind of neighbour plans a search evaluates
+        codes, _ = validator.encode(plan)
+        rng = np.random.default_rng(0)
+        batch = np.repeat(codes[None, :], args.bench, axis=0)
+        rows = np.arange(args.bench)
+        for _ in range(10):
+            i, j = rng.integers(0, len(codes), (2, args.bench))
+            batch[rows, i], batch[rows, j] = batch[rows, j], batch[rows, i].copy()
+        with instrument.stage('validate_batch', rows_in=batch.size) as rec:
+            start = time.perf_counter()
+            scores = validator.score(batch)
+            seconds = time.perf_counter() - start
+            rec['rows_out'] = args.bench
+        hard = sum(scores[name] for name in HARD_CHECKS)
+        print(f"\nScored {args.bench:,} plans x {len(codes):,} SKUs in {seconds:.3f}s "
+              f"({args.bench / seconds:,.0f} plans/s); hard violations min {hard.min()}, max {hard.max()}")
+
+    instrument.print_summary()
+    if args.strict and not is_valid(counts):
+        raise SystemExit(1)
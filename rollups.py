@@ -0,0 +1,168 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+
+import columnar
+import schema
+
+# Pre-aggregated tables the dashboard renders from, written by clean_data.py to
+# cleaned_data/rollups/:
+#   aisle_hour_picks.csv   aisle, hour, pick_count      (picks per aisle per hour)
+#   shortcuts_by_hour.csv  hour, shortcut_count
+#   sku_order_volume.csv   sku_id, order_volume
+#   temp_violations.csv    temp_req, temp_zone, count   (SKUs in the wrong temp zone)
+#   summary.json           movement totals + fingerprint of the SKU -> aisle map
+# Movement and order rollups are additive, so streamed chunks and incremental
+# deltas are combined without re-reading earlier rows.
+
+ROLLUP_DIR = "rollups"
+FILES = {
+    'aisle_hour': "aisle_hour_picks.csv",
+    'shortcuts_by_hour': "shortcuts_by_hour.csv",
+    'order_volume': "sku_order_volume.csv",
+    'temp_violations': "temp_violations.csv",
+}
+
+
+def rollup_dir(base_dir):
+    return os.path.join(base_dir, ROLLUP_DIR)
+
+
+def rollup_paths(base_dir):
+    paths = [os.path.join(rollup_dir(base_dir), name) for name in FILES.values()]
+    return paths + [os.path.join(rollup_dir(base_dir), "summary.json")]
+
+
+def sku_slots(sku_df, constraints_df):
+    # Typed SKU master joined to its current slot, aisle 'Unknown' when unplaced
+    sku_df, constraints_df = schema.apply_schema(sku_df, constraints_df)
+    sku_slot_df = schema.join_slots(sku_df, constraints_df)
+    sku_slot_df['aisle'] = sku_slot_df['aisle'].fillna(schema.UNKNOWN_AISLE)
+    return sku_df, constraints_df, sku_slot_df
+
+
+def normalized_sku_slots(sku_df, constraints_df):
+    # Same IDs as the dashboard sees them in the columnar tables
+    sku_df = sku_df.copy()
+    constraints_df = constraints_df.copy()
+    for df, cols in [(sku_df, ['sku_id', 'current_slot']), (constraints_df, ['slot_id'])]:
+        for col in cols:
+            df[col] = columnar.normalize_ids(df[col])
+    return sku_slots(sku_df, constraints_df)
+
+
+def aisle_map_fingerprint(sku_slot_df):
+    # Changes whenever a SKU's aisle changes (movement rollups are then rebuilt)
+    pairs = pd.DataFrame({'sku_id': sku_slot_df['sku_id'].astype(str),
+                          'aisle': sku_slot_df['aisle'].astype(str)})
+    return format(int(pd.util.hash_pandas_object(pairs, index=False).sum()) & (2 ** 64 - 1), '016x')
+
+
+def movement_rollups(picker_df, sku_df, sku_slot_df):
+    # Picks per aisle per hour, shortcuts per hour and totals for a block of movements
+    aisle_labels = np.asarray(sku_slot_df['aisle'].cat.categories, dtype=object)
+    # Aisle code of each pick: movement sku_id -> SKU row -> aisle code of its slot
+    pick_rows = schema.encode(columnar.normalize_ids(picker_df['sku_id']), schema.id_index(sku_df['sku_id']))
+    sku_aisle = sku_slot_df['aisle'].cat.codes.to_numpy()
+    unknown_code = sku_slot_df['aisle'].cat.categories.get_loc(schema.UNKNOWN_AISLE)
+    picks = pd.DataFrame({'aisle': np.where(pick_rows >= 0, sku_aisle[pick_rows], unknown_code)})
+
+    # Robust timestamp parsing
+    picks['hour'] = pd.to_datetime(picker_df['movement_timestamp'], errors='coerce').dt.hour.to_numpy()
+
+    # Count picks per Aisle per Hour (integer group keys, labelled afterwards)
+    aisle_hour = picks.groupby(['aisle', 'hour']).size().reset_index(name='pick_count')
+    aisle_hour['aisle'] = aisle_labels[aisle_hour['aisle'].to_numpy()]
+
+    has_suspicious = 'is_suspicious' in picker_df.columns
+    shortcuts_by_hour = pd.DataFrame(columns=['hour', 'shortcut_count'])
+    illegal_shortcuts = 0
+    if has_suspicious:
+        illegal_shortcuts = int(picker_df['is_suspicious'].sum())
+        suspicious = (picker_df['is_suspicious'].astype(str).str.upper() == 'TRUE').to_numpy()
+        # Filter only suspicious and drop NaN hours
+        shortcuts_by_hour = picks[suspicious].dropna(subset=['hour']).groupby('hour').size().reset_index(name='shortcut_count')
+
+    has_duration = 'duration_sec' in picker_df.columns
+    return {
+        'aisle_hour': aisle_hour,
+        'shortcuts_by_hour': shortcuts_by_hour,
+        'summary': {
+            'total_picks': len(picker_df),
+            'illegal_shortcuts': illegal_shortcuts,
+            'has_suspicious': has_suspicious,
+            'duration_sum': float(picker_df['duration_sec'].sum()) if has_duration else None,
+            'duration_count': int(picker_df['duration_sec'].count()) if has_duration else None,
+        },
+    }
+
+
+def order_volume(order_df):
+    sku_ids = columnar.normalize_ids(order_df['sku_id'])
+    return sku_ids.groupby(sku_ids).size().rename_axis('sku_id').reset_index(name='order_volume')
+
+
+def temp_violations(sku_slot_df):
+    spoilage_mask = (sku_slot_df['temp_req'] != sku_slot_df['temp_zone']) & sku_slot_df['temp_zone'].notna()
+    return sku_slot_df[spoilage_mask].groupby(['temp_req', 'temp_zone'], observed=True).size().reset_index(name='count')
+
+
+def _add_counts(frames, keys, value):
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return pd.DataFrame(columns=keys + [value])
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    return pd.concat(frames, ignore_index=True).groupby(keys)[value].sum().reset_index()
+
+
+def combine_movement(parts):
+    # Sum of movement_rollups() over disjoint blocks of movements
+    summary = {'total_picks': 0, 'illegal_shortcuts': 0, 'has_suspicious': False,
+               'duration_sum': None, 'duration_count': None}
+    for p in parts:
+        s = p['summary']
+        summary['total_picks'] += s['total_picks']
+        summary['illegal_shortcuts'] += s['illegal_shortcuts']
+        summary['has_suspicious'] = summary['has_suspicious'] or s['has_suspicious']
+        if s['duration_count'] is not None:
+            summary['duration_sum'] = (summary['duration_sum'] or 0.0) + s['duration_sum']
+            summary['duration_count'] = (summary['duration_count'] or 0) + s['duration_count']
+    return {
+        'aisle_hour': _add_counts([p['aisle_hour'] for p in parts], ['aisle', 'hour'], 'pick_count'),
+        'shortcuts_by_hour': _add_counts([p['shortcuts_by_hour'] for p in parts], ['hour'], 'shortcut_count'),
+        'summary': summary,
+    }
+
+
+def combine_order_volume(frames):
+    return _add_counts(frames, ['sku_id'], 'order_volume')
+
+
+def write(base_dir, movement, order_volume_df, temp_violations_df, aisle_map):
+    out = rollup_dir(base_dir)
+    os.makedirs(out, exist_ok=True)
+    movement['aisle_hour'].to_csv(os.path.join(out, FILES['aisle_hour']), index=False)
+    movement['shortcuts_by_hour'].to_csv(os.path.join(out, FILES['shortcuts_by_hour']), index=False)
+    order_volume_df.to_csv(os.path.join(out, FILES['order_volume']), index=False)
+    temp_violations_df.to_csv(os.path.join(out, FILES['temp_violations']), index=False)
+    with open(os.path.join(out, "summary.json"), 'w') as f:
+        json.dump(dict(movement['summary'], aisle_map=aisle_map), f, indent=2)
+
+
+def load(base_dir):
+    # All rollups, or None when clean_data has not written a complete set
+    if not all(os.path.exists(p) for p in rollup_paths(base_dir)):
+        return None
+    src = rollup_dir(base_dir)
+    with open(os.path.join(src, "summary.json")) as f:
+        summary = json.load(f)
+    tables = {name: pd.read_csv(os.path.join(src, csv_name)) for name, csv_name in FILES.items()}
+    return dict(tables, summary=summary)
+
+
+def remove(base_dir):
+    for path in rollup_paths(base_dir):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,245 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+import argparse
+
+import columnar
+import simulate
+import topology
+import instrument
+
+# Batch pick routing.
+#
+# order_history lines are grouped into waves (WAVE_MINUTES of order_timestamp)
+# and each wave is cut into cart batches of up to BATCH_SIZE picks. Every batch
+# gets a walking sequence dock -> picks -> dock over the topology graph:
+# nearest-neighbour construction followed by 2-opt. All batches are routed
+# together: the per-batch distance matrices form one (batches, n, n) array,
+# padded with copies of the dock (distance 0 to the dock, so padding never adds
+# distance), and each NN step / 2-opt pass is one vectorized operation over
+# every batch. The planned distance is compared with the travel_distance_m the
+# pickers reported for the same orders.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROUTES_FILE = os.path.join(BASE_DIR, "pick_routes.csv")
+WAVE_MINUTES = 30
+BATCH_SIZE = 20               # picks per cart
+MAX_2OPT_PASSES = 200
+CHUNK_BATCHES = 4096          # batches routed per distance-matrix block
+
+
+def make_batches(order_df, sku_df, topo, wave_minutes=WAVE_MINUTES, batch_size=BATCH_SIZE):
+    # One row per pick line with its wave, batch and slot code (lines whose SKU has no known slot are dropped)
+    lines = pd.DataFrame({'order_id': order_df['order_id'].astype(str).to_numpy(),
+                          'sku_id': columnar.normalize_ids(order_df['sku_id']).to_numpy(),
+                          'order_timestamp': pd.to_datetime(order_df['order_timestamp'], errors='coerce').to_numpy()})
+    sku_slot = pd.Series(topo.slot_codes(sku_df['current_slot']), index=sku_df['sku_id'].to_numpy())
+    sku_slot = sku_slot[~sku_slot.index.duplicated()]
+    lines['slot'] = sku_slot.reindex(lines['sku_id']).fillna(-1).astype(np.int64).to_numpy()
+    unrouted = int(((lines['slot'] < 0) | lines['order_timestamp'].isna()).sum())
+    lines = lines[(lines['slot'] >= 0) & lines['order_timestamp'].notna()]
+    lines = lines.sort_values(['order_timestamp', 'order_id'], kind='stable').reset_index(drop=True)
+
+    # Orders stay whole within a batch: cut at order boundaries every batch_size picks
+    lines['wave'] = lines['order_timestamp'].dt.floor(f"{wave_minutes}min")
+    order_start = np.r_[True, lines['order_id'].to_numpy()[1:] != lines['order_id'].to_numpy()[:-1]]
+    new_wave = np.r_[True, lines['wave'].to_numpy()[1:] != lines['wave'].to_numpy()[:-1]]
+    batch = np.empty(len(lines), dtype=np.int64)
+    current, filled = -1, 0
+    order_size = lines.groupby(np.cumsum(order_start))['order_id'].transform('size').to_numpy()
+    for i in np.flatnonzero(order_start | new_wave):
+        if new_wave[i] or filled + order_size[i] > batch_size:
+            current, filled = current + 1, 0
+        filled += order_size[i]
+        batch[i] = current
+    starts = np.flatnonzero(order_start | new_wave)
+    batch = np.repeat(batch[starts], np.diff(np.r_[starts, len(lines)]))
+    lines['batch'] = batch
+    return lines, unrouted
+
+
+def batch_nodes(lines):
+    # (batches, n) slot codes of every batch, node 0 = dock, -2 = dock / padding
+    counts = lines.groupby('batch').size().to_numpy()
+    n = counts.max() + 1
+    nodes = np.full((len(counts), n), -2, dtype=np.int64)
+    slot_in_batch = np.arange(len(lines)) - np.repeat(np.cumsum(counts) - counts, counts)
+    nodes[lines['batch'].to_numpy(), slot_in_batch + 1] = lines['slot'].to_numpy()
+    return nodes
+
+
+def distance_matrices(topo, nodes):
+    # (batches, n, n) float32 walking distances between the nodes of each batch
+    a, b = nodes[:, :, None], nodes[:, None, :]
+    dock_a, dock_b = a == -2, b == -2
+    d = topo.distance(np.maximum(a, 0), np.maximum(b, 0))
+    d = np.where(dock_a, topo.dock_distance(np.maximum(b, 0)), d)
+    d = np.where(dock_b, topo.dock_distance(np.maximum(a, 0)), d)
+    d = np.where(dock_a & dock_b, 0.0, d)
+    return d.astype(np.float32)
+
+
+def tour_length(dist, tours):
+    rows = np.arange(len(tours))[:, None]
+    return dist[rows, tours[:, :-1], tours[:, 1:]].sum(axis=1)
+
+
+def nearest_neighbour(dist):
+    # Tours (batches, n + 1) starting and ending at the dock (node 0)
+    n_batches, n = dist.shape[:2]
+    rows = np.arange(n_batches)
+    visited = np.zeros((n_batches, n), dtype=bool)
+    visited[:, 0] = True
+    tours = np.zeros((n_batches, n + 1), dtype=np.int64)
+    for step in range(1, n):
+        d = np.where(visited, np.inf, dist[rows, tours[:, step - 1]])
+        tours[:, step] = d.argmin(axis=1)
+        visited[rows, tours[:, step]] = True
+    return tours
+
+
+def two_opt(dist, tours, max_passes=MAX_2OPT_PASSES):
+    # Best-improvement 2-opt, one reversal per batch and pass, all batches at once
+    n_batches, m = tours.shape
+    i, j = np.triu_indices(m - 1, k=1)
+    keep = i >= 1
+    i, j = i[keep], j[keep]
+    idx = np.arange(m)
+    active = np.arange(n_batches)
+    passes = 0
+    while len(active) and passes < max_passes:
+        t = tours[active]
+        r = np.arange(len(active))[:, None]
+        d = dist[active]
+        delta = (d[r, t[:, i - 1], t[:, j]] + d[r, t[:, i], t[:, j + 1]]
+                 - d[r, t[:, i - 1], t[:, i]] - d[r, t[:, j], t[:, j + 1]])
+        best = delta.argmin(axis=1)
+        improving = delta[np.arange(len(active)), best] < -1e-3
+        if not improving.any():
+            break
+        bi, bj = i[best[improving]][:, None], j[best[improving]][:, None]
+        order = np.where((idx >= bi) & (idx <= bj), bi + bj - idx, idx)
+        tours[active[improving]] = np.take_along_axis(t[improving], order, axis=1)
+        active = active[improving]
+        passes += 1
+    return tours, passes
+
+
+def route_batches(topo, lines, max_passes=MAX_2OPT_PASSES):
+    # Per batch: arrival-order, NN and NN + 2-opt distances and the final pick sequence (slot codes)
+    nodes = batch_nodes(lines)
+    results = []
+    total_passes = 0
+    for start in range(0, len(nodes), CHUNK_BATCHES):
+        block = nodes[start:start + CHUNK_BATCHES]
+        dist = distance_matrices(topo, block)
+        arrival = np.tile(np.r_[np.arange(block.shape[1]), 0], (len(block), 1))
+        tours = nearest_neighbour(dist)
+        nn_m = tour_length(dist, tours)
+        tours, passes = two_opt(dist, tours, max_passes)
+        total_passes = max(total_passes, passes)
+        sequence = np.take_along_axis(block, tours, axis=1)
+        results.append(pd.DataFrame({'arrival_order_m': tour_length(dist, arrival), 'nn_m': nn_m,
+                                     'planned_m': tour_length(dist, tours)}))
+        results[-1]['sequence'] = [row[row >= 0] for row in sequence]
+    return pd.concat(results, ignore_index=True), total_passes
+
+
+def plan_routes(order_df, sku_df, topo, picker_df=None, wave_minutes=WAVE_MINUTES, batch_size=BATCH_SIZE):
+    with instrument.stage('route_batching', rows_in=len(order_df)) as rec:
+        lines, unrouted = make_batches(order_df, sku_df, topo, wave_minutes, batch_size)
+        rec['rows_out'] = int(lines['batch'].max() + 1) if len(lines) else 0
+    with instrument.stage('route_optimize', rows_in=rec['rows_out']) as rec:
+        routes, passes = route_batches(topo, lines)
+        rec['rows_out'] = len(routes)
+
+    grouped = lines.groupby('batch')
+    routes['wave'] = grouped['wave'].first().to_numpy()
+    routes['orders'] = grouped['order_id'].nunique().to_numpy()
+    routes['picks'] = grouped.size().to_numpy()
+    slot_ids = topo.slot_ids()
+    routes['route'] = [" > ".join(slot_ids[s]) for s in routes.pop('sequence')]
+
+    if picker_df is not None and 'travel_distance_m' in picker_df.columns:
+        # Observed walking of the same orders, summed per batch
+        observed = pd.to_numeric(picker_df['travel_distance_m'], errors='coerce')
+        observed = observed.groupby(picker_df['order_id'].astype(str).to_numpy()).agg(['sum', 'count'])
+        order_batch = grouped['order_id'].unique().explode()
+        per_batch = observed.reindex(order_batch.to_numpy()).groupby(order_batch.index.to_numpy()).sum(min_count=1)
+        routes['observed_m'] = per_batch['sum'].reindex(routes.index).to_numpy()
+        routes['observed_picks'] = per_batch['count'].reindex(routes.index).fillna(0).astype(int).to_numpy()
+    cols = ['wave', 'orders', 'picks', 'arrival_order_m', 'nn_m', 'planned_m', 'observed_m', 'observed_picks', 'route']
+    routes = routes[[c for c in cols if c in routes.columns]].rename_axis('batch').reset_index()
+    return routes, {'unrouted_lines': unrouted, 'two_opt_passes': passes}
+
+
+def print_report(routes, info, seconds):
+    print(f"\n--- PICK ROUTES ({len(routes):,} batches, {routes['picks'].sum():,} picks, "
+          f"{routes['orders'].sum():,} orders) in {seconds:.1f}s ---")
+    if info['unrouted_lines']:
+        print(f"Lines without a known slot or timestamp (not routed): {info['unrouted_lines']:,}")
+    print(f"Walking, picks in arrival order: {routes['arrival_order_m'].sum() / 1000:,.1f} km")
+    print(f"Walking, nearest neighbour:      {routes['nn_m'].sum() / 1000:,.1f} km")
+    print(f"Walking, NN + 2-opt (planned):   {routes['planned_m'].sum() / 1000:,.1f} km "
+          f"({info['two_opt_passes']} 2-opt passes)")
+    print(f"Planned per batch: median {routes['planned_m'].median():.0f} m, "
+          f"per pick {routes['planned_m'].sum() / routes['picks'].sum():.1f} m")
+    if 'observed_m' in routes.columns:
+        matched = routes['observed_m'].notna()
+        observed, planned = routes.loc[matched, 'observed_m'].sum(), routes.loc[matched, 'planned_m'].sum()
+        print(f"Observed travel_distance_m ({matched.sum():,} batches with movements): {observed / 1000:,.1f} km "
+              f"vs planned {planned / 1000:,.1f} km")
+        if observed > planned:
+            print(f"Walking that routing would save: {(observed - planned) / 1000:,.1f} km "
+                  f"({(observed - planned) / observed:.1%} of observed)")
+        else:
+            print("Observed walking is below the planned shortest routes: travel_distance_m undercounts "
+                  "the walk (see python topology.py --check-movements)")
+
+
+def day_orders(order_df, date=None):
+    # (day, its order lines); default the last full day (simulate.full_days), since a
+    # trailing partial day (export cut after midnight) would route an almost empty shift
+    ts = pd.to_datetime(order_df['order_timestamp'], errors='coerce')
+    if date is not None:
+        day = pd.Timestamp(date).normalize()
+    else:
+        days = simulate.full_days(ts)
+        if days.empty:
+            raise ValueError("order_history has no full day to route; pass --date or --all")
+        day = days[-1]
+    lines = order_df[((ts >= day) & (ts < day + pd.Timedelta(days=1))).to_numpy()]
+    if lines.empty:
+        raise ValueError(f"no order lines on {day:%Y-%m-%d}; order_history covers "
+                         f"{ts.min():%Y-%m-%d} to {ts.max():%Y-%m-%d}")
+    return day, lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch pick-route optimization over order_history")
+    parser.add_argument('--dir', default=simulate.DATA_DIR, help="cleaned_data directory")
+    parser.add_argument('--date', default=None, help="day to route (default: last full day of order_history)")
+    parser.add_argument('--all', action='store_true', help="route the whole order history")
+    parser.add_argument('--wave-minutes', type=int, default=WAVE_MINUTES)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="picks per cart")
+    parser.add_argument('--plan', action='store_true', help="use final_slotting_plan.csv slots")
+    parser.add_argument('--output', default=ROUTES_FILE)
+    args = parser.parse_args()
+
+    sku_df, constraints_df, order_df = simulate.load_inputs(args.dir, simulate.PLAN_FILE if args.plan else None)
+    topo = topology.load(args.dir, constraints_df)
+    picker_df = columnar.load_cleaned('picker_movement', args.dir)
+    if not args.all:
+        try:
+            day, order_df = day_orders(order_df, args.date)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Routing {len(order_df):,} order lines of {day:%Y-%m-%d}")
+
+    start = time.perf_counter()
+    routes, info = plan_routes(order_df, sku_df, topo, picker_df, args.wave_minutes, args.batch_size)
+    print_report(routes, info, time.perf_counter() - start)
+    routes.to_csv(args.output, index=False)
+    print(f"Routes: {args.output}")
+    instrument.print_summary()
@@ -0,0 +1,139 @@
+import pandas as pd
+import numpy as np
+import os
+import argparse
+
+# Typed schema shared by clean_data, optimize_slotting and the dashboard.
+#
+# sku_id / slot_id are encoded once into int32 codes (row of the ID in the SKU
+# master / constraints table, -1 = unknown), slot IDs are split once into
+# aisle / level / position, and low-cardinality text columns become categoricals.
+# Joins between SKUs, slots and movements are then positional takes on int
+# arrays instead of hash merges on object strings.
+
+CATEGORICAL_COLUMNS = ['category', 'zone', 'shelf_level', 'aisle_id']
+# temp_req (SKU) and temp_zone (slot) share one dtype so they compare directly
+TEMP_COLUMNS = ['temp_req', 'temp_zone']
+UNKNOWN_AISLE = 'Unknown'
+
+
+def id_index(ids):
+    # ID -> row of its first occurrence, so codes index straight into the table
+    ids = ids.astype(str).str.strip()
+    first = ~ids.duplicated().to_numpy()
+    return pd.Series(np.flatnonzero(first), index=pd.Index(ids[first]))
+
+
+def encode(values, index):
+    # int32 codes of values against an id_index (-1 for NaN / unknown)
+    pos = index.index.get_indexer(values.astype(str).str.strip())
+    codes = np.where(pos >= 0, index.to_numpy()[pos], -1)
+    codes[values.isna().to_numpy()] = -1
+    return codes.astype(np.int32)
+
+
+def parse_slot_components(slot_ids):
+    # 'A01-A-01' -> aisle 'A01', level 'A', position 1 (one vectorized split)
+    text = slot_ids.astype(str)
+    parts = text.str.split('-', n=2, expand=True).reindex(columns=[0, 1, 2])
+    has_dash = text.str.contains('-', regex=False)
+    aisle = parts[0].where(has_dash, UNKNOWN_AISLE)
+    level = parts[1].where(has_dash)
+    position = pd.to_numeric(parts[2], errors='coerce')
+    return aisle, level, position
+
+
+def _categorical(series, categories=None):
+    if categories is None:
+        return series.astype('category')
+    return pd.Categorical(series.astype(object).where(series.notna()), categories=categories)
+
+
+def apply_schema(sku_df, constraints_df):
+    # Returns typed copies of (sku_df, constraints_df).
+    # constraints: slot_code, aisle / level (categorical), position, is_aisle_b
+    # sku master:  sku_code, slot_code (of current_slot)
+    sku_df = sku_df.copy()
+    constraints_df = constraints_df.copy()
+
+    slot_index = id_index(constraints_df['slot_id'])
+    constraints_df['slot_code'] = encode(constraints_df['slot_id'], slot_index)
+    aisle, level, position = parse_slot_components(constraints_df['slot_id'])
+    # Sorted categories keep groupby / sort order identical to the string labels
+    aisle_categories = sorted(set(aisle.dropna()) | {UNKNOWN_AISLE})
+    constraints_df['aisle'] = _categorical(aisle, aisle_categories)
+    constraints_df['level'] = _categorical(level)
+    constraints_df['position'] = position.astype('Int16')
+    constraints_df['is_aisle_b'] = constraints_df['aisle_id'].astype(str).str.startswith('B').to_numpy()
+
+    sku_df['sku_code'] = encode(sku_df['sku_id'], id_index(sku_df['sku_id']))
+    sku_df['slot_code'] = encode(sku_df['current_slot'], slot_index)
+
+    temp_values = set()
+    for df, col in [(sku_df, 'temp_req'), (constraints_df, 'temp_zone')]:
+        if col in df.columns:
+            temp_values |= set(df[col].dropna().astype(str))
+    temp_categories = sorted(temp_values)
+    for df in (sku_df, constraints_df):
+        for col in TEMP_COLUMNS:
+            if col in df.columns:
+                df[col] = _categorical(df[col], temp_categories)
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = _categorical(df[col])
+
+    return sku_df, constraints_df
+
+
+def join_slots(df, constraints_df, code_col='slot_code'):
+    # Positional equivalent of df.merge(constraints_df, left_on='current_slot',
+    # right_on='slot_id', how='left') for a constraints table from apply_schema
+    slots = constraints_df.drop(columns=[code_col]).reset_index(drop=True)
+    joined = slots.reindex(df[code_col].to_numpy())
+    joined.index = df.index
+    return pd.concat([df, joined], axis=1)
+
+
+def encode_skus(df, sku_df, col='sku_id'):
+    # sku_code for rows of an order / movement table (-1 = SKU not in master)
+    return encode(df[col], id_index(sku_df['sku_id']))
+
+
+def memory_footprint_report(data_dir):
+    # Deep memory of the cleaned tables as loaded from CSV vs the typed schema
+    def mb(df):
+        return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+    sku_df = pd.read_csv(os.path.join(data_dir, "sku_master_cleaned.csv"))
+    constraints_df = pd.read_csv(os.path.join(data_dir, "warehouse_constraints_cleaned.csv"), dtype={'slot_id': str})
+    typed_sku, typed_constraints = apply_schema(sku_df, constraints_df)
+    rows = [
+        ('sku_master', len(sku_df), mb(sku_df), mb(typed_sku.drop(columns=['sku_id', 'current_slot']))),
+        ('warehouse_constraints', len(constraints_df), mb(constraints_df), mb(typed_constraints.drop(columns=['slot_id']))),
+    ]
+
+    for name, csv_name in [('order_history', "order_history_cleaned.csv"),
+                           ('picker_movement', "picker_movement_cleaned.csv")]:
+        path = os.path.join(data_dir, csv_name)
+        if not os.path.exists(path):
+            continue
+        raw = pd.read_csv(path)
+        typed = raw.drop(columns=['sku_id'])
+        typed['sku_code'] = encode_skus(raw, sku_df)
+        for col in typed.columns:
+            if col.endswith('_timestamp'):
+                typed[col] = pd.to_datetime(typed[col], errors='coerce')
+            elif typed[col].dtype == object or pd.api.types.is_string_dtype(typed[col]):
+                typed[col] = typed[col].astype('category')
+        rows.append((name, len(raw), mb(raw), mb(typed)))
+
+    print(f"{'table':<24}{'rows':>12}{'before (MB)':>14}{'after (MB)':>13}{'saved':>8}")
+    for name, n, before, after in rows:
+        print(f"{name:<24}{n:>12,}{before:>14.2f}{after:>13.2f}{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Typed schema memory footprint report")
+    parser.add_argument('--dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "cleaned_data"))
+    args = parser.parse_args()
+    memory_footprint_report(args.dir)
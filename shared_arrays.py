@@ -0,0 +1,49 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+# Named numpy arrays in shared memory blocks, for handing columns to worker
+# processes without pickling them (shortcut_shards.py, multi_site.py).
+#
+# The owner creates the arrays and passes `specs` ({name: (block name, shape,
+# dtype)}) to the workers; a worker maps them with attach() and closes its
+# blocks when done. The owner unlinks every block in close().
+
+
+class SharedArrays:
+    # Named numpy arrays backed by shared memory blocks (owner side)
+    def __init__(self):
+        self.blocks = {}
+        self.specs = {}
+
+    def create(self, name, shape, dtype):
+        dtype = np.dtype(dtype)
+        shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self.blocks[name] = shm
+        self.specs[name] = (shm.name, shape, dtype.str)
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    def put(self, name, values):
+        values = np.ascontiguousarray(values)
+        out = self.create(name, values.shape, values.dtype)
+        out[...] = values
+        return out
+
+    def get(self, name):
+        shm_name, shape, dtype = self.specs[name]
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=self.blocks[name].buf)
+
+    def close(self):
+        for shm in self.blocks.values():
+            shm.close()
+            shm.unlink()
+        self.blocks = {}
+
+
+def attach(specs):
+    # Worker side: (blocks, {name: array view}) for SharedArrays.specs; close the blocks when done
+    blocks, arrays = [], {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return blocks, arrays
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from shared_arrays import SharedArrays, attach
+
+# Sharded shortcut detection for clean_picker_movement.
+#
+# The sort / time_diff / speed check is independent per picker, so movements are
+# partitioned by picker (picker rank modulo the shard count) and each shard is
+# sorted and flagged in its own process. Columns travel through shared memory as
+# flat arrays (shared_arrays.py); only block names and shapes are pickled. Every
+# row's output lands at its original position and the global (picker_id,
+# movement_timestamp) order is rebuilt from per-picker offsets, so the result
+# equals the serial path exactly.
+
+NAT = np.iinfo(np.int64).min
+
+
+def _flag_shard(specs, shard, ts_dtype):
+    from clean_data import flag_shortcuts
+
+    blocks, a = attach(specs)
+    try:
+        lo, hi = a['shard_bounds'][shard], a['shard_bounds'][shard + 1]
+        rows = a['shard_rows'][lo:hi]
+        if len(rows) == 0:
+            return 0
+        rank = a['rank'][rows]
+        ts = a['ts'][rows]
+        # NaT sorts last within a picker, like sort_values(na_position='last')
+        ts_key = np.where(ts == NAT, np.iinfo(np.int64).max, ts)
+        o = np.lexsort((ts_key, rank))
+        rows, rank, ts = rows[o], rank[o], ts[o]
+
+        n = len(rows)
+        starts = np.ones(n, dtype=bool)
+        starts[1:] = rank[1:] != rank[:-1]
+        prev = np.full(n, NAT, dtype=np.int64)
+        prev[1:] = ts[:-1]
+        # First movement of a picker and rows without a picker_id have no previous time
+        prev[starts | (rank == a['n_pickers'][0])] = NAT
+
+        shard_df = pd.DataFrame({
+            'movement_timestamp': ts.view(ts_dtype),
+            'prev_time': prev.view(ts_dtype),
+            'travel_distance_m': a['distance'][rows],
+        })
+        mask = flag_shortcuts(shard_df)
+
+        a['prev'][rows] = prev
+        a['time_diff'][rows] = shard_df['time_diff'].to_numpy()
+        a['speed'][rows] = shard_df['calculated_speed'].to_numpy()
+        a['flag'][rows] = mask.to_numpy()
+
+        # Position in the global sort = picker offset + index within the picker
+        idx = np.arange(n)
+        group_start = np.maximum.accumulate(np.where(starts, idx, 0))
+        a['order'][a['offsets'][rank] + idx - group_start] = rows
+        return n
+    finally:
+        for shm in blocks:
+            shm.close()
+
+
+def flag_shortcuts_sharded(picker_df, workers, shards=None):
+    # picker_df: movement_timestamp already parsed. Returns (picker_df sorted by
+    # picker_id / movement_timestamp with prev_time, time_diff, calculated_speed,
+    # shortcut mask), the same as the serial sort + groupby-shift + flag_shortcuts.
+    shards = shards or workers
+    ts_values = picker_df['movement_timestamp'].to_numpy()
+    ts_dtype = ts_values.dtype
+    distance = picker_df['travel_distance_m'].to_numpy()
+
+    codes, _ = pd.factorize(picker_df['picker_id'], sort=True)
+    n_pickers = int(codes.max()) + 1 if len(codes) else 0
+    rank = np.where(codes < 0, n_pickers, codes).astype(np.int64)  # NaN picker_id sorts last
+    counts = np.bincount(rank, minlength=n_pickers + 1)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+
+    shard_of = (rank % shards).astype(np.uint16)
+    shard_rows = np.argsort(shard_of, kind='stable')  # radix sort for small ints
+    shard_bounds = np.concatenate([[0], np.cumsum(np.bincount(shard_of, minlength=shards))]).astype(np.int64)
+
+    n = len(picker_df)
+    shm = SharedArrays()
+    try:
+        shm.put('rank', rank)
+        shm.put('ts', ts_values.view(np.int64))
+        shm.put('distance', distance)
+        shm.put('offsets', offsets)
+        shm.put('n_pickers', np.array([n_pickers], dtype=np.int64))
+        shm.put('shard_rows', shard_rows)
+        shm.put('shard_bounds', shard_bounds)
+        shm.create('order', (n,), np.int64)
+        shm.create('prev', (n,), np.int64)
+        shm.create('time_diff', (n,), np.float64)
+        shm.create('speed', (n,), np.float64)
+        shm.create('flag', (n,), np.bool_)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            done = sum(pool.map(_flag_shard, [shm.specs] * shards, range(shards), [ts_dtype] * shards))
+        if done != n:
+            raise RuntimeError(f"Sharded shortcut detection covered {done} of {n} movements")
+
+        order = shm.get('order').copy()
+        picker_df = picker_df.iloc[order].copy()
+        picker_df['prev_time'] = shm.get('prev')[order].view(ts_dtype)
+        picker_df['time_diff'] = shm.get('time_diff')[order]
+        picker_df['calculated_speed'] = shm.get('speed')[order]
+        shortcut_mask = pd.Series(shm.get('flag')[order], index=picker_df.index)
+    finally:
+        shm.close()
+
+    return picker_df, shortcut_mask
+
+
+def can_shard(picker_df):
+    # Needs tz-naive datetime64 timestamps and numeric distances to go through flat arrays
+    return (np.issubdtype(picker_df['movement_timestamp'].to_numpy().dtype, np.datetime64)
+            and pd.api.types.is_numeric_dtype(picker_df['travel_distance_m']))
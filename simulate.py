@@ -0,0 +1,472 @@
+import pandas as pd
+import numpy as np
+import os
+import heapq
+import argparse
+from collections import deque
+
+import columnar
+import schema
+import instrument
+from assignment_solver import BAY_WIDTH_M, RACK_DEPTH_M
+
+# Discrete-event simulation of one picking shift.
+#
+# Orders from order_history (optionally scaled in volume) arrive at their
+# order_timestamp and wait for a free picker. A picker walks the front
+# cross-aisle from the dock, visits the aisles of the order's lines in
+# cross-aisle order and walks back. Each aisle holds a limited number of
+# pickers (by its width); a picker arriving at a full aisle queues at the
+# aisle mouth. Forklifts are blocked in Aisle B while more than
+# FORKLIFT_MAX_PICKERS pickers are inside.
+#
+# Routes are built vectorized (one (order, aisle) visit per row); only the
+# arrivals / aisle entries / exits go through the event heap.
+
+# Paths
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cleaned_data")
+PLAN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "final_slotting_plan.csv")
+
+# Picker model
+WALK_SPEED_MS = 1.2
+PICK_SEC_PER_LINE = 25
+PICKER_WIDTH_M = 0.4          # an aisle holds width / 0.4 pickers: 3 in 1.2 m Aisle B, 5 elsewhere
+FORKLIFT_MAX_PICKERS = 2      # forklifts cannot enter Aisle B with more pickers inside
+DEFAULT_PICKERS = 60
+QUEUE_DELAY_TARGET_MIN = 5.0  # avg wait (picker + aisle) a shift should stay under
+
+# Default shift: the evening shift (covering the 19:00 peak) of the last full day in the data
+SHIFT_START_HOUR = 14
+SHIFT_HOURS = 8
+FULL_DAY_SHARE = 0.5          # a day is full when its shift holds >= half the median day's orders
+
+# Event kinds (heap order on ties: exits free capacity before new entries)
+EXIT, REOPEN, AT_AISLE, DONE, ARRIVE = range(5)
+
+
+def load_inputs(data_dir=DATA_DIR, plan_path=None):
+    # SKU master / constraints / orders; SKUs are moved to their plan slot
+    # when plan_path (final_slotting_plan.csv: sku_id, Bin_ID) is given
+    sku_df = columnar.load_cleaned('sku_master', data_dir)
+    constraints_df = columnar.load_cleaned('warehouse_constraints', data_dir, dtype={'slot_id': str})
+    order_df = columnar.load_cleaned('order_history', data_dir)
+    for df, cols in [(sku_df, ['sku_id', 'current_slot']), (constraints_df, ['slot_id'])]:
+        for col in cols:
+            df[col] = columnar.normalize_ids(df[col])
+    if plan_path is not None:
+        sku_df = apply_plan(sku_df, plan_path)
+    return sku_df, constraints_df, order_df
+
+
+def apply_plan(sku_df, plan_path):
+    plan = pd.read_csv(plan_path)
+    plan_slot = pd.Series(columnar.normalize_ids(plan['Bin_ID']).to_numpy(),
+                          index=columnar.normalize_ids(plan['sku_id']))
+    plan_slot = plan_slot[~plan_slot.index.duplicated()]
+    # SKUs the plan leaves unplaced (Bin_ID empty) stay where they are
+    planned = plan_slot.reindex(sku_df['sku_id']).to_numpy()
+    sku_df = sku_df.copy()
+    sku_df['current_slot'] = np.where(pd.isna(planned), sku_df['current_slot'].to_numpy(), planned)
+    return sku_df
+
+
+def shift_days(order_ts, hours=SHIFT_HOURS):
+    # Order lines inside each day's SHIFT_START_HOUR shift, indexed by day (days without any left out)
+    since = order_ts.dropna() - pd.Timedelta(hours=SHIFT_START_HOUR)
+    day = since.dt.normalize()
+    in_shift = (since - day) < pd.Timedelta(hours=hours)
+    return day[in_shift].value_counts().sort_index()
+
+
+def full_days(order_ts, hours=SHIFT_HOURS):
+    # Days whose shift holds at least FULL_DAY_SHARE of the median day's orders
+    counts = shift_days(order_ts, hours)
+    return counts.index[counts >= FULL_DAY_SHARE * counts.median()]
+
+
+def shift_window(order_ts, start=None, hours=SHIFT_HOURS):
+    # (start, end) timestamps of the shift; default SHIFT_START_HOUR on the last full day
+    # (a trailing partial day, e.g. an export cut at midnight, would leave the shift empty)
+    if start is None:
+        days = full_days(order_ts, hours)
+        if days.empty:
+            raise ValueError("order_history has no orders inside any day's shift window")
+        start = days[-1] + pd.Timedelta(hours=SHIFT_START_HOUR)
+    start = pd.Timestamp(start)
+    return start, start + pd.Timedelta(hours=hours)
+
+
+def scale_orders(order_df, volume, window, seed=0, resample=False, peak=None):
+    # Orders of the shift, each replayed floor(volume) times plus once more with
+    # probability frac(volume) (resample=True: a Poisson(volume) number of times).
+    # Copies after the first arrive at a random time within +-30 min of the
+    # original (clipped to the shift). peak=(from s, to s, share) moves that share
+    # of the orders to a uniform arrival time inside the peak window.
+    ts = pd.to_datetime(order_df['order_timestamp'], errors='coerce')
+    in_shift = ((ts >= window[0]) & (ts < window[1])).to_numpy()
+    lines = order_df.loc[in_shift, ['order_id', 'sku_id']].reset_index(drop=True)
+    arrival = (ts[in_shift] - window[0]).dt.total_seconds().to_numpy()
+
+    order_code, _ = pd.factorize(lines['order_id'].astype(str))
+    n_orders = order_code.max() + 1 if len(order_code) else 0
+    rng = np.random.default_rng(seed)
+    if resample:
+        copies = rng.poisson(volume, n_orders)
+    else:
+        copies = np.full(n_orders, int(volume))
+        copies += rng.random(n_orders) < volume - int(volume)
+
+    # Repeat every line once per copy of its order; copy k of order o -> new order o * max + k
+    line_copies = copies[order_code]
+    rows = np.repeat(np.arange(len(lines)), line_copies)
+    first_row = np.cumsum(line_copies) - line_copies
+    copy_idx = np.arange(len(rows)) - np.repeat(first_row, line_copies)
+    new_order = order_code[rows].astype(np.int64) * max(int(copies.max(initial=1)), 1) + copy_idx
+    new_order, _ = pd.factorize(new_order)
+
+    n_new = new_order.max() + 1 if len(new_order) else 0
+    order_arrival = np.full(n_new, np.inf)
+    np.minimum.at(order_arrival, new_order, arrival[rows])
+    is_copy = np.zeros(n_new, dtype=bool)
+    is_copy[new_order] = copy_idx > 0
+    jittered = np.clip(order_arrival + rng.uniform(-1800, 1800, n_new), 0, (window[1] - window[0]).total_seconds() - 1)
+    order_arrival = np.where(is_copy, jittered, order_arrival)
+    if peak is not None:
+        peak_from, peak_to, share = peak
+        to_peak = rng.random(n_new) < share
+        order_arrival[to_peak] = rng.uniform(peak_from, peak_to, to_peak.sum())
+    return pd.DataFrame({'order': new_order, 'sku_id': lines['sku_id'].to_numpy()[rows]}), order_arrival
+
+
+def layout_arrays(sku_df, constraints_df):
+    # Aisle attributes and SKU -> slot lookups of one slotting, shared by every
+    # scenario run on it
+    sku_df, constraints_df = schema.apply_schema(sku_df, constraints_df)
+    aisle_codes = constraints_df['aisle'].cat.codes.to_numpy()
+    aisle_labels = np.asarray(constraints_df['aisle'].cat.categories, dtype=object)
+    n_aisles = len(aisle_labels)
+
+    # Same distance proxy as assignment_solver: aisles side by side along the front cross-aisle
+    aisle_rank = np.unique(constraints_df['aisle_id'].astype(str).to_numpy(), return_inverse=True)[1]
+    width = constraints_df['aisle_width_m'].fillna(2.0).to_numpy(dtype=float)
+    slot_cross = aisle_rank * (width + 2 * RACK_DEPTH_M)
+    aisle_cross = np.zeros(n_aisles)
+    aisle_width = np.full(n_aisles, 2.0)
+    aisle_cross[aisle_codes] = slot_cross
+    aisle_width[aisle_codes] = width
+    aisle_b = np.zeros(n_aisles, dtype=bool)
+    aisle_b[aisle_codes] = constraints_df['is_aisle_b'].eq(True).to_numpy()
+
+    # Constraint violations of each SKU in its slot (for picks touching them)
+    sku_slot = sku_df['slot_code'].to_numpy()
+    placed = sku_slot >= 0
+    slot_rows = np.maximum(sku_slot, 0)
+    temp_violation = placed & (sku_df['temp_req'].astype(object).to_numpy()
+                               != constraints_df['temp_zone'].astype(object).to_numpy()[slot_rows])
+    overweight = placed & (sku_df['weight_kg'].to_numpy(dtype=float)
+                           > constraints_df['max_weight_kg'].to_numpy(dtype=float)[slot_rows])
+    return {
+        'aisle_labels': aisle_labels, 'aisle_cross': aisle_cross, 'aisle_b': aisle_b,
+        'capacity': np.maximum(1, np.floor(aisle_width / PICKER_WIDTH_M + 1e-9)).astype(int),
+        'sku_index': schema.id_index(sku_df['sku_id']), 'sku_slot': sku_slot,
+        'slot_aisle': aisle_codes,
+        'slot_depth': constraints_df['position'].astype(float).fillna(0).to_numpy() * BAY_WIDTH_M,
+        'sku_temp_violation': temp_violation, 'sku_overweight': overweight,
+    }
+
+
+def build_routes(lines, order_arrival, layout):
+    # Visit list of every order, all as arrays
+    aisle_cross, slot_depth = layout['aisle_cross'], layout['slot_depth']
+
+    # Line -> SKU row -> slot row -> aisle; lines of SKUs without a known slot are not routed
+    sku_rows = schema.encode(lines['sku_id'], layout['sku_index'])
+    slot_rows = np.where(sku_rows >= 0, layout['sku_slot'][np.maximum(sku_rows, 0)], -1)
+    located = slot_rows >= 0
+    line_skus = sku_rows[located]
+    order = lines['order'].to_numpy()[located]
+    slot_rows = slot_rows[located]
+    aisle = layout['slot_aisle'][slot_rows]
+
+    # One visit per (order, aisle), in cross-aisle order within the order
+    sort = np.lexsort((aisle, aisle_cross[aisle], order))
+    order, aisle, depth = order[sort], aisle[sort], slot_depth[slot_rows][sort]
+    new_visit = np.ones(len(order), dtype=bool)
+    new_visit[1:] = (order[1:] != order[:-1]) | (aisle[1:] != aisle[:-1])
+    visit_start = np.flatnonzero(new_visit)
+    visit_order = order[visit_start]
+    visit_aisle = aisle[visit_start]
+    visit_depth = np.maximum.reduceat(depth, visit_start) if len(visit_start) else depth[:0]
+    visit_lines = np.diff(np.append(visit_start, len(order)))
+
+    n_orders = len(order_arrival)
+    first_visit = np.searchsorted(visit_order, np.arange(n_orders))
+    n_visits = np.bincount(visit_order, minlength=n_orders)
+    return dict(
+        layout, visit_aisle=visit_aisle, visit_depth=visit_depth, visit_lines=visit_lines,
+        order_arrival=order_arrival, first_visit=first_visit, n_visits=n_visits,
+        lines=len(lines), unlocated_lines=int((~located).sum()),
+        temp_violation_lines=int(layout['sku_temp_violation'][line_skus].sum()),
+        overweight_lines=int(layout['sku_overweight'][line_skus].sum()),
+    )
+
+
+def run_events(routes, n_pickers=DEFAULT_PICKERS, shift_seconds=SHIFT_HOURS * 3600, closures=()):
+    # Event-heap simulation. closures: (aisle codes, start s, end s) during which
+    # those aisles admit nobody. Returns per-order and per-aisle arrays.
+    aisle_cross = routes['aisle_cross'].tolist()
+    aisle_b = routes['aisle_b'].tolist()
+    capacity = routes['capacity'].tolist()
+    visit_aisle = routes['visit_aisle'].tolist()
+    visit_time = (2 * routes['visit_depth'] / WALK_SPEED_MS + routes['visit_lines'] * PICK_SEC_PER_LINE).tolist()
+    first_visit = routes['first_visit'].tolist()
+    n_visits = routes['n_visits'].tolist()
+    arrival = routes['order_arrival'].tolist()
+    n_orders, n_aisles = len(arrival), len(capacity)
+
+    start = [np.nan] * n_orders
+    done = [np.nan] * n_orders
+    aisle_wait = [0.0] * n_orders
+
+    occupancy = [0] * n_aisles
+    closed = [False] * n_aisles
+    waiting = [deque() for _ in range(n_aisles)]
+    last_change = [0.0] * n_aisles
+    occupied_s = [0.0] * n_aisles        # integral of occupancy over time
+    blocked_s = [0.0] * n_aisles         # Aisle B time with > FORKLIFT_MAX_PICKERS inside
+    visits = [0] * n_aisles
+    queued = [0] * n_aisles
+    wait_s = [0.0] * n_aisles
+    max_occupancy = [0] * n_aisles
+    any_blocked = [0, 0.0, 0.0]          # aisles blocked now, since, total seconds
+
+    free_pickers = n_pickers
+    order_queue = deque()
+    busy_s = 0.0
+
+    events = [(arrival[o], ARRIVE, o, o, 0) for o in range(n_orders) if n_visits[o] > 0]
+    seq = n_orders
+    for aisles, closed_from, closed_to in closures:
+        for a in aisles:
+            events.append((closed_from, REOPEN, seq, a, -1))   # v = -1: close
+            events.append((closed_to, REOPEN, seq + 1, a, 1))
+            seq += 2
+    heapq.heapify(events)
+    pop = heapq.heappop
+
+    def schedule(t, kind, o, v):
+        nonlocal seq
+        heapq.heappush(events, (t, kind, seq, o, v))
+        seq += 1
+
+    def account(a, t):
+        dt = t - last_change[a]
+        occupied_s[a] += occupancy[a] * dt
+        if aisle_b[a] and occupancy[a] > FORKLIFT_MAX_PICKERS:
+            blocked_s[a] += dt
+        last_change[a] = t
+
+    def set_occupancy(a, t, delta):
+        account(a, t)
+        was_blocked = aisle_b[a] and occupancy[a] > FORKLIFT_MAX_PICKERS
+        occupancy[a] += delta
+        if occupancy[a] > max_occupancy[a]:
+            max_occupancy[a] = occupancy[a]
+        blocked = aisle_b[a] and occupancy[a] > FORKLIFT_MAX_PICKERS
+        if blocked != was_blocked:
+            if any_blocked[0] > 0:
+                any_blocked[2] += t - any_blocked[1]
+            any_blocked[0] += 1 if blocked else -1
+            any_blocked[1] = t
+
+    def enter(a, o, v, t):
+        set_occupancy(a, t, 1)
+        visits[a] += 1
+        schedule(t + visit_time[v], EXIT, o, v)
+
+    def admit_waiting(a, t):
+        wo, wv, since = waiting[a].popleft()
+        aisle_wait[wo] += t - since
+        wait_s[a] += t - since
+        enter(a, wo, wv, t)
+
+    def begin(o, t):
+        start[o] = t
+        v = first_visit[o]
+        schedule(t + aisle_cross[visit_aisle[v]] / WALK_SPEED_MS, AT_AISLE, o, v)
+
+    t = 0.0
+    while events:
+        t, kind, _, o, v = pop(events)
+        if kind == ARRIVE:
+            if free_pickers:
+                free_pickers -= 1
+                begin(o, t)
+            else:
+                order_queue.append(o)
+        elif kind == AT_AISLE:
+            a = visit_aisle[v]
+            if closed[a] or occupancy[a] >= capacity[a]:
+                waiting[a].append((o, v, t))
+                queued[a] += 1
+            else:
+                enter(a, o, v, t)
+        elif kind == EXIT:
+            a = visit_aisle[v]
+            set_occupancy(a, t, -1)
+            # Next picker waiting at this aisle takes the free place
+            if waiting[a] and not closed[a]:
+                admit_waiting(a, t)
+            # Walk on to the next aisle of the order, or back to the dock
+            if v + 1 < first_visit[o] + n_visits[o]:
+                schedule(t + abs(aisle_cross[visit_aisle[v + 1]] - aisle_cross[a]) / WALK_SPEED_MS, AT_AISLE, o, v + 1)
+            else:
+                schedule(t + aisle_cross[a] / WALK_SPEED_MS, DONE, o, v)
+        elif kind == DONE:
+            done[o] = t
+            busy_s += t - start[o]
+            if order_queue:
+                begin(order_queue.popleft(), t)
+            else:
+                free_pickers += 1
+        else:  # REOPEN: v = -1 closes aisle o, v = 1 reopens it
+            closed[o] = v < 0
+            while not closed[o] and waiting[o] and occupancy[o] < capacity[o]:
+                admit_waiting(o, t)
+
+    span = max(t, shift_seconds)
+    for a in range(n_aisles):
+        account(a, span)
+    return {
+        'start': np.array(start), 'done': np.array(done), 'aisle_wait': np.array(aisle_wait),
+        'span': span, 'busy_s': busy_s, 'any_blocked_s': any_blocked[2],
+        'aisles': pd.DataFrame({
+            'aisle': routes['aisle_labels'], 'is_aisle_b': routes['aisle_b'], 'capacity': capacity,
+            'visits': visits, 'queued_visits': queued, 'wait_min': np.array(wait_s) / 60,
+            'max_pickers': max_occupancy, 'avg_pickers': np.array(occupied_s) / span,
+            'utilization': np.array(occupied_s) / (np.array(capacity) * span),
+            'forklift_blocked_pct': np.array(blocked_s) / span,
+        }),
+    }
+
+
+def summarize(routes, sim, n_pickers, shift_seconds):
+    # Shift-level metrics of one run_events() result
+    routed = routes['n_visits'] > 0
+    arrival = routes['order_arrival'][routed]
+    started, finished, aisle_wait = sim['start'][routed], sim['done'][routed], sim['aisle_wait'][routed]
+    picker_wait = started - arrival
+    aisles = sim['aisles']
+    b_aisles = aisles[aisles['is_aisle_b']]
+    return {
+        'orders': int(routed.sum()),
+        'lines': routes['lines'],
+        'unlocated_lines': routes['unlocated_lines'],
+        'temp_violation_lines': routes['temp_violation_lines'],
+        'overweight_lines': routes['overweight_lines'],
+        'avg_pick_time_min': np.mean(finished - started) / 60 if len(started) else 0.0,
+        'p95_cycle_time_min': np.percentile(finished - arrival, 95) / 60 if len(started) else 0.0,
+        'avg_picker_wait_min': np.mean(picker_wait) / 60 if len(started) else 0.0,
+        'avg_aisle_wait_min': np.mean(aisle_wait) / 60 if len(started) else 0.0,
+        'avg_queueing_delay_min': np.mean(picker_wait + aisle_wait) / 60 if len(started) else 0.0,
+        'orders_delayed': int((picker_wait + aisle_wait > 60).sum()),
+        'orders_waiting_at_shift_end': int((started >= shift_seconds).sum()),
+        'picker_utilization': sim['busy_s'] / (n_pickers * sim['span']),
+        'aisle_b_utilization': (b_aisles['avg_pickers'].sum() / b_aisles['capacity'].sum()) if len(b_aisles) else 0.0,
+        'aisle_b_forklift_blocked_pct': sim['any_blocked_s'] / sim['span'],
+        'span_hours': sim['span'] / 3600,
+        'aisles': aisles,
+    }
+
+
+def run_scenario(layout, order_df, window, volume=1.0, n_pickers=DEFAULT_PICKERS, close_aisle_b=None,
+                 seed=0, resample=False, peak=None):
+    # One shift of order_df on a prepared layout_arrays() slotting.
+    # close_aisle_b: (from, to) hours of the shift day during which every Aisle B aisle is closed.
+    with instrument.stage('simulate_routes', rows_in=len(order_df)) as rec:
+        lines, order_arrival = scale_orders(order_df, volume, window, seed, resample, peak)
+        routes = build_routes(lines, order_arrival, layout)
+        rec['rows_out'] = len(routes['visit_aisle'])
+
+    closures = []
+    if close_aisle_b is not None:
+        day = window[0].normalize()
+        closed_from = (day + pd.Timedelta(hours=close_aisle_b[0]) - window[0]).total_seconds()
+        closed_to = (day + pd.Timedelta(hours=close_aisle_b[1]) - window[0]).total_seconds()
+        closures.append((np.flatnonzero(routes['aisle_b']).tolist(), closed_from, closed_to))
+
+    shift_seconds = (window[1] - window[0]).total_seconds()
+    with instrument.stage('simulate_events', rows_in=len(routes['visit_aisle'])) as rec:
+        sim = run_events(routes, n_pickers, shift_seconds, closures)
+        rec['rows_out'] = len(sim['done'])
+    return summarize(routes, sim, n_pickers, shift_seconds)
+
+
+def simulate_shift(data_dir=DATA_DIR, plan_path=None, volume=1.0, n_pickers=DEFAULT_PICKERS,
+                   start=None, hours=SHIFT_HOURS, close_aisle_b=None, seed=0):
+    # One shift on the current slotting (or plan_path)
+    with instrument.stage('simulate_load') as rec:
+        sku_df, constraints_df, order_df = load_inputs(data_dir, plan_path)
+        layout = layout_arrays(sku_df, constraints_df)
+        rec['rows_out'] = len(sku_df) + len(constraints_df) + len(order_df)
+
+    order_ts = pd.to_datetime(order_df['order_timestamp'], errors='coerce')
+    window = shift_window(order_ts, start, hours)
+    if not ((order_ts >= window[0]) & (order_ts < window[1])).any():
+        raise ValueError(f"no orders between {window[0]:%Y-%m-%d %H:%M} and {window[1]:%Y-%m-%d %H:%M}; "
+                         f"order_history covers {order_ts.min():%Y-%m-%d} to {order_ts.max():%Y-%m-%d}")
+    result = run_scenario(layout, order_df, window, volume, n_pickers, close_aisle_b, seed)
+    return dict(result, window=window, volume=volume, n_pickers=n_pickers,
+                layout='plan' if plan_path is not None else 'current')
+
+
+def survives(result):
+    # Shift keeps up: every order started within the shift and queueing stays under target
+    # (an empty shift proves nothing, so it never counts as keeping up)
+    return result['orders'] > 0 and result['orders_waiting_at_shift_end'] == 0 and result['avg_queueing_delay_min'] < QUEUE_DELAY_TARGET_MIN
+
+
+def print_report(result):
+    print(f"\n--- SIMULATION: {result['layout']} slotting, {result['volume']:.2f}x volume, "
+          f"{result['n_pickers']} pickers, {result['window'][0]:%Y-%m-%d %H:%M} - {result['window'][1]:%H:%M} ---")
+    print(f"Orders: {result['orders']:,} ({result['lines']:,} lines, {result['unlocated_lines']:,} without a known slot)")
+    print(f"Picks from violating slots: {result['temp_violation_lines']:,} wrong temperature, "
+          f"{result['overweight_lines']:,} overweight")
+    print(f"Avg pick time:          {result['avg_pick_time_min']:.2f} min per order")
+    print(f"Avg queueing delay:     {result['avg_queueing_delay_min']:.2f} min "
+          f"(picker {result['avg_picker_wait_min']:.2f} + aisle {result['avg_aisle_wait_min']:.2f})")
+    print(f"P95 order cycle time:   {result['p95_cycle_time_min']:.2f} min")
+    print(f"Picker utilization:     {result['picker_utilization']:.1%}")
+    print(f"Aisle B utilization:    {result['aisle_b_utilization']:.1%}, forklifts blocked "
+          f"{result['aisle_b_forklift_blocked_pct']:.1%} of the shift")
+    print(f"Orders not started by shift end: {result['orders_waiting_at_shift_end']:,} "
+          f"(simulation drained after {result['span_hours']:.1f} h)")
+    status = 'NO ORDERS in the window' if result['orders'] == 0 else 'keeps up' if survives(result) else 'OVERLOADED'
+    print(f"Status: {status} "
+          f"(target: all orders started, avg queueing < {QUEUE_DELAY_TARGET_MIN:.0f} min)")
+    print("\nBusiest aisles:")
+    top = result['aisles'].sort_values('utilization', ascending=False).head(10)
+    print(top[['aisle', 'capacity', 'visits', 'queued_visits', 'max_pickers', 'utilization', 'forklift_blocked_pct']]
+          .to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Discrete-event picker / aisle simulation of one shift")
+    parser.add_argument('--plan', nargs='?', const=PLAN_FILE, default=None,
+                        help="simulate the slotting plan (default final_slotting_plan.csv) instead of current slots")
+    parser.add_argument('--volume', type=float, default=1.0, help="order volume multiplier, e.g. 1.2 or 10")
+    parser.add_argument('--pickers', type=int, default=DEFAULT_PICKERS)
+    parser.add_argument('--start', help="shift start, e.g. '2026-01-30 14:00' (default: last full day, 14:00)")
+    parser.add_argument('--hours', type=float, default=SHIFT_HOURS)
+    parser.add_argument('--close-aisle-b', type=float, nargs=2, metavar=('FROM', 'TO'),
+                        help="close all Aisle B aisles between these hours, e.g. 19 20")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        result = simulate_shift(DATA_DIR, args.plan, args.volume, args.pickers, args.start, args.hours,
+                                args.close_aisle_b, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    print_report(result)
+    instrument.print_summary()
@@ -0,0 +1,158 @@
+import bisect
+import math
+
+import pandas as pd
+
+INF = math.inf
+
+
+def is_aisle_b(aisle_id):
+    return str(aisle_id).startswith('B')
+
+
+class _MinTree:
+    # Segment tree over one partition's slots (sorted by max_weight_kg).
+    # Leaf value = free-list sequence number of the slot, INF when occupied.
+    def __init__(self, size):
+        self.n = 1
+        while self.n < max(size, 1):
+            self.n *= 2
+        self.tree = [INF] * (2 * self.n)
+
+    def set(self, pos, value):
+        i = pos + self.n
+        self.tree[i] = value
+        i //= 2
+        while i >= 1:
+            left, right = self.tree[2 * i], self.tree[2 * i + 1]
+            self.tree[i] = left if left < right else right
+            i //= 2
+
+    def get(self, pos):
+        return self.tree[pos + self.n]
+
+    def min_from(self, lo):
+        # Minimum over leaves [lo, n)
+        best = INF
+        lo += self.n
+        hi = 2 * self.n
+        while lo < hi:
+            if lo & 1:
+                if self.tree[lo] < best:
+                    best = self.tree[lo]
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                if self.tree[hi] < best:
+                    best = self.tree[hi]
+            lo //= 2
+            hi //= 2
+        return best
+
+
+class FreeSlotIndex:
+    # Free-slot index for the greedy slotting loop.
+    #
+    # Slots are partitioned by (temp_zone, is_aisle_b) and sorted by max_weight_kg
+    # inside each partition, so "first empty slot with enough capacity" is a bisect
+    # plus a range-min query. Each free slot carries a sequence number that mirrors
+    # its position in the old `empty_slots_df` frame (constraints order first, then
+    # released slots appended in release order), which keeps the plan identical
+    # to the previous filter-and-concat implementation.
+    def __init__(self, constraints_df, empty_slots):
+        self.partitions = {}
+        self.slot_pos = {}
+        self.next_seq = len(constraints_df)
+
+        slots = constraints_df[['slot_id', 'temp_zone', 'max_weight_kg', 'aisle_id']].copy()
+        slots['order'] = range(len(slots))
+        slots = slots[slots['max_weight_kg'].notna() & slots['temp_zone'].notna()]
+        if 'is_aisle_b' in constraints_df.columns:
+            slots['aisle_b'] = constraints_df.loc[slots.index, 'is_aisle_b'].to_numpy(dtype=bool)
+        else:
+            slots['aisle_b'] = slots['aisle_id'].map(is_aisle_b).astype(bool)
+        slots = slots.sort_values(['max_weight_kg', 'order'], kind='stable')
+
+        # Per-aisle slot lists (same weight order) for aisle-targeted lookups
+        self.aisle_slots = {}
+        for slot_id, aisle_id, temp_zone, weight in zip(slots['slot_id'], slots['aisle_id'].astype(str),
+                                                        slots['temp_zone'], slots['max_weight_kg']):
+            self.aisle_slots.setdefault(aisle_id, []).append((weight, slot_id, temp_zone))
+
+        for key, part in slots.groupby(['temp_zone', 'aisle_b'], sort=False, observed=True):
+            slot_ids = part['slot_id'].tolist()
+            self.partitions[key] = {
+                'weights': part['max_weight_kg'].tolist(),
+                'slot_ids': slot_ids,
+                'tree': _MinTree(len(slot_ids)),
+                'seq_to_pos': {},
+            }
+            for pos, slot_id in enumerate(slot_ids):
+                self.slot_pos[slot_id] = (key, pos)
+
+        order = dict(zip(slots['slot_id'], slots['order']))
+        for slot_id in empty_slots:
+            if slot_id in self.slot_pos:
+                self._set_free(slot_id, int(order[slot_id]))
+
+    def __len__(self):
+        return sum(len(p['seq_to_pos']) for p in self.partitions.values())
+
+    def _set_free(self, slot_id, seq):
+        key, pos = self.slot_pos[slot_id]
+        part = self.partitions[key]
+        part['tree'].set(pos, seq)
+        part['seq_to_pos'][seq] = pos
+
+    def is_free(self, slot_id):
+        if slot_id not in self.slot_pos:
+            return False
+        key, pos = self.slot_pos[slot_id]
+        return self.partitions[key]['tree'].get(pos) != INF
+
+    def acquire(self, slot_id):
+        if not self.is_free(slot_id):
+            return
+        key, pos = self.slot_pos[slot_id]
+        part = self.partitions[key]
+        seq = part['tree'].get(pos)
+        del part['seq_to_pos'][seq]
+        part['tree'].set(pos, INF)
+
+    def release(self, slot_id):
+        # A slot that is already free keeps its earlier position in the free order
+        if slot_id not in self.slot_pos or self.is_free(slot_id):
+            return
+        self._set_free(slot_id, self.next_seq)
+        self.next_seq += 1
+
+    def find(self, temp_zone, min_weight, allow_aisle_b=True):
+        if pd.isna(temp_zone) or pd.isna(min_weight):
+            return None
+        keys = [(temp_zone, False)]
+        if allow_aisle_b:
+            keys.append((temp_zone, True))
+
+        best_seq, best_slot = INF, None
+        for key in keys:
+            part = self.partitions.get(key)
+            if part is None:
+                continue
+            lo = bisect.bisect_left(part['weights'], min_weight)
+            if lo >= len(part['weights']):
+                continue
+            seq = part['tree'].min_from(lo)
+            if seq < best_seq:
+                best_seq = seq
+                best_slot = part['slot_ids'][part['seq_to_pos'][seq]]
+        return best_slot
+
+    def find_in_aisles(self, temp_zone, min_weight, aisles):
+        # Lightest free slot with enough capacity in the first of `aisles` that has one
+        if pd.isna(temp_zone) or pd.isna(min_weight):
+            return None
+        for aisle_id in aisles:
+            for weight, slot_id, slot_temp in self.aisle_slots.get(aisle_id, ()):
+                if weight >= min_weight and slot_temp == temp_zone and self.is_free(slot_id):
+                    return slot_id
+        return None
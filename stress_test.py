@@ -0,0 +1,176 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import simulate
+import instrument
+import dashboard_metrics
+
+# Monte Carlo stress test of the shift simulation.
+#
+# Each replication draws a demand scenario - a random full day of order_history
+# (simulate.full_days: partial days would leave the shift empty), a volume multiplier, and a share of orders pulled into the 19:00 peak hour -
+# and resamples that day's shift orders (Poisson(volume) copies per order). The
+# same scenario is simulated on the current slotting and on
+# final_slotting_plan.csv. Replications run in a process pool. Each one gets its
+# own child of one SeedSequence, so results do not depend on the worker count.
+# Per-replication results are cached in stress_results.csv (+ .json metadata) for
+# the dashboard.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FILE = os.path.join(BASE_DIR, "stress_results.csv")
+META_FILE = os.path.join(BASE_DIR, "stress_results.json")
+
+# Scenario distributions
+VOLUME_RANGE = (0.9, 1.5)           # uniform volume multiplier
+PEAK_SHARE_RANGE = (0.0, 0.3)       # uniform share of orders moved into the peak hour
+PEAK_HOURS = (19, 20)
+
+METRICS = ['avg_pick_time_min', 'avg_queueing_delay_min', 'p95_cycle_time_min', 'picker_utilization',
+           'aisle_b_utilization', 'aisle_b_forklift_blocked_pct', 'orders_waiting_at_shift_end',
+           'temp_violation_lines', 'overweight_lines']
+
+# Inputs of this process, loaded once by _init_worker
+_inputs = {}
+
+
+def _init_worker(data_dir, plan_path, hours):
+    sku_df, constraints_df, order_df = simulate.load_inputs(data_dir)
+    order_df = pd.DataFrame({'order_id': order_df['order_id'].to_numpy(), 'sku_id': order_df['sku_id'].to_numpy(),
+                             'order_timestamp': pd.to_datetime(order_df['order_timestamp'], errors='coerce')})
+    layouts = {'current': simulate.layout_arrays(sku_df, constraints_df)}
+    if plan_path is not None:
+        layouts['plan'] = simulate.layout_arrays(simulate.apply_plan(sku_df, plan_path), constraints_df)
+    _inputs.update(order_df=order_df, layouts=layouts,
+                   days=simulate.full_days(order_df['order_timestamp'], hours).to_numpy())
+
+
+def run_replication(rep, seed_seq, n_pickers, hours):
+    # One scenario on every layout (same resampled orders: common random numbers)
+    rng = np.random.default_rng(seed_seq)
+    day = pd.Timestamp(_inputs['days'][rng.integers(len(_inputs['days']))])
+    volume = rng.uniform(*VOLUME_RANGE)
+    peak_share = rng.uniform(*PEAK_SHARE_RANGE)
+    sim_seed = int(rng.integers(2 ** 63))
+
+    window = simulate.shift_window(None, day + pd.Timedelta(hours=simulate.SHIFT_START_HOUR), hours)
+    peak = ((PEAK_HOURS[0] - simulate.SHIFT_START_HOUR) * 3600, (PEAK_HOURS[1] - simulate.SHIFT_START_HOUR) * 3600,
+            peak_share)
+    rows = []
+    for name, layout in _inputs['layouts'].items():
+        # Per-replication simulation stages would flood the metrics file
+        with instrument.suppressed():
+            result = simulate.run_scenario(layout, _inputs['order_df'], window, volume, n_pickers,
+                                           seed=sim_seed, resample=True, peak=peak)
+        row = {'replication': rep, 'layout': name, 'day': f"{day:%Y-%m-%d}", 'volume': volume,
+               'peak_share': peak_share, 'orders': result['orders']}
+        row.update({m: result[m] for m in METRICS})
+        row['overloaded'] = not simulate.survives(result)
+        rows.append(row)
+    return rows
+
+
+def run(replications=1000, workers=None, seed=42, n_pickers=simulate.DEFAULT_PICKERS, hours=simulate.SHIFT_HOURS,
+        data_dir=simulate.DATA_DIR, plan_path=simulate.PLAN_FILE):
+    workers = workers or os.cpu_count() or 1
+    plan_path = plan_path if plan_path and os.path.exists(plan_path) else None
+    seeds = np.random.SeedSequence(seed).spawn(replications)
+    reps = range(replications)
+    print(f"Running {replications:,} replications on {workers} worker(s) "
+          f"({'current + plan' if plan_path else 'current'} slotting, {n_pickers} pickers, {hours} h shift)...")
+
+    start = time.perf_counter()
+    with instrument.stage('stress_test', rows_in=replications) as rec:
+        if workers == 1:
+            _init_worker(data_dir, plan_path, hours)
+            batches = [run_replication(r, s, n_pickers, hours) for r, s in zip(reps, seeds)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(data_dir, plan_path, hours)) as pool:
+                batches = list(pool.map(run_replication, reps, seeds, [n_pickers] * replications,
+                                        [hours] * replications, chunksize=max(1, replications // (workers * 8))))
+        results = pd.DataFrame([row for rows in batches for row in rows])
+        rec['rows_out'] = len(results)
+    elapsed = time.perf_counter() - start
+
+    results.to_csv(RESULTS_FILE, index=False)
+    meta = {'replications': replications, 'seed': seed, 'workers': workers, 'n_pickers': n_pickers,
+            'hours': hours, 'plan': plan_path, 'volume_range': VOLUME_RANGE, 'peak_share_range': PEAK_SHARE_RANGE,
+            'peak_hours': PEAK_HOURS, 'empty_replications': empty_replications(results),
+            'seconds': round(elapsed, 1),
+            'data_fingerprint': str(dashboard_metrics.data_fingerprint(data_dir))}
+    with open(META_FILE, 'w') as f:
+        json.dump(meta, f, indent=2)
+    print(f"Done in {elapsed:.1f}s ({replications / elapsed:.1f} replications/s). Results: {RESULTS_FILE}")
+    return results
+
+
+def load_results():
+    # (results, metadata) from the last run, or (None, None)
+    if not os.path.exists(RESULTS_FILE):
+        return None, None
+    meta = None
+    if os.path.exists(META_FILE):
+        with open(META_FILE) as f:
+            meta = json.load(f)
+    return pd.read_csv(RESULTS_FILE), meta
+
+
+def wilson_interval(successes, n, z=1.96):
+    if n == 0:
+        return np.nan, np.nan
+    p = successes / n
+    centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def empty_replications(results):
+    # Replications whose resampled shift held no orders (counted once, not per layout)
+    return int(results.loc[results['orders'] == 0, 'replication'].nunique())
+
+
+def summarize(results, z=1.96):
+    # Mean with a normal-approximation 95% CI, and 5th / 50th / 95th percentiles,
+    # per layout and metric; 'overloaded' gets a Wilson interval on the share.
+    # Empty replications are left out: they would drag every mean towards zero.
+    rows = []
+    for layout, group in results[results['orders'] > 0].groupby('layout', sort=False):
+        n = len(group)
+        for metric in METRICS:
+            values = group[metric].to_numpy(dtype=float)
+            mean, sd = values.mean(), values.std(ddof=1) if n > 1 else 0.0
+            p5, p50, p95 = np.percentile(values, [5, 50, 95])
+            rows.append({'layout': layout, 'metric': metric, 'n': n, 'mean': mean,
+                         'ci_low': mean - z * sd / np.sqrt(n), 'ci_high': mean + z * sd / np.sqrt(n),
+                         'p5': p5, 'p50': p50, 'p95': p95})
+        overloaded = int(group['overloaded'].astype(bool).sum())
+        low, high = wilson_interval(overloaded, n, z)
+        rows.append({'layout': layout, 'metric': 'overload_probability', 'n': n, 'mean': overloaded / n,
+                     'ci_low': low, 'ci_high': high, 'p5': np.nan, 'p50': np.nan, 'p95': np.nan})
+    return pd.DataFrame(rows, columns=['layout', 'metric', 'n', 'mean', 'ci_low', 'ci_high', 'p5', 'p50', 'p95'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo stress test of the shift simulation")
+    parser.add_argument('--replications', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--pickers', type=int, default=simulate.DEFAULT_PICKERS)
+    parser.add_argument('--hours', type=float, default=simulate.SHIFT_HOURS)
+    parser.add_argument('--no-plan', action='store_true', help="current slotting only")
+    args = parser.parse_args()
+
+    results = run(args.replications, args.workers, args.seed, args.pickers, args.hours,
+                  plan_path=None if args.no_plan else simulate.PLAN_FILE)
+    print(f"\nEmpty replications (no orders in the shift, left out of the summary): "
+          f"{empty_replications(results):,} of {args.replications:,}")
+    print("\n--- STRESS TEST: mean [95% CI] (P5 / P95) ---")
+    for row in summarize(results).itertuples(index=False):
+        spread = "" if np.isnan(row.p5) else f"  ({row.p5:.3f} / {row.p95:.3f})"
+        print(f"{row.layout:<8}{row.metric:<30}{row.mean:>10.3f}  [{row.ci_low:.3f}, {row.ci_high:.3f}]{spread}")
+    instrument.print_summary()
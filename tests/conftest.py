@@ -0,0 +1,37 @@
+import io
+import os
+import sys
+import contextlib
+
+import pytest
+
+# The modules are flat scripts at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Test runs must not append to the repo's stage_metrics.jsonl
+os.environ.setdefault('VELOCITYMART_METRICS', 'off')
+
+import generate_data
+import clean_data
+
+
+def point_clean_data(mp, data_dir):
+    # clean_data reads / writes module-level paths; aim them at data_dir
+    mp.setattr(clean_data, 'SKU_PATH', os.path.join(data_dir, "sku_master.csv"))
+    mp.setattr(clean_data, 'ORDER_PATH', os.path.join(data_dir, "order_history.csv"))
+    mp.setattr(clean_data, 'PICKER_PATH', os.path.join(data_dir, "picker_movement.csv"))
+    mp.setattr(clean_data, 'CONSTRAINTS_PATH', os.path.join(data_dir, "warehouse_constraints.csv"))
+    mp.setattr(clean_data, 'OUTPUT_DIR', os.path.join(data_dir, "cleaned_data"))
+    mp.setattr(clean_data, 'WATERMARK_PATH', os.path.join(data_dir, "cleaned_data", "_watermark.json"))
+    os.makedirs(os.path.join(data_dir, "cleaned_data"), exist_ok=True)
+
+
+@pytest.fixture(scope='session')
+def synthetic(tmp_path_factory):
+    # Seeded 1x dataset (generate_data) cleaned by clean_data.main; returns its directory.
+    # Session-scoped and shared: tests must not write into it.
+    data_dir = str(tmp_path_factory.mktemp('synthetic'))
+    generate_data.generate(data_dir, scale=1, seed=7)
+    with pytest.MonkeyPatch.context() as mp, contextlib.redirect_stdout(io.StringIO()):
+        point_clean_data(mp, data_dir)
+        clean_data.main()
+    return data_dir
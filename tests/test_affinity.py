@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+import affinity
+
+
+@pytest.fixture(scope='module')
+def orders(synthetic):
+    return pd.read_csv(f"{synthetic}/order_history.csv"), pd.read_csv(f"{synthetic}/sku_master.csv")['sku_id']
+
+
+@pytest.mark.parametrize('mode', ['order', 'cart'])
+def test_update_on_split_orders_equals_a_full_build(orders, mode, tmp_path):
+    order_df, sku_ids = orders
+    full = affinity.build(order_df, sku_ids, mode=mode)
+
+    # The split falls inside a wave, so the open wave is re-counted on update
+    split = len(order_df) * 3 // 5
+    state = affinity.build(order_df.iloc[:split], sku_ids, mode=mode)
+    wave = f"{affinity.WAVE_MINUTES}min"
+    assert pd.Timestamp(order_df['order_timestamp'].iloc[split]).floor(wave) == state['tail']['order_timestamp'].max().floor(wave)
+    affinity.save(state, str(tmp_path))
+    state = affinity.update(affinity.load(str(tmp_path)), order_df.iloc[split:])
+
+    assert list(state['sku_index'].index) == list(full['sku_index'].index)
+    assert (state['matrix'] != full['matrix']).nnz == 0 and full['meta']['pairs'] > 0
+    assert state['meta'] == full['meta']
+    pd.testing.assert_frame_equal(affinity.top_k(state), affinity.top_k(full))
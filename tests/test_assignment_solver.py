@@ -0,0 +1,52 @@
+import pandas as pd
+
+from assignment_solver import solve_assignment
+
+
+def _constraints():
+    return pd.DataFrame({
+        'slot_id': ['A01-A-01', 'A01-A-02'],
+        'aisle_id': ['A01', 'A01'],
+        'aisle_width_m': [2.0, 2.0],
+        'temp_zone': ['Ambient', 'Ambient'],
+        'max_weight_kg': [100.0, 1.0],
+    })
+
+
+def _to_move():
+    # SKU-1 needs Frozen and no slot has it; SKU-2 is overweight and only fits SKU-1's slot
+    return pd.DataFrame({
+        'sku_id': ['SKU-1', 'SKU-2'],
+        'current_slot': ['A01-A-01', 'A01-A-02'],
+        'temp_req': ['Frozen', 'Ambient'],
+        'weight_kg': [5.0, 10.0],
+        'order_count': [10, 5],
+        'is_high_velocity': [False, False],
+    })
+
+
+def test_unplaceable_sku_keeps_its_slot():
+    moves, unplaced = solve_assignment(_to_move(), _constraints(), {'A01-A-01', 'A01-A-02'})
+    assert 'SKU-1' in unplaced
+    assert all(m['new_slot'] != 'A01-A-01' for m in moves)
+
+
+def test_placeable_sku_still_moves():
+    to_move = _to_move().iloc[[1]]
+    constraints = pd.concat([_constraints(), pd.DataFrame({
+        'slot_id': ['A01-A-03'], 'aisle_id': ['A01'], 'aisle_width_m': [2.0],
+        'temp_zone': ['Ambient'], 'max_weight_kg': [50.0]})], ignore_index=True)
+    moves, unplaced = solve_assignment(to_move, constraints, {'A01-A-02', 'A01-A-03'})
+    assert unplaced == []
+    assert moves == [{'sku_id': 'SKU-2', 'current_slot': 'A01-A-02', 'new_slot': 'A01-A-03'}]
+
+
+def test_skus_sharing_a_slot_each_get_one():
+    # Both SKUs sit in A01-A-01; one keeps it, the other takes the free A01-A-02
+    to_move = _to_move().assign(current_slot=['A01-A-01', 'A01-A-01'], temp_req=['Ambient', 'Ambient'],
+                                weight_kg=[0.5, 0.5])
+    moves, unplaced = solve_assignment(to_move, _constraints(), {'A01-A-01', 'A01-A-02'})
+    assert unplaced == []
+    new_slot = {m['sku_id']: m['new_slot'] for m in moves}
+    final = [new_slot.get(s, c) for s, c in zip(to_move['sku_id'], to_move['current_slot'])]
+    assert sorted(final) == ['A01-A-01', 'A01-A-02']
@@ -0,0 +1,56 @@
+import json
+
+import pandas as pd
+
+import clean_data
+
+
+def test_watermark_continues_numeric_picker_ids(tmp_path, monkeypatch):
+    # picker_id reads back as int from the log but is stored as a str key in the watermark JSON
+    monkeypatch.setattr(clean_data, 'WATERMARK_PATH', str(tmp_path / '_watermark.json'))
+    clean_data.save_watermark(0, 0, pd.Series(pd.to_datetime(['2026-01-01 10:00:00']), index=[7]))
+    pickers = json.load(open(clean_data.WATERMARK_PATH))['picker_movement']['pickers']
+    last_time = pd.Series(pd.to_datetime(list(pickers.values())), index=list(pickers.keys()))
+
+    chunk = pd.DataFrame({'picker_id': [7], 'movement_timestamp': ['2026-01-01 10:00:05'], 'travel_distance_m': [100.0]})
+    chunk, last_time, _ = clean_data.clean_movement_chunk(chunk, last_time)
+    assert chunk['is_suspicious'].tolist() == [True]
+    assert last_time.index.tolist() == ['7']
+
+
+def test_read_log_stops_at_the_last_complete_line(tmp_path):
+    path = tmp_path / 'log.csv'
+    path.write_bytes(b'a,b\n1,2\n3,4\n5,')
+    df, offset = clean_data.read_log(str(path))
+    assert df['a'].tolist() == [1, 3]
+    assert offset == len(b'a,b\n1,2\n3,4\n')
+
+
+def test_read_new_rows_continues_from_the_offset(tmp_path):
+    path = tmp_path / 'log.csv'
+    path.write_bytes(b'a,b\n1,2\n')
+    _, offset = clean_data.read_log(str(path))
+    with open(path, 'ab') as f:
+        f.write(b'3,4\n5,6\n7,')
+    df, offset = clean_data.read_new_rows(str(path), offset)
+    assert df.to_dict('list') == {'a': [3, 5], 'b': [4, 6]}
+    assert offset == len(b'a,b\n1,2\n3,4\n5,6\n')
+    assert clean_data.read_new_rows(str(path), offset) == (None, offset)
+
+
+def movement_flags(df):
+    # Movements with their shortcut flag in a canonical row order
+    df = df[['picker_id', 'movement_timestamp', 'travel_distance_m', 'is_suspicious']].copy()
+    df['movement_timestamp'] = pd.to_datetime(df['movement_timestamp'])
+    df['picker_id'] = df['picker_id'].astype(str)
+    return df.sort_values(list(df.columns), kind='stable').reset_index(drop=True)
+
+
+def test_streamed_flags_equal_the_in_memory_path(synthetic, tmp_path):
+    picker_path = f"{synthetic}/picker_movement.csv"
+    out_path = str(tmp_path / 'picker_movement_cleaned.csv')
+    total, shortcuts, _, _ = clean_data.clean_picker_movement_stream(picker_path, out_path, chunksize=7_000)
+
+    in_memory = clean_data.clean_picker_movement(pd.read_csv(picker_path))
+    assert total == len(in_memory) and shortcuts == in_memory['is_suspicious'].sum() > 0
+    pd.testing.assert_frame_equal(movement_flags(pd.read_csv(out_path)), movement_flags(in_memory))
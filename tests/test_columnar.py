@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+import columnar
+
+
+def test_categorical_codes_stay_memory_mapped(tmp_path):
+    columnar.write_table(pd.DataFrame({'sku_id': [' sku-1', 'SKU-2', None], 'quantity': [1, 2, 3]}), 'orders', tmp_path)
+    df = columnar.read_table('orders', tmp_path)
+    assert df['sku_id'].tolist()[:2] == ['SKU-1', 'SKU-2'] and pd.isna(df['sku_id'].iloc[2])
+    assert isinstance(df['sku_id'].array.codes.base, np.memmap)
+
+
+def test_append_widens_codes_when_categories_grow(tmp_path):
+    columnar.write_table(pd.DataFrame({'sku_id': ['SKU-0']}), 'orders', tmp_path)
+    new = pd.DataFrame({'sku_id': [f"SKU-{i}" for i in range(1, 200)]})
+    columnar.append_table(new, 'orders', tmp_path)
+    df = columnar.read_table('orders', tmp_path)
+    assert df['sku_id'].astype(str).tolist() == [f"SKU-{i}" for i in range(200)]
+    assert df['sku_id'].array.codes.dtype == np.int16
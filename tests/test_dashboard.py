@@ -0,0 +1,51 @@
+import os
+import shutil
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import dashboard_metrics
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def app(synthetic, tmp_path, monkeypatch):
+    # dashboard.py reads cleaned_data next to itself; run a copy beside the synthetic data
+    shutil.copy(os.path.join(REPO, "dashboard.py"), tmp_path)
+    shutil.copytree(os.path.join(synthetic, "cleaned_data"), tmp_path / "cleaned_data")
+    st.cache_data.clear()
+    calls = []
+    heatmap_bins = dashboard_metrics.heatmap_bins
+    monkeypatch.setattr(dashboard_metrics, 'heatmap_bins', lambda *a, **kw: calls.append(1) or heatmap_bins(*a, **kw))
+    return AppTest.from_file(str(tmp_path / "dashboard.py"), default_timeout=120), calls
+
+
+def headings(at):
+    return {s.value for s in at.subheader}
+
+
+def test_only_the_open_tab_renders_and_its_figure_is_cached(app):
+    at, heatmap_calls = app
+    at.run()
+    assert not at.exception
+    assert "🎯 Chaos Score Breakdown (Mathematically Defensible)" in headings(at)
+    assert "🗺️ Hourly Aisle Congestion: Identifying Bottleneck Zones" not in headings(at)
+    assert heatmap_calls == []
+
+    at.session_state['dashboard_tab'] = "🗺️ Aisle Heatmap"
+    at.run()
+    assert not at.exception
+    assert "🗺️ Hourly Aisle Congestion: Identifying Bottleneck Zones" in headings(at)
+    assert "🎯 Chaos Score Breakdown (Mathematically Defensible)" not in headings(at)
+    assert len(heatmap_calls) == 1
+
+    # Reruns and a return to the tab reuse the cached figure
+    at.run()
+    at.session_state['dashboard_tab'] = "📈 Overview"
+    at.run()
+    at.session_state['dashboard_tab'] = "🗺️ Aisle Heatmap"
+    at.run()
+    assert not at.exception
+    assert len(heatmap_calls) == 1
@@ -0,0 +1,70 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import columnar
+import dashboard_metrics
+
+
+@pytest.fixture
+def cleaned(synthetic, tmp_path):
+    # Private copy of the synthetic cleaned_data (the session dataset is shared)
+    return shutil.copytree(os.path.join(synthetic, "cleaned_data"), tmp_path / "cleaned_data")
+
+
+def test_fingerprint_changes_only_when_cleaned_inputs_change(cleaned):
+    fingerprint = dashboard_metrics.data_fingerprint(cleaned)
+    assert len(fingerprint) > len(columnar.TABLES)
+    dashboard_metrics.compute_metrics(cleaned)
+    assert dashboard_metrics.data_fingerprint(cleaned) == fingerprint
+
+    # An incremental clean appends to the CSV and the columnar copy
+    new_orders = pd.read_csv(os.path.join(cleaned, columnar.TABLES['order_history']), nrows=3)
+    new_orders.to_csv(os.path.join(cleaned, columnar.TABLES['order_history']), mode='a', header=False, index=False)
+    columnar.append_table(new_orders, 'order_history', cleaned)
+    changed = dashboard_metrics.data_fingerprint(cleaned)
+    assert changed != fingerprint
+    assert {path for path, *_ in set(changed) - set(fingerprint)} == {
+        os.path.join(cleaned, columnar.TABLES['order_history']),
+        os.path.join(columnar.table_dir('order_history', cleaned), "_schema.json")}
+
+
+def test_page_table_filters_sorts_and_clamps_the_page():
+    df = pd.DataFrame({'sku_id': [f"SKU-{i:03d}" for i in range(120)],
+                       'category': ['Dairy', 'Frozen', 'Bakery'] * 40, 'weight_kg': np.arange(120.0)[::-1]})
+    rows, total, page = dashboard_metrics.page_table(df, search="froz", sort_by='weight_kg', page=2, page_size=25)
+    assert (total, page, len(rows)) == (40, 2, 15)
+    assert (rows['category'] == 'Frozen').all() and rows['weight_kg'].is_monotonic_increasing
+    frozen = df[df['category'] == 'Frozen'].sort_values('weight_kg')
+    assert rows.equals(frozen.iloc[25:40])
+
+    # Numeric columns are not searched; out-of-range pages clamp to the first / last page
+    assert dashboard_metrics.page_table(df, search="119.0")[1] == 0
+    assert dashboard_metrics.page_table(df, page=99, page_size=50)[2] == 3
+    assert dashboard_metrics.page_table(df, page=0)[2] == 1
+    rows, total, page = dashboard_metrics.page_table(df, search="nothing", page=4)
+    assert (len(rows), total, page) == (0, 0, 1)
+
+
+def test_heatmap_bins_keep_the_busiest_aisle_of_each_run():
+    rng = np.random.default_rng(0)
+    aisles = [f"A{i:03d}" for i in range(400)]
+    aisle_hour = pd.DataFrame([(a, h, rng.integers(0, 50)) for a in aisles for h in (8, 19)],
+                              columns=['aisle', 'hour', 'pick_count'])
+    aisle_hour.loc[(aisle_hour['aisle'] == 'A123') & (aisle_hour['hour'] == 19), 'pick_count'] = 999
+
+    small, labels = dashboard_metrics.heatmap_bins(aisle_hour[aisle_hour['aisle'] < 'A010'], hours=range(24))
+    assert small.shape == (10, 24) and list(small.index) == aisles[:10][::-1] and small.dtypes.eq(np.int32).all()
+    assert labels['A004'] == 'A004'
+
+    matrix, labels = dashboard_metrics.heatmap_bins(aisle_hour, max_rows=150)
+    assert len(matrix) == 150 and len(labels) == 400
+    assert matrix.loc[labels['A123'], 19] == 999
+    full = aisle_hour.pivot_table(index='aisle', columns='hour', values='pick_count', aggfunc='sum')
+    assert (matrix.to_numpy().max(axis=0) == full.to_numpy().max(axis=0)).all()
+    first_run = [a for a in aisles if labels[a] == labels['A000']]
+    assert len(first_run) > 1 and (matrix.loc[labels['A000']].to_numpy() == full.loc[first_run].max().to_numpy()).all()
+    assert list(matrix.index) == sorted(matrix.index, reverse=True)
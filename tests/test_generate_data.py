@@ -0,0 +1,31 @@
+import os
+import json
+import filecmp
+
+import pandas as pd
+
+import clean_data
+import generate_data
+
+FILES = ["sku_master.csv", "warehouse_constraints.csv", "order_history.csv", "picker_movement.csv", "_manifest.json"]
+
+
+def test_same_seed_gives_identical_files(synthetic, tmp_path):
+    generate_data.generate(str(tmp_path), scale=1, seed=7)
+    assert all(filecmp.cmp(os.path.join(synthetic, name), tmp_path / name, shallow=False) for name in FILES)
+
+
+def test_clean_data_finds_exactly_the_injected_anomalies(synthetic):
+    with open(os.path.join(synthetic, "_manifest.json")) as f:
+        manifest = json.load(f)
+    sku_df = pd.read_csv(os.path.join(synthetic, "sku_master.csv"))
+    constraints_df = pd.read_csv(os.path.join(synthetic, "warehouse_constraints.csv"), dtype={'slot_id': str})
+    movements = clean_data.clean_picker_movement(pd.read_csv(os.path.join(synthetic, "picker_movement.csv")))
+
+    assert manifest['rows']['sku_master'] == len(sku_df) == generate_data.SKUS_PER_SCALE
+    assert (sku_df['weight_kg'] > 80.0).sum() == manifest['injected']['decimal_drift'] > 0
+    # Ghost slots are set to NaN by the cleaner
+    cleaned = clean_data.detect_ghost_inventory(sku_df.copy(), constraints_df)
+    ghosts = cleaned['current_slot'].isna().sum() - sku_df['current_slot'].isna().sum()
+    assert ghosts == manifest['injected']['ghost_slots'] > 0
+    assert movements['is_suspicious'].sum() == manifest['injected']['shortcuts'] > 0
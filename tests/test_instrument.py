@@ -0,0 +1,14 @@
+import instrument
+
+
+def test_record_buffer_is_bounded(monkeypatch):
+    # The dashboard records stages for the life of the server and never prints a summary
+    monkeypatch.setattr(instrument, 'METRICS_FILE', 'off')
+    instrument._records.clear()
+    for i in range(instrument.MAX_BUFFERED_RECORDS + 10):
+        with instrument.stage(f"stage-{i}") as rec:
+            rec['rows_out'] = i
+    assert len(instrument._records) == instrument.MAX_BUFFERED_RECORDS
+    assert instrument._records[-1]['stage'] == f"stage-{instrument.MAX_BUFFERED_RECORDS + 9}"
+    instrument.print_summary()
+    assert len(instrument._records) == 0
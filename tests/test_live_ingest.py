@@ -0,0 +1,65 @@
+import os
+import time
+import threading
+
+import pandas as pd
+
+import clean_data
+import live_ingest
+from simulate import FORKLIFT_MAX_PICKERS
+
+
+def test_live_counts_equal_the_batch_pipeline(synthetic):
+    picker_path = os.path.join(synthetic, "picker_movement.csv")
+    sku_aisle = live_ingest.load_sku_aisles(os.path.join(synthetic, "cleaned_data"))
+    state = live_ingest.LiveState(sku_aisle, rolling_hours=24 * 365)
+    with open(picker_path) as f:
+        lines = f.readlines()
+    assert state.ingest(lines) == len(lines) - 1 and state.late == state.skipped == 0
+
+    picker_df = pd.read_csv(picker_path)
+    batch = clean_data.clean_picker_movement(picker_df.copy())
+    assert state.shortcuts == batch['is_suspicious'].sum() > 0
+
+    # Rolling aisle x hour counters = picks per hour and aisle of the SKU's slot
+    hour = pd.to_datetime(picker_df['movement_timestamp']).dt.floor('h')
+    aisle = picker_df['sku_id'].str.upper().map(sku_aisle).fillna(live_ingest.UNKNOWN_AISLE)
+    expected = pd.DataFrame({'hour': hour, 'aisle': aisle}).value_counts().sort_index()
+    snap = state.snapshot()
+    counts = snap['aisle_hour'].set_index(['hour', 'aisle'])['pick_count'].sort_index()
+    assert counts.to_dict() == expected.to_dict()
+
+
+def test_aisle_b_alert_raises_and_clears_with_presence():
+    state = live_ingest.LiveState({'SKU-B': 'B01', 'SKU-A': 'A01'}, presence_sec=60)
+    t0 = live_ingest.parse_time("2026-01-05 19:00:00")
+    for i in range(FORKLIFT_MAX_PICKERS + 1):
+        state.add(f"P{i}", 'SKU-B', t0 + i, 1.0)
+    assert state.congested == {'B01': t0 + FORKLIFT_MAX_PICKERS} and state.aisle_b_alerts == 1
+
+    # One picker moves on to aisle A, the others' presences expire as the clock passes them
+    state.add("P0", 'SKU-A', t0 + 30, 1.0)
+    assert state.congested == {} and state.occupancy['B01'] == FORKLIFT_MAX_PICKERS
+    state.add("P9", 'SKU-A', t0 + 200, 1.0)
+    assert state.occupancy['B01'] == 0 and state.occupancy['A01'] == 1
+    assert [kind for _, kind, *_ in state.alerts] == ['aisle_b', 'aisle_b_clear']
+
+
+def test_follow_ingests_lines_appended_to_the_log(tmp_path):
+    path = tmp_path / "picker_movement.csv"
+    path.write_text(",".join(live_ingest.EVENT_COLUMNS) + "\nP1,O1,SKU-1,2026-01-05 10:00:00,5\n")
+    state = live_ingest.LiveState({})
+    stop = threading.Event()
+    thread = threading.Thread(target=live_ingest.follow, args=(state, str(path)),
+                              kwargs={'from_start': True, 'stop': stop, 'poll_sec': 0.01})
+    thread.start()
+    try:
+        with open(path, 'a') as f:
+            f.write("P1,O2,SKU-1,2026-01-05 10:00:01,50\nP1,O3,SKU-1,2026-01-05 10:00")  # last line incomplete
+        deadline = time.time() + 5
+        while state.events < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert state.events == 2 and state.shortcuts == 1
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,52 @@
+import io
+import os
+import shutil
+import contextlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import local_search
+import optimize_slotting
+import plan_validator
+
+
+@pytest.fixture
+def instance():
+    # 40 SKUs in 60 slots of two temp zones over 6 aisles (aisle 1 is Aisle B)
+    rng = np.random.default_rng(1)
+    n_skus, n_slots = 40, 60
+    slot_temp = np.arange(n_slots) % 2
+    home = rng.permutation(n_slots)[:n_skus]
+    return dict(
+        codes=home.copy(), home=home, velocity=rng.integers(1, 200, n_skus).astype(float),
+        weight=rng.uniform(1, 30, n_skus), temp=slot_temp[home], high_velocity=rng.random(n_skus) < 0.3,
+        slot_temp=slot_temp, slot_capacity=rng.choice([20.0, 50.0], n_slots), slot_b=np.arange(n_slots) // 10 == 1,
+        slot_aisle=np.arange(n_slots) // 10, dock=rng.uniform(5, 80, n_slots))
+
+
+def test_anneal_tracks_the_plan_cost_and_never_gets_worse(instance):
+    codes, stats = local_search.anneal(**instance, seconds=0.3)
+    args = {k: v for k, v in instance.items() if k != 'codes'}
+    assert stats['iterations'] > 0 and stats['accepted'] > 0
+    # The O(1) deltas add up to the recomputed cost of the returned plan
+    assert stats['tracked_cost'] == pytest.approx(local_search.plan_cost(codes, **args)['total'])
+    assert stats['final_cost']['total'] <= stats['initial_cost']['total']
+    assert stats['final_cost']['penalties'] <= stats['initial_cost']['penalties']
+    placed = codes[codes >= 0]
+    assert len(placed) == len(set(placed)) == len(codes)
+    assert (instance['slot_temp'][codes] == instance['temp']).all()
+
+
+def test_improved_plan_passes_the_validator(synthetic, tmp_path):
+    # Private cleaned_data copy: the search builds the topology next to it
+    data_dir = shutil.copytree(os.path.join(synthetic, "cleaned_data"), tmp_path / "cleaned_data")
+    paths = {'data': str(data_dir), 'plan': str(tmp_path / "plan.csv"), 'sequence': str(tmp_path / "sequence.csv"),
+             'state': str(tmp_path / "state")}
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = optimize_slotting.optimize(improve_seconds=1, paths=paths)
+    validator, _ = plan_validator.load_validator(str(data_dir))
+    counts, _, _ = validator.validate(pd.read_csv(paths['plan']))
+    assert plan_validator.is_valid(counts), counts
+    assert summary['plan_violations'] == 0 and counts['evicted'] == 0
@@ -0,0 +1,70 @@
+import io
+import os
+import contextlib
+
+import pandas as pd
+
+import move_planner
+import optimize_slotting
+
+
+def replay(steps, sku_ids, from_slots, to_slots):
+    # Executes the steps on the slot occupancy: a SKU moves out of the slot it is in,
+    # into a slot no moving SKU still holds. Returns the final slot of every SKU.
+    where = dict(zip(sku_ids, from_slots))
+    moving = {s for s, a, b in zip(sku_ids, from_slots, to_slots) if pd.notna(b) and b != a}
+    for step in steps.itertuples():
+        assert where[step.sku_id] == step.from_slot, step
+        if step.to_slot != move_planner.FLOOR:
+            holders = {s for s, slot in where.items() if slot == step.to_slot and s in moving and s != step.sku_id}
+            assert not holders, (step, holders)
+        where[step.sku_id] = step.to_slot
+    return where
+
+
+def constraints(rows):
+    return pd.DataFrame(rows, columns=['slot_id', 'aisle_id', 'temp_zone', 'max_weight_kg'])
+
+
+def test_chains_and_cycles_execute_to_the_plan():
+    # A01-A-09 stays empty and is the cycles' buffer
+    constraints_df = constraints([(f"A01-A-{i:02d}", 'A01', 'Ambient', 100) for i in range(1, 10)])
+    sku_ids = ['chain1', 'chain2', 'swap1', 'swap2', 'rot1', 'rot2', 'rot3', 'stays']
+    from_slots = ['A01-A-01', 'A01-A-02', 'A01-A-03', 'A01-A-04', 'A01-A-05', 'A01-A-06', 'A01-A-07', 'A01-A-02']
+    to_slots = ['A01-A-08', 'A01-A-01', 'A01-A-04', 'A01-A-03', 'A01-A-06', 'A01-A-07', 'A01-A-05', None]
+    steps, summary = move_planner.sequence_moves(sku_ids, from_slots, to_slots, constraints_df, ['Ambient'] * 8)
+
+    final = replay(steps, sku_ids, from_slots, to_slots)
+    assert final == {s: b if b is not None else a for s, a, b in zip(sku_ids, from_slots, to_slots)}
+    assert summary['moves'] == 7 and summary['chains'] == 1 and summary['longest_chain'] == 2
+    assert summary['cycles'] == 2 and summary['forklift_trips'] == 9
+    assert summary['rack_buffer_cycles'] == 2 and summary['floor_buffer_slots'] == 0
+    assert set(steps.loc[steps['kind'] == 'to_buffer', 'to_slot']) == {'A01-A-09'}
+    assert summary['shared_bins'] == 0 and summary['conflicts'] == []
+
+
+def test_rotate_unplaced_swaps_skus_that_fit_each_others_slots():
+    constraints_df = constraints([('A01-A-01', 'A01', 'Frozen', 10), ('A01-A-02', 'A01', 'Ambient', 10),
+                                  ('B01-A-01', 'B01', 'Ambient', 10)])
+    unplaced = pd.DataFrame({'sku_id': ['cold', 'warm', 'fast'], 'current_slot': ['A01-A-02', 'A01-A-01', 'B01-A-01'],
+                             'temp_req': ['Frozen', 'Ambient', 'Frozen'], 'weight_kg': [1.0, 1.0, 1.0],
+                             'is_high_velocity': [False, False, True]})
+    rotations = move_planner.rotate_unplaced(unplaced, constraints_df)
+    assert sorted((m['sku_id'], m['new_slot']) for m in rotations) == [('cold', 'A01-A-01'), ('warm', 'A01-A-02')]
+
+
+def test_optimized_plan_sequence_executes(synthetic, tmp_path):
+    paths = dict(optimize_slotting.site_paths(synthetic), plan=str(tmp_path / "plan.csv"),
+                 sequence=str(tmp_path / "sequence.csv"), state=str(tmp_path / "state"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimize_slotting.optimize(paths=paths)
+    sku_df, _, _ = optimize_slotting.load_data(data_dir=paths['data'])
+    plan = pd.read_csv(paths['plan'], dtype=str)
+    steps = pd.read_csv(paths['sequence'], dtype={'sku_id': str, 'from_slot': str, 'to_slot': str})
+
+    sku_ids = sku_df['sku_id'].astype(str).tolist()
+    from_slots = sku_df['current_slot'].astype(str).where(sku_df['current_slot'].astype(str) != 'nan').tolist()
+    to_slots = plan.set_index('sku_id')['Bin_ID'].reindex(sku_ids).tolist()
+    final = replay(steps, sku_ids, from_slots, to_slots)
+    assert len(steps) > 0
+    assert all(final[s] == b for s, a, b in zip(sku_ids, from_slots, to_slots) if pd.notna(b))
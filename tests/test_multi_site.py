@@ -0,0 +1,33 @@
+import io
+import os
+import shutil
+import contextlib
+
+import pandas as pd
+
+import clean_data
+import multi_site
+import optimize_slotting
+
+RAW_FILES = ["sku_master.csv", "order_history.csv", "picker_movement.csv", "warehouse_constraints.csv"]
+
+
+def test_sites_are_cleaned_and_optimized_into_their_own_directories(synthetic, tmp_path):
+    for site in ['north', 'south']:
+        os.makedirs(tmp_path / site)
+        for name in RAW_FILES:
+            shutil.copy(os.path.join(synthetic, name), tmp_path / site / name)
+    module_paths = clean_data.site_paths(), optimize_slotting.site_paths()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = multi_site.run_sites(str(tmp_path), workers=2)
+
+    assert list(summary['site']) == ['north', 'south'] and summary['seconds'].notna().all()
+    assert (summary['plan_violations'] == 0).all()
+    north = pd.read_csv(tmp_path / 'north' / "final_slotting_plan.csv")
+    assert north.equals(pd.read_csv(tmp_path / 'south' / "final_slotting_plan.csv"))
+    for site in ['north', 'south']:
+        assert os.path.exists(tmp_path / site / "move_sequence.csv")
+        assert os.path.exists(tmp_path / site / "cleaned_data" / "slotting_state" / "_plan.json")
+    # The parent's module paths are untouched
+    assert (clean_data.site_paths(), optimize_slotting.site_paths()) == module_paths
@@ -0,0 +1,51 @@
+import io
+import os
+import contextlib
+
+import pandas as pd
+import pytest
+
+import optimize_slotting
+import plan_validator
+
+
+@pytest.fixture
+def paths(synthetic, tmp_path):
+    # The synthetic cleaned data, with plan / state / sequence written to tmp_path
+    return {'data': os.path.join(synthetic, "cleaned_data"), 'plan': str(tmp_path / "final_slotting_plan.csv"),
+            'sequence': str(tmp_path / "move_sequence.csv"), 'state': str(tmp_path / "slotting_state")}
+
+
+@pytest.fixture
+def optimizer(paths):
+    def run(**kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = optimize_slotting.optimize(paths=paths, **kwargs)
+        return summary, pd.read_csv(paths['plan'])
+    return run
+
+
+@pytest.mark.parametrize('solver', ['greedy', 'assignment'])
+def test_default_plan_passes_the_validator(optimizer, paths, solver):
+    sku_df, _, _ = optimize_slotting.load_data(data_dir=paths['data'])
+    assert sku_df['current_slot'].duplicated().any()  # the generator puts some SKUs in one slot
+
+    summary, plan = optimizer(solver=solver)
+    validator, _ = plan_validator.load_validator(paths['data'])
+    counts, _, _ = validator.validate(plan)
+    assert plan_validator.is_valid(counts), counts
+    assert counts['evicted'] == 0 and summary['plan_violations'] == 0
+
+
+def test_incremental_uses_the_requested_solver(paths):
+    def incremental():
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            optimize_slotting.optimize_incremental(solver='assignment', paths=paths)
+        return out.getvalue()
+
+    # No state yet: falls back to a full run, then warm-starts from that plan
+    cold = incremental()
+    assert "running a full optimization" in cold and "Objective (assignment)" in cold
+    warm = incremental()
+    assert "running a full optimization" not in warm and "Objective (assignment)" in warm
@@ -0,0 +1,35 @@
+import pandas as pd
+
+import schema
+from plan_validator import PlanValidator, is_valid
+
+
+def _validator():
+    sku_df = pd.DataFrame({
+        'sku_id': ['SKU-1', 'SKU-2', 'SKU-3'],
+        'current_slot': ['A01-A-01', 'A01-A-02', None],
+        'temp_req': ['Ambient', 'Ambient', 'Ambient'],
+        'weight_kg': [5.0, 5.0, 5.0],
+    })
+    constraints_df = pd.DataFrame({
+        'slot_id': ['A01-A-01', 'A01-A-02', 'A01-A-03'],
+        'aisle_id': ['A01', 'A01', 'A01'],
+        'temp_zone': ['Ambient', 'Ambient', 'Ambient'],
+        'max_weight_kg': [50.0, 50.0, 50.0],
+    })
+    sku_df, constraints_df = schema.apply_schema(sku_df, constraints_df)
+    return PlanValidator(sku_df, constraints_df, high_velocity=False)
+
+
+def test_sku_that_loses_its_slot_fails_the_plan():
+    counts, offenders, _ = _validator().validate({'SKU-1': 'A01-A-02', 'SKU-2': None, 'SKU-3': 'A01-A-03'})
+    assert counts['evicted'] == 1
+    assert offenders.loc[offenders['check'] == 'evicted', 'sku_id'].tolist() == ['SKU-2']
+    assert not is_valid(counts)
+
+
+def test_sku_that_never_had_a_slot_is_only_reported():
+    counts, _, _ = _validator().validate({'SKU-1': 'A01-A-01', 'SKU-2': 'A01-A-02'})
+    assert counts['unassigned'] == 1
+    assert counts['evicted'] == 0
+    assert is_valid(counts)
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dashboard_metrics
+import rollups
+
+
+@pytest.fixture(scope='module')
+def metrics(synthetic):
+    cleaned = os.path.join(synthetic, "cleaned_data")
+    return dashboard_metrics.compute_metrics(cleaned), dashboard_metrics.compute_metrics(cleaned, use_rollups=False)
+
+
+def sorted_frame(df, keys):
+    df = df.reset_index(drop=True)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+    return df.sort_values(keys).reset_index(drop=True)
+
+
+def test_rollups_give_the_same_metrics_as_the_movement_rows(metrics):
+    from_rollups, from_rows = metrics
+    assert from_rollups['total_picks'] > 0
+    for key in ['spoilage_count', 'total_picks', 'illegal_shortcuts', 'aisle_b_code', 'aisle_b_peak_count',
+                'weight_viol_count', 'has_suspicious', 'chaos_score']:
+        assert from_rollups[key] == from_rows[key], key
+    assert from_rollups['avg_pick_time_min'] == pytest.approx(from_rows['avg_pick_time_min'])
+    np.testing.assert_array_equal(from_rollups['sku_volume'], from_rows['sku_volume'])
+    pd.testing.assert_frame_equal(sorted_frame(from_rollups['heatmap_data'], ['aisle', 'hour']),
+                                  sorted_frame(from_rows['heatmap_data'], ['aisle', 'hour']), check_dtype=False)
+    pd.testing.assert_frame_equal(sorted_frame(from_rollups['shortcut_by_hour'], ['hour']),
+                                  sorted_frame(from_rows['shortcut_by_hour'], ['hour']), check_dtype=False)
+    pd.testing.assert_frame_equal(sorted_frame(from_rollups['temp_breakdown'], ['temp_req', 'temp_zone']),
+                                  sorted_frame(from_rows['temp_breakdown'], ['temp_req', 'temp_zone']), check_dtype=False)
+
+
+def test_chunked_rollups_combine_to_the_whole(synthetic):
+    cleaned = os.path.join(synthetic, "cleaned_data")
+    sku_df = pd.read_csv(os.path.join(cleaned, "sku_master_cleaned.csv"))
+    constraints_df = pd.read_csv(os.path.join(cleaned, "warehouse_constraints_cleaned.csv"), dtype={'slot_id': str})
+    picker_df = pd.read_csv(os.path.join(cleaned, "picker_movement_cleaned.csv"))
+    sku_norm, _, sku_slot_df = rollups.normalized_sku_slots(sku_df, constraints_df)
+
+    whole = rollups.movement_rollups(picker_df, sku_norm, sku_slot_df)
+    parts = [rollups.movement_rollups(picker_df.iloc[i:i + 9_000], sku_norm, sku_slot_df)
+             for i in range(0, len(picker_df), 9_000)]
+    combined = rollups.combine_movement(parts)
+    assert combined['summary'] == pytest.approx(whole['summary'])
+    pd.testing.assert_frame_equal(sorted_frame(combined['aisle_hour'], ['aisle', 'hour']),
+                                  sorted_frame(whole['aisle_hour'], ['aisle', 'hour']), check_dtype=False)
+    pd.testing.assert_frame_equal(sorted_frame(combined['shortcuts_by_hour'], ['hour']),
+                                  sorted_frame(whole['shortcuts_by_hour'], ['hour']), check_dtype=False)
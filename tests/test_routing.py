@@ -0,0 +1,21 @@
+import pandas as pd
+import pytest
+
+import routing
+
+
+def _orders():
+    # Two full days, then a few lines just after midnight
+    ts = ['2026-01-01 15:00', '2026-01-01 19:00', '2026-01-02 15:00', '2026-01-02 19:00', '2026-01-03 00:30']
+    return pd.DataFrame({'order_id': range(len(ts)), 'order_timestamp': pd.to_datetime(ts)})
+
+
+def test_default_day_skips_a_trailing_partial_day():
+    day, lines = routing.day_orders(_orders())
+    assert day == pd.Timestamp('2026-01-02')
+    assert lines['order_id'].tolist() == [2, 3]
+
+
+def test_empty_day_is_an_error():
+    with pytest.raises(ValueError, match="no order lines"):
+        routing.day_orders(_orders(), '2026-02-01')
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import clean_data
+
+
+@pytest.fixture(scope='module')
+def movements(synthetic):
+    picker_df = pd.read_csv(f"{synthetic}/picker_movement.csv")
+    # Rows without a picker or timestamp take the serial path's NaN / NaT ordering
+    picker_df.loc[picker_df.index[::997], 'picker_id'] = np.nan
+    picker_df.loc[picker_df.index[5::1009], 'movement_timestamp'] = np.nan
+    return picker_df
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+def test_sharded_detection_equals_serial(movements, workers, capsys):
+    serial = clean_data.clean_picker_movement(movements.copy())
+    sharded = clean_data.clean_picker_movement(movements.copy(), workers=workers)
+    assert "Sharding shortcut detection" in capsys.readouterr().out and serial['is_suspicious'].sum() > 0
+    pd.testing.assert_frame_equal(sharded, serial)
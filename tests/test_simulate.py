@@ -0,0 +1,15 @@
+import pandas as pd
+
+import simulate
+
+
+def test_default_shift_skips_a_trailing_partial_day():
+    # The export ends just after midnight: the last calendar day has no orders in its shift
+    ts = pd.Series(pd.to_datetime(['2026-01-01 15:00', '2026-01-01 19:00',
+                                   '2026-01-02 15:00', '2026-01-02 19:00', '2026-01-03 00:30']))
+    assert simulate.shift_window(ts) == (pd.Timestamp('2026-01-02 14:00'), pd.Timestamp('2026-01-02 22:00'))
+
+
+def test_empty_shift_never_keeps_up():
+    result = {'orders': 0, 'orders_waiting_at_shift_end': 0, 'avg_queueing_delay_min': 0.0}
+    assert not simulate.survives(result)
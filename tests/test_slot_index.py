@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+import pytest
+
+import optimize_slotting
+import schema
+from slot_index import FreeSlotIndex
+
+
+def frame_scan(to_move_skus, constraints_df, empty_slots, slot_map):
+    # The greedy loop before FreeSlotIndex: filter empty_slots_df per SKU, take the first
+    # match, drop the slot and pd.concat the vacated one to the end of the frame
+    empty_slots_df = constraints_df[constraints_df['slot_id'].isin(empty_slots)]
+    moves = []
+    for row in to_move_skus.itertuples(index=False):
+        candidates = empty_slots_df[(empty_slots_df['temp_zone'] == row.temp_req)
+                                    & (empty_slots_df['max_weight_kg'] >= row.weight_kg)]
+        if row.is_high_velocity:
+            fits = candidates
+            candidates = candidates[~candidates['aisle_id'].astype(str).str.startswith('B')]
+            if candidates.empty and row.priority >= 1000:
+                candidates = fits
+        if candidates.empty:
+            continue
+        best_slot = candidates.iloc[0]['slot_id']
+        moves.append({'sku_id': row.sku_id, 'new_slot': best_slot})
+        optimize_slotting.apply_move(slot_map, row.sku_id, row.current_slot, best_slot)
+        empty_slots_df = empty_slots_df[empty_slots_df['slot_id'] != best_slot]
+        if row.current_slot not in slot_map:
+            empty_slots_df = pd.concat([empty_slots_df, constraints_df[constraints_df['slot_id'] == row.current_slot]])
+    return moves
+
+
+@pytest.fixture(scope='module')
+def layout(synthetic):
+    sku_df, constraints_df, order_df = optimize_slotting.load_data(data_dir=os.path.join(synthetic, "cleaned_data"))
+    optimize_slotting.mark_velocity(sku_df, order_df)
+    current_state = schema.join_slots(sku_df, constraints_df)
+    violations = optimize_slotting.find_violations(current_state)
+    to_move_skus = optimize_slotting.move_candidates(current_state, *violations,
+                                                     optimize_slotting.shared_surplus(current_state))
+    empty_slots = set(constraints_df['slot_id']) - set(sku_df['current_slot'])
+    return sku_df, constraints_df, current_state, to_move_skus, empty_slots
+
+
+def assert_same_plan(to_move_skus, sku_df, constraints_df, empty_slots):
+    slot_map = dict(zip(sku_df['current_slot'], sku_df['sku_id']))
+    indexed_map, scan_map = dict(slot_map), dict(slot_map)
+    indexed = optimize_slotting.greedy_assign(to_move_skus, FreeSlotIndex(constraints_df, empty_slots), indexed_map,
+                                              verbose=False)
+    assert indexed == frame_scan(to_move_skus, constraints_df, empty_slots, scan_map)
+    assert indexed_map == scan_map
+    return indexed
+
+
+def test_greedy_plan_matches_the_frame_scan(layout):
+    sku_df, constraints_df, _, to_move_skus, empty_slots = layout
+    assert len(assert_same_plan(to_move_skus, sku_df, constraints_df, empty_slots)) > 0
+
+
+def test_greedy_plan_matches_the_frame_scan_with_released_slots_reused(layout):
+    # Every SKU moves in shuffled order with only a few empty slots, so vacated slots
+    # are released and taken again
+    sku_df, constraints_df, current_state, _, empty_slots = layout
+    empty_slots = set(sorted(empty_slots)[::500])
+    to_move_skus = current_state.assign(priority=0).sample(frac=1, random_state=3)
+    to_move_skus.loc[to_move_skus.index[::7], 'priority'] = 1000
+    assert len(assert_same_plan(to_move_skus, sku_df, constraints_df, empty_slots)) > 2 * len(empty_slots)
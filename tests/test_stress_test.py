@@ -0,0 +1,14 @@
+import pandas as pd
+
+import stress_test
+
+
+def test_empty_replications_are_counted_and_left_out():
+    results = pd.DataFrame({'replication': [0, 0, 1, 1], 'layout': ['current', 'plan'] * 2, 'orders': [0, 0, 10, 10],
+                            'overloaded': [True, True, False, False]})
+    for metric in stress_test.METRICS:
+        results[metric] = [0.0, 0.0, 4.0, 2.0]
+    assert stress_test.empty_replications(results) == 1
+    summary = stress_test.summarize(results).set_index(['layout', 'metric'])
+    assert summary.loc[('current', 'avg_pick_time_min'), 'mean'] == 4.0
+    assert summary.loc[('plan', 'overload_probability'), 'mean'] == 0.0
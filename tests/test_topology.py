@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import shortest_path
+
+import topology
+
+
+@pytest.fixture(scope='module')
+def constraints_df(synthetic):
+    # A few aisles of two zones, with different aisle lengths
+    df = pd.read_csv(os.path.join(synthetic, "warehouse_constraints.csv"), dtype={'slot_id': str})
+    df = df[df['aisle_id'].isin(['A01', 'A02', 'A03', 'B01', 'B02'])]
+    position = df['slot_id'].str[-2:].astype(int)
+    return df[(position <= 6) | df['aisle_id'].isin(['A02', 'B02'])].reset_index(drop=True)
+
+
+def slot_graph_distances(aisles, slot_aisle, slot_y):
+    # Dijkstra over a graph with every slot as a node on its aisle's centre line
+    n, m = len(aisles), len(slot_aisle)
+    x, length, zone = aisles['x'].to_numpy(), aisles['length'].to_numpy(), aisles['zone'].to_numpy()
+    front, back, slot = 1 + np.arange(n), 1 + n + np.arange(n), 1 + 2 * n + np.arange(m)
+    edges = [(0, front[0], x[0])]
+    for i in range(n - 1):
+        edges.append((front[i], front[i + 1], x[i + 1] - x[i]))
+        if zone[i] == zone[i + 1]:
+            edges.append((back[i], back[i + 1], x[i + 1] - x[i] + abs(length[i + 1] - length[i])))
+    for i in range(n):
+        on_aisle = np.flatnonzero(slot_aisle == i)
+        on_aisle = on_aisle[np.argsort(slot_y[on_aisle], kind='stable')]
+        nodes = [front[i]] + list(slot[on_aisle]) + [back[i]]
+        ys = [0.0] + list(slot_y[on_aisle]) + [length[i]]
+        # Slots at the same y are joined by a zero-length edge (kept by a tiny epsilon)
+        edges += [(a, b, max(yb - ya, 1e-9)) for a, b, ya, yb in zip(nodes, nodes[1:], ys, ys[1:])]
+    src, dst, w = map(np.array, zip(*edges))
+    graph = coo_matrix((w, (src, dst)), shape=(1 + 2 * n + m,) * 2).tocsr()
+    d = shortest_path(graph, method='D', directed=False)
+    return d[np.ix_(slot, slot)], d[0, slot]
+
+
+def test_slot_distances_equal_shortest_paths_over_every_slot(constraints_df, tmp_path):
+    topo = topology.load(str(tmp_path), constraints_df)
+    assert isinstance(topo.end_distance, np.memmap)
+
+    codes = np.arange(len(constraints_df))
+    expected, expected_dock = slot_graph_distances(topo.aisles, np.asarray(topo.slot_aisle),
+                                                   np.asarray(topo.slot_xyz[:, 1], dtype=float))
+    a, b = np.meshgrid(codes, codes, indexing='ij')
+    distance = topo.distance(a.ravel(), b.ravel()).reshape(a.shape)
+    np.testing.assert_allclose(distance, expected, atol=1e-3)
+    np.testing.assert_allclose(distance, distance.T, rtol=1e-6)  # float32 matrix
+    np.testing.assert_allclose(topo.dock_distance(codes), expected_dock, atol=1e-3)
+    assert np.isnan(topo.distance([-1, 0], [0, -1])).all()
+
+
+def test_load_rebuilds_when_the_layout_changes(constraints_df, tmp_path):
+    topo = topology.load(str(tmp_path), constraints_df)
+    assert topology.load(str(tmp_path)).meta == topo.meta
+    smaller = constraints_df[constraints_df['aisle_id'] != 'B02']
+    topo = topology.load(str(tmp_path), smaller)
+    assert topo.meta['slots'] == len(smaller) and len(topo.aisles) == 4
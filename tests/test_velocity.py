@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import velocity
+
+
+@pytest.fixture(scope='module')
+def order_df(synthetic):
+    return pd.read_csv(f"{synthetic}/order_history.csv")
+
+
+def brute_force_top(order_df, half_life_days, k):
+    # Decayed order count per SKU as of the latest order, top k by count
+    ts = pd.to_datetime(order_df['order_timestamp'])
+    age_days = (ts.max() - ts).dt.total_seconds() / 86400
+    counts = np.exp2(-age_days / half_life_days).groupby(order_df['sku_id']).sum()
+    order = np.lexsort((counts.index.to_numpy(), -counts.to_numpy()))  # ties by sku_id, as TopK.ranked
+    return counts.iloc[order[:k]]
+
+
+@pytest.mark.parametrize('half_life_days, k', [(velocity.HALF_LIFE_DAYS, 50), (0.005, 20)])
+def test_update_on_split_orders_equals_a_full_build(order_df, half_life_days, k, tmp_path):
+    full = velocity.build(order_df, half_life_days, k)
+
+    state = velocity.build(order_df.iloc[:20_000], half_life_days, k)
+    for part in [order_df.iloc[20_000:41_000], order_df.iloc[41_000:]]:
+        velocity.save(state, str(tmp_path))
+        state = velocity.update(velocity.load(str(tmp_path)), part)
+
+    assert state['meta']['lines'] == full['meta']['lines'] == len(order_df)
+    pd.testing.assert_frame_equal(velocity.top_k(state), velocity.top_k(full))
+    sku_ids = order_df['sku_id'].unique()
+    np.testing.assert_allclose(velocity.decayed_orders(state, sku_ids), velocity.decayed_orders(full, sku_ids))
+
+    # ... and both equal the decayed counts computed directly. The 0.005-day half-life
+    # spans more than RESCALE_AFTER half-lives over the data, so the anchor is rescaled
+    expected = brute_force_top(order_df, half_life_days, k)
+    top = velocity.top_k(state)
+    first_order = pd.to_datetime(order_df['order_timestamp']).min().timestamp()
+    assert (state['meta']['anchor'] > first_order) == (half_life_days < 1)
+    assert top['sku_id'].tolist() == expected.index.tolist()
+    np.testing.assert_allclose(top['decayed_orders'], expected.to_numpy())
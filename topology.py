@@ -0,0 +1,233 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import time
+import argparse
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import shortest_path
+
+import columnar
+import schema
+import instrument
+from assignment_solver import BAY_WIDTH_M, RACK_DEPTH_M
+
+# Physical warehouse model derived from warehouse_constraints.
+#
+# Aisles of a zone stand side by side (pitch = aisle width + a rack on each
+# side), zones follow each other left to right with a ZONE_GAP_M walkway, and
+# bays run from the front of each aisle (BAY_WIDTH_M per position). Shelf levels
+# only set the height. The walkable graph has a node at the front and the back
+# of every aisle plus the dock:
+#   - the front cross-aisle connects neighbouring aisle fronts across all zones
+#   - each zone's back cross-aisle connects neighbouring aisle backs in the zone
+#   - every aisle connects its own front and back
+# All-pairs shortest paths between these 2N+1 nodes are stored as one float32
+# matrix (cleaned_data/topology/end_distance.npy) and memory-mapped. A
+# slot-to-slot distance is then the best of four end-to-end combinations: O(1)
+# and vectorized over arrays of slot codes. Slot codes are constraint rows, the
+# same slot_code schema.apply_schema assigns.
+
+TOPOLOGY_DIR = "topology"
+ZONE_GAP_M = 4.0              # main walkway between zones
+DOCK_OFFSET_M = 5.0           # dock to the front of the first aisle
+LEVEL_HEIGHT_M = 0.45         # per shelf level (A = floor)
+
+
+def topology_dir(base_dir=columnar.CLEANED_DIR):
+    return os.path.join(base_dir, TOPOLOGY_DIR)
+
+
+def layout_fingerprint(constraints_df):
+    cols = [c for c in ['slot_id', 'zone', 'aisle_id', 'shelf_level', 'aisle_width_m'] if c in constraints_df.columns]
+    hashed = pd.util.hash_pandas_object(constraints_df[cols].astype(str), index=False)
+    return format(int(hashed.sum()) & (2 ** 64 - 1), '016x')
+
+
+def build(constraints_df):
+    # Aisle table, slot coordinates and the end-to-end distance matrix
+    slot_ids = constraints_df['slot_id'].astype(str).str.strip()
+    parsed_aisle, level, position = schema.parse_slot_components(slot_ids)
+    aisle_id = constraints_df['aisle_id'].astype(str).where(constraints_df['aisle_id'].notna(), parsed_aisle)
+    zone = constraints_df['zone'].astype(str).where(constraints_df['zone'].notna(), aisle_id.str[0])
+    slots = pd.DataFrame({
+        'aisle_id': aisle_id.to_numpy(), 'zone': zone.to_numpy(),
+        'width': pd.to_numeric(constraints_df['aisle_width_m'], errors='coerce').fillna(2.0).to_numpy(),
+        'position': position.fillna(1).to_numpy(),
+    })
+
+    # One row per aisle, in walking order (zone, then aisle)
+    aisles = slots.groupby('aisle_id', sort=False).agg(zone=('zone', 'first'), width=('width', 'first'),
+                                                        positions=('position', 'max'))
+    aisles = aisles.reset_index().sort_values(['zone', 'aisle_id'], kind='stable').reset_index(drop=True)
+    pitch = aisles['width'].to_numpy() + 2 * RACK_DEPTH_M
+    new_zone = np.r_[False, aisles['zone'].to_numpy()[1:] != aisles['zone'].to_numpy()[:-1]]
+    left = np.cumsum(np.r_[0.0, pitch[:-1]]) + np.cumsum(new_zone) * ZONE_GAP_M
+    aisles['x'] = DOCK_OFFSET_M + left + pitch / 2
+    aisles['length'] = aisles['positions'] * BAY_WIDTH_M
+    n = len(aisles)
+
+    # Graph: node 0 = dock, 1..n = aisle fronts, n+1..2n = aisle backs
+    x, length = aisles['x'].to_numpy(), aisles['length'].to_numpy()
+    front, back = np.arange(1, n + 1), np.arange(n + 1, 2 * n + 1)
+    same_zone = ~new_zone[1:]
+    src = np.concatenate([[0], front[:-1], back[:-1][same_zone], front])
+    dst = np.concatenate([[1], front[1:], back[1:][same_zone], back])
+    weight = np.concatenate([[x[0]], np.diff(x), (np.diff(x) + np.abs(np.diff(length)))[same_zone], length])
+    graph = coo_matrix((weight, (src, dst)), shape=(2 * n + 1, 2 * n + 1)).tocsr()
+    end_distance = shortest_path(graph, method='D', directed=False).astype(np.float32)
+
+    # Slot coordinates (bay centre on the aisle centre line)
+    slot_aisle = pd.Index(aisles['aisle_id']).get_indexer(slots['aisle_id']).astype(np.int32)
+    slot_y = (slots['position'].to_numpy() - 0.5) * BAY_WIDTH_M
+    level_index = level.fillna('A').astype(str).str[0].map(ord).to_numpy() - ord('A')
+    slot_xyz = np.column_stack([x[slot_aisle], slot_y, level_index * LEVEL_HEIGHT_M]).astype(np.float32)
+    return aisles.drop(columns=['positions']), slot_ids.to_numpy(dtype=object), slot_aisle, slot_xyz, end_distance
+
+
+def save(base_dir, constraints_df):
+    aisles, slot_ids, slot_aisle, slot_xyz, end_distance = build(constraints_df)
+    out = topology_dir(base_dir)
+    os.makedirs(out, exist_ok=True)
+    aisles.to_csv(os.path.join(out, "aisles.csv"), index=False)
+    pd.DataFrame({'slot_id': slot_ids}).to_csv(os.path.join(out, "slot_ids.csv"), index=False)
+    np.save(os.path.join(out, "slot_aisle.npy"), slot_aisle)
+    np.save(os.path.join(out, "slot_xyz.npy"), slot_xyz)
+    np.save(os.path.join(out, "end_distance.npy"), end_distance)
+    with open(os.path.join(out, "_topology.json"), 'w') as f:
+        json.dump({'layout': layout_fingerprint(constraints_df), 'aisles': len(aisles), 'slots': len(slot_ids),
+                   'matrix_mb': round(end_distance.nbytes / 1024 ** 2, 3)}, f, indent=2)
+
+
+class Topology:
+    # Memory-mapped topology of one cleaned_data directory
+
+    def __init__(self, base_dir=columnar.CLEANED_DIR, mmap=True):
+        src = topology_dir(base_dir)
+        mode = 'r' if mmap else None
+        with open(os.path.join(src, "_topology.json")) as f:
+            self.meta = json.load(f)
+        self.aisles = pd.read_csv(os.path.join(src, "aisles.csv"), dtype={'aisle_id': str, 'zone': str})
+        self.end_distance = np.load(os.path.join(src, "end_distance.npy"), mmap_mode=mode)
+        self.slot_aisle = np.load(os.path.join(src, "slot_aisle.npy"), mmap_mode=mode)
+        self.slot_xyz = np.load(os.path.join(src, "slot_xyz.npy"), mmap_mode=mode)
+        self.length = self.aisles['length'].to_numpy(dtype=np.float32)
+        self._src = src
+        self._slot_ids = None
+        self._slot_index = None
+
+    def slot_ids(self):
+        # Slot ID of every slot code
+        if self._slot_ids is None:
+            self._slot_ids = pd.read_csv(os.path.join(self._src, "slot_ids.csv"), dtype={'slot_id': str})['slot_id'].to_numpy()
+        return self._slot_ids
+
+    def slot_codes(self, slot_ids):
+        # Constraint-row codes of slot IDs (-1 = unknown), like schema.encode
+        if self._slot_index is None:
+            self._slot_index = schema.id_index(pd.Series(self.slot_ids()))
+        return schema.encode(pd.Series(slot_ids), self._slot_index)
+
+    def distance(self, a, b):
+        # Walking distance (m) between slot codes a and b (arrays or scalars); NaN if unknown
+        a, b = np.asarray(a), np.asarray(b)
+        known = (a >= 0) & (b >= 0)
+        a, b = np.where(known, a, 0), np.where(known, b, 0)
+        n = len(self.length)
+        aa, ab = self.slot_aisle[a], self.slot_aisle[b]
+        ya, yb = self.slot_xyz[a, 1], self.slot_xyz[b, 1]
+        ra, rb = self.length[aa] - ya, self.length[ab] - yb
+        d = self.end_distance
+        best = np.minimum(np.minimum(ya + d[aa + 1, ab + 1] + yb, ya + d[aa + 1, ab + n + 1] + rb),
+                          np.minimum(ra + d[aa + n + 1, ab + 1] + yb, ra + d[aa + n + 1, ab + n + 1] + rb))
+        best = np.where(aa == ab, np.abs(ya - yb), best)
+        return np.where(known, best, np.nan)
+
+    def dock_distance(self, a):
+        # Walking distance (m) from the dock to slot codes a; NaN if unknown
+        a = np.asarray(a)
+        known = a >= 0
+        a = np.where(known, a, 0)
+        aisle, y = self.slot_aisle[a], self.slot_xyz[a, 1]
+        n = len(self.length)
+        best = np.minimum(self.end_distance[0, aisle + 1] + y,
+                          self.end_distance[0, aisle + n + 1] + self.length[aisle] - y)
+        return np.where(known, best, np.nan)
+
+    def aisle_distance(self, aisle_a, aisle_b):
+        # Shortest front/back end-to-end distance between two aisles (row indices of self.aisles)
+        n = len(self.length)
+        d = self.end_distance
+        aisle_a, aisle_b = np.asarray(aisle_a), np.asarray(aisle_b)
+        return np.minimum(np.minimum(d[aisle_a + 1, aisle_b + 1], d[aisle_a + 1, aisle_b + n + 1]),
+                          np.minimum(d[aisle_a + n + 1, aisle_b + 1], d[aisle_a + n + 1, aisle_b + n + 1]))
+
+
+def load(base_dir=columnar.CLEANED_DIR, constraints_df=None):
+    # Topology of base_dir, (re)built when missing or when constraints_df has changed
+    meta_path = os.path.join(topology_dir(base_dir), "_topology.json")
+    if constraints_df is None:
+        if os.path.exists(meta_path):
+            return Topology(base_dir)
+        constraints_df = columnar.load_cleaned('warehouse_constraints', base_dir, dtype={'slot_id': str})
+    stale = True
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            stale = json.load(f)['layout'] != layout_fingerprint(constraints_df)
+    if stale:
+        with instrument.stage('build_topology', rows_in=len(constraints_df)):
+            save(base_dir, constraints_df)
+    return Topology(base_dir)
+
+
+def check_movements(topo, base_dir=columnar.CLEANED_DIR):
+    # Reported travel_distance_m vs the shortest walk between a picker's
+    # consecutive picks (via each SKU's current slot)
+    picker_df = columnar.load_cleaned('picker_movement', base_dir)
+    sku_df = columnar.load_cleaned('sku_master', base_dir)
+    picker_df = picker_df.sort_values(['picker_id', 'movement_timestamp'], kind='stable')
+    sku_slot = topo.slot_codes(columnar.normalize_ids(sku_df['current_slot']))
+    sku_rows = schema.encode(columnar.normalize_ids(picker_df['sku_id']), schema.id_index(columnar.normalize_ids(sku_df['sku_id'])))
+    slot = np.where(sku_rows >= 0, sku_slot[np.maximum(sku_rows, 0)], -1)
+    same_picker = np.r_[False, picker_df['picker_id'].to_numpy()[1:] == picker_df['picker_id'].to_numpy()[:-1]]
+    prev_slot = np.r_[-1, slot[:-1]]
+    walk = np.where(same_picker, topo.distance(prev_slot, slot), np.nan)
+    reported = pd.to_numeric(picker_df['travel_distance_m'], errors='coerce').to_numpy()
+    ok = ~np.isnan(walk) & ~np.isnan(reported)
+    ratio = reported[ok] / np.maximum(walk[ok], BAY_WIDTH_M)
+    print(f"\n--- TRAVEL DISTANCE CHECK ({ok.sum():,} consecutive pick pairs) ---")
+    print(f"Shortest walk: median {np.median(walk[ok]):.1f} m, reported: median {np.median(reported[ok]):.1f} m")
+    print(f"Reported / shortest walk: P5 {np.percentile(ratio, 5):.2f}, median {np.median(ratio):.2f}, "
+          f"P95 {np.percentile(ratio, 95):.2f}")
+    print(f"Reported shorter than physically possible (< 90% of the shortest walk): {(ratio < 0.9).sum():,} "
+          f"({(ratio < 0.9).mean():.1%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warehouse topology and slot-to-slot distances")
+    parser.add_argument('--dir', default=columnar.CLEANED_DIR, help="cleaned_data directory")
+    parser.add_argument('--rebuild', action='store_true', help="rebuild even if the layout is unchanged")
+    parser.add_argument('--bench', type=int, metavar='PAIRS', default=0, help="time PAIRS random slot-pair lookups")
+    parser.add_argument('--check-movements', action='store_true',
+                        help="compare travel_distance_m with the shortest walk between consecutive picks")
+    args = parser.parse_args()
+
+    constraints_df = columnar.load_cleaned('warehouse_constraints', args.dir, dtype={'slot_id': str})
+    if args.rebuild:
+        save(args.dir, constraints_df)
+    topo = load(args.dir, constraints_df)
+    print(f"Topology: {topo.meta['aisles']} aisles, {topo.meta['slots']:,} slots, "
+          f"{topo.end_distance.shape[0]}x{topo.end_distance.shape[1]} float32 end-distance matrix "
+          f"({topo.meta['matrix_mb']} MB) in {topology_dir(args.dir)}")
+    print(f"Dock to farthest slot: {np.nanmax(topo.dock_distance(np.arange(topo.meta['slots']))):.1f} m")
+
+    if args.bench:
+        rng = np.random.default_rng(0)
+        a, b = rng.integers(0, topo.meta['slots'], (2, args.bench))
+        start = time.perf_counter()
+        topo.distance(a, b)
+        seconds = time.perf_counter() - start
+        print(f"{args.bench:,} slot-pair lookups in {seconds:.3f}s ({args.bench / seconds / 1e6:.1f}M pairs/s)")
+    if args.check_movements:
+        check_movements(topo, args.dir)
+    instrument.print_summary()
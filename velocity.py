@@ -0,0 +1,233 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import time
+import heapq
+import argparse
+
+import columnar
+import instrument
+
+# Time-decayed SKU velocity, updated incrementally from new order lines.
+#
+# Every order line adds 2 ** ((order_timestamp - anchor) / half-life) to its
+# SKU, so a SKU's score is its order count decayed with HALF_LIFE_DAYS. Scores
+# are stored relative to a fixed anchor time: older lines never have to be
+# decayed again, and lines arriving out of time order still get the right
+# weight. The decayed count as of the latest order is the stored score times
+# 2 ** -((as_of - anchor) / half-life). When the weights outgrow float range
+# all scores are rescaled to a new anchor (the ranking does not change).
+#
+# Anchored scores only ever grow, so the top-K is kept exactly by a bounded
+# min-heap: a SKU enters when its new score beats the heap minimum, which
+# costs O(log K) per updated SKU and never sorts the catalog.
+#
+# State in cleaned_data/velocity/ (scores.npy, sku_ids.csv, _velocity.json);
+# meta['lines'] counts the order_history rows consumed, as in affinity.py.
+
+VELOCITY_DIR = "velocity"
+HALF_LIFE_DAYS = 7.0
+TOP_K = 200
+RESCALE_AFTER = 512          # half-lives past the anchor before scores are rescaled
+
+
+def velocity_dir(base_dir=columnar.CLEANED_DIR):
+    return os.path.join(base_dir, VELOCITY_DIR)
+
+
+def exists(base_dir=columnar.CLEANED_DIR):
+    return os.path.exists(os.path.join(velocity_dir(base_dir), "_velocity.json"))
+
+
+class TopK:
+    # Exact top-k of scores that only increase: min-heap of (score, sku_id) with lazy deletion
+    def __init__(self, k):
+        self.k = k
+        self.members = {}        # sku_id -> score
+        self.heap = []
+
+    def _clean(self):
+        while self.heap and self.members.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+
+    def offer(self, sku_id, score):
+        if sku_id in self.members:
+            self.members[sku_id] = score
+            heapq.heappush(self.heap, (score, sku_id))
+            if len(self.heap) > 4 * self.k:
+                # Drop stale entries now and then so the heap stays O(k)
+                self.heap = [(s, sku) for sku, s in self.members.items()]
+                heapq.heapify(self.heap)
+            return
+        if len(self.members) < self.k:
+            self.members[sku_id] = score
+            heapq.heappush(self.heap, (score, sku_id))
+            return
+        self._clean()
+        if (score, sku_id) > self.heap[0]:
+            _, evicted = heapq.heapreplace(self.heap, (score, sku_id))
+            del self.members[evicted]
+            self.members[sku_id] = score
+
+    def scale(self, factor):
+        self.members = {sku: s * factor for sku, s in self.members.items()}
+        self.heap = [(s, sku) for sku, s in self.members.items()]
+        heapq.heapify(self.heap)
+
+    def ranked(self):
+        # (sku_id, score) strongest first (k entries, sorted only here)
+        return sorted(self.members.items(), key=lambda item: (-item[1], item[0]))
+
+
+def _lines(order_df):
+    # (sku_id, seconds since epoch) of order lines with both fields
+    sku_ids = columnar.normalize_ids(order_df['sku_id'])
+    ts = pd.to_datetime(order_df['order_timestamp'], errors='coerce')
+    keep = (sku_ids.notna() & ts.notna()).to_numpy()
+    seconds = ts.to_numpy(dtype='datetime64[ns]')[keep].astype(np.int64) / 1e9
+    return sku_ids.to_numpy()[keep], seconds
+
+
+def build(order_df=None, half_life_days=HALF_LIFE_DAYS, k=TOP_K):
+    state = {
+        'meta': {'half_life_days': half_life_days, 'top_k': k, 'anchor': None, 'as_of': None, 'lines': 0},
+        'sku_index': {},
+        'scores': np.zeros(0),
+        'top': TopK(k),
+    }
+    if order_df is not None:
+        update(state, order_df)
+    return state
+
+
+def _rescale(state, anchor):
+    meta = state['meta']
+    factor = 2.0 ** (-(anchor - meta['anchor']) / (meta['half_life_days'] * 86400))
+    state['scores'] *= factor
+    state['top'].scale(factor)
+    meta['anchor'] = anchor
+
+
+def update(state, new_order_df):
+    # Fold new order lines into the state (in place); O(new lines + touched SKUs * log k)
+    meta = state['meta']
+    sku_ids, seconds = _lines(new_order_df)
+    meta['lines'] += len(new_order_df)
+    if len(sku_ids) == 0:
+        return state
+    if meta['anchor'] is None:
+        meta['anchor'] = float(seconds.min())
+    half_life = meta['half_life_days'] * 86400
+    latest = float(seconds.max())
+    if (latest - meta['anchor']) / half_life > RESCALE_AFTER:
+        _rescale(state, latest)
+    meta['as_of'] = latest if meta['as_of'] is None else max(meta['as_of'], latest)
+
+    # Per-SKU sums of the new weights; new SKUs are appended to the index
+    codes, uniques = pd.factorize(sku_ids)
+    added = np.bincount(codes, weights=np.exp2((seconds - meta['anchor']) / half_life))
+    index = state['sku_index']
+    for sku_id in uniques:
+        if sku_id not in index:
+            index[sku_id] = len(index)
+    if len(index) > len(state['scores']):
+        state['scores'] = np.concatenate([state['scores'], np.zeros(len(index) - len(state['scores']))])
+    rows = np.fromiter((index[s] for s in uniques), dtype=np.int64, count=len(uniques))
+    state['scores'][rows] += added
+
+    top = state['top']
+    for sku_id, score in zip(uniques, state['scores'][rows]):
+        top.offer(sku_id, float(score))
+    return state
+
+
+def decay_factor(state):
+    # Anchored score -> order count decayed to the latest order
+    meta = state['meta']
+    if meta['anchor'] is None:
+        return 1.0
+    return 2.0 ** (-(meta['as_of'] - meta['anchor']) / (meta['half_life_days'] * 86400))
+
+
+def top_k(state, k=None):
+    # DataFrame sku_id, decayed_orders of the k highest-velocity SKUs (k <= the tracked top)
+    ranked = state['top'].ranked()[:k]
+    factor = decay_factor(state)
+    return pd.DataFrame({'sku_id': [s for s, _ in ranked], 'decayed_orders': [v * factor for _, v in ranked]})
+
+
+def decayed_orders(state, sku_ids):
+    # Decayed order count per sku_id (0 for SKUs never ordered)
+    rows = pd.Series(state['sku_index'], dtype=np.int64).reindex(columnar.normalize_ids(pd.Series(sku_ids)))
+    values = np.zeros(len(rows))
+    known = rows.notna().to_numpy()
+    values[known] = state['scores'][rows[known].to_numpy(dtype=np.int64)] * decay_factor(state)
+    return values
+
+
+def save(state, base_dir=columnar.CLEANED_DIR):
+    out = velocity_dir(base_dir)
+    os.makedirs(out, exist_ok=True)
+    np.save(os.path.join(out, "scores.npy"), state['scores'])
+    pd.DataFrame({'sku_id': list(state['sku_index'])}).to_csv(os.path.join(out, "sku_ids.csv"), index=False)
+    meta = dict(state['meta'], top=list(state['top'].members))
+    with open(os.path.join(out, "_velocity.json"), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def load(base_dir=columnar.CLEANED_DIR):
+    src = velocity_dir(base_dir)
+    with open(os.path.join(src, "_velocity.json")) as f:
+        meta = json.load(f)
+    sku_ids = pd.read_csv(os.path.join(src, "sku_ids.csv"), dtype={'sku_id': str})['sku_id'].tolist()
+    scores = np.load(os.path.join(src, "scores.npy"))
+    index = {sku_id: i for i, sku_id in enumerate(sku_ids)}
+    top = TopK(meta['top_k'])
+    for sku_id in meta.pop('top'):
+        top.offer(sku_id, float(scores[index[sku_id]]))
+    return {'meta': meta, 'sku_index': index, 'scores': scores, 'top': top}
+
+
+def refresh(order_df, base_dir=columnar.CLEANED_DIR, half_life_days=HALF_LIFE_DAYS, k=TOP_K):
+    # Saved state brought up to date with order_df's rows past meta['lines'] (built on first use)
+    if exists(base_dir):
+        state = load(base_dir)
+        if state['meta']['half_life_days'] == half_life_days and state['meta']['top_k'] >= k \
+                and state['meta']['lines'] <= len(order_df):
+            update(state, order_df.iloc[state['meta']['lines']:])
+            save(state, base_dir)
+            return state
+    state = build(order_df, half_life_days, k)
+    save(state, base_dir)
+    return state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time-decayed SKU velocity from order_history")
+    parser.add_argument('--dir', default=columnar.CLEANED_DIR, help="cleaned_data directory")
+    parser.add_argument('--rebuild', action='store_true', help="recount from the full order history")
+    parser.add_argument('--half-life-days', type=float, default=HALF_LIFE_DAYS)
+    parser.add_argument('--top', type=int, default=TOP_K, help="high-velocity SKUs to track")
+    parser.add_argument('--show', type=int, default=10, help="SKUs to list")
+    args = parser.parse_args()
+
+    order_df = columnar.load_cleaned('order_history', args.dir)
+    start = time.perf_counter()
+    lines_before = load(args.dir)['meta']['lines'] if exists(args.dir) and not args.rebuild else 0
+    with instrument.stage('velocity_update', rows_in=len(order_df) - lines_before) as rec:
+        if args.rebuild:
+            state = build(order_df, args.half_life_days, args.top)
+            save(state, args.dir)
+        else:
+            state = refresh(order_df, args.dir, args.half_life_days, args.top)
+        rec['rows_out'] = len(state['top'].members)
+    meta = state['meta']
+    as_of = pd.Timestamp(meta['as_of'], unit='s') if meta['as_of'] is not None else None
+    print(f"Velocity over {meta['lines']:,} order lines ({meta['lines'] - lines_before:,} new) in "
+          f"{time.perf_counter() - start:.2f}s: {len(state['sku_index']):,} SKUs, half-life {meta['half_life_days']:g} days, "
+          f"as of {as_of} -> {velocity_dir(args.dir)}")
+    print(f"\n--- TOP {args.show} SKUs BY DECAYED ORDERS ---")
+    for row in top_k(state, args.show).itertuples(index=False):
+        print(f"{row.sku_id}: {row.decayed_orders:,.1f}")
+    instrument.print_summary()